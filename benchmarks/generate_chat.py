@@ -0,0 +1,221 @@
+"""
+Synthetic Chzzk chat generator for benchmarks
+
+Writes CSVs in the Chzzk export format (재생시간, 닉네임, 메시지) with the
+traits real streams have: sentiment lexicon terms, emotes, cheese donations,
+subscriptions, system messages, copy-paste spam bursts and planted chat
+spikes. Generation is vectorized and chunked, so 10M rows stay within a few
+hundred MB of memory.
+
+Usage:
+    python benchmarks/generate_chat.py 1000000 chat_1m.csv
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from core.sentiment_lexicon import EMOTICON_SENTIMENT, SENTIMENT_LEXICON
+
+
+# Rows written per pandas to_csv call
+WRITE_CHUNK = 500_000
+
+# Everyday chat that carries no sentiment
+NEUTRAL_WORDS = [
+    '안녕하세요', '하이', '오늘', '방송', '이거', '저거', '뭐임', '근데', '진짜', '그냥',
+    '다음', '게임', '보스', '아이템', '채팅', '시작', '언제', '어디', '왜', '오',
+    '음', '흠', '아', '네', '아니', '맞음', '이번', '한판', '더', '가자',
+]
+
+# Chzzk emote codes as they appear in exports
+EMOTES = ['{:d_1:}', '{:d_32:}', '{:d_47:}', '{:chzzkLaugh:}', '{:chzzkCry:}', '{:chzzkHeart:}']
+
+# Chat during a planted spike leans on these
+HYPE_WORDS = ['ㅋㅋㅋㅋ', 'ㅋㅋㅋ', '레전드', '미쳤다', '대박', '와', 'ㄷㄷ', '클립각']
+
+SPAM_MESSAGES = ['구독 좋아요 알림설정', 'ㅋㅋㅋㅋㅋㅋㅋㅋㅋㅋㅋㅋ', '방장님 하트 눌러주세요']
+
+
+def vocabulary() -> np.ndarray:
+    """Words messages are built from: lexicon terms, emoticons and neutral chat"""
+    words = list(NEUTRAL_WORDS)
+    for terms in SENTIMENT_LEXICON.values():
+        words += list(terms)
+    words += list(EMOTICON_SENTIMENT)
+    return np.array(list(dict.fromkeys(words)), dtype=object)
+
+
+def _time_strings(duration: int) -> np.ndarray:
+    """HH:MM:SS for every second of the stream"""
+    seconds = np.arange(duration + 1)
+    return np.array([f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}" for s in seconds],
+                    dtype=object)
+
+
+def plan_stream(rows: int, duration: int, spikes: int, spam_bursts: int,
+                rng: np.random.Generator) -> Dict:
+    """
+    Decide when every message is sent and where spikes and spam go
+    
+    Returns:
+        Dictionary with sorted per-message seconds and the planted events
+    """
+    # Slowly varying base rate with a quieter start and end
+    t = np.arange(duration)
+    rate = 1.0 + 0.5 * np.sin(t / duration * np.pi) + 0.2 * np.sin(t / 600.0)
+    
+    planted = []
+    for start in np.sort(rng.choice(max(duration - 120, 1), size=spikes, replace=False)):
+        width = int(rng.integers(30, 90))
+        boost = float(rng.uniform(5, 10))
+        rate[start:start + width] *= boost
+        planted.append({'start': int(start), 'end': int(min(start + width, duration)),
+                        'boost': round(boost, 2)})
+    
+    # Messages per second, then one timestamp per message (already sorted)
+    counts = rng.multinomial(rows, rate / rate.sum())
+    seconds = np.repeat(t, counts).astype(np.uint32)
+    
+    bursts = []
+    for start in rng.choice(max(duration - 60, 1), size=spam_bursts, replace=False):
+        bursts.append({'start': int(start), 'end': int(start + 30),
+                       'message': SPAM_MESSAGES[len(bursts) % len(SPAM_MESSAGES)]})
+    return {'seconds': seconds, 'spikes': planted, 'spam_bursts': bursts}
+
+
+def _messages(seconds: np.ndarray, in_spike: np.ndarray, vocab: np.ndarray,
+              rng: np.random.Generator) -> np.ndarray:
+    """One to three words per message, with emotes, donations and subscriptions"""
+    n = len(seconds)
+    hype = np.array(HYPE_WORDS, dtype=object)
+    
+    first = vocab[rng.integers(len(vocab), size=n)]
+    first = np.where(in_spike & (rng.random(n) < 0.7), hype[rng.integers(len(hype), size=n)],
+                     first)
+    second = vocab[rng.integers(len(vocab), size=n)]
+    third = np.array(EMOTES, dtype=object)[rng.integers(len(EMOTES), size=n)]
+    
+    length = rng.choice([1, 2, 3], size=n, p=[0.5, 0.35, 0.15])
+    messages = np.where(length >= 2, first + ' ' + second, first)
+    messages = np.where(length == 3, messages + ' ' + third, messages)
+    
+    donated = rng.random(n) < 0.004
+    amounts = rng.choice([1000, 2000, 5000, 10000, 50000], size=int(donated.sum()),
+                         p=[0.5, 0.2, 0.15, 0.1, 0.05])
+    messages[donated] = [f"[후원 {amount}치즈] {message}"
+                         for amount, message in zip(amounts, messages[donated])]
+    
+    subscribed = rng.random(n) < 0.001
+    months = rng.integers(1, 36, size=int(subscribed.sum()))
+    messages[subscribed] = [f"[{m}개월 구독] {m}" for m in months]
+    return messages
+
+
+def generate_chat(rows: int, path: str, duration: int = None, spikes: int = None,
+                  spam_bursts: int = None, seed: int = 0, encoding: str = 'utf-8-sig') -> Dict:
+    """
+    Write a synthetic chat CSV
+    
+    Args:
+        rows: Number of messages
+        path: Output CSV path
+        duration: Stream length in seconds (default: ~40 messages per second, 1-12 hours)
+        spikes: Planted chat spikes (default: one per 30 minutes)
+        spam_bursts: Copy-paste spam bursts (default: one per hour)
+        seed: Random seed (same arguments give the same file)
+        encoding: CSV encoding ('utf-8-sig' like Chzzk exports, or 'cp949')
+        
+    Returns:
+        Description of the file including the planted spikes
+    """
+    rng = np.random.default_rng(seed)
+    if duration is None:
+        duration = int(np.clip(rows / 40, 3600, 12 * 3600))
+    if spikes is None:
+        spikes = max(duration // 1800, 1)
+    if spam_bursts is None:
+        spam_bursts = max(duration // 3600, 1)
+    
+    plan = plan_stream(rows, duration, spikes, spam_bursts, rng)
+    seconds = plan['seconds']
+    in_spike = np.zeros(duration + 1, dtype=bool)
+    for spike in plan['spikes']:
+        in_spike[spike['start']:spike['end']] = True
+    in_burst = np.full(duration + 1, -1, dtype=np.int64)
+    for i, burst in enumerate(plan['spam_bursts']):
+        in_burst[burst['start']:burst['end']] = i
+    
+    vocab = vocabulary()
+    times = _time_strings(duration)
+    # A few heavy chatters and a long tail, like real streams
+    nick_pool = np.array([f"시청자{i:05d}" for i in range(max(rows // 40, 100))], dtype=object)
+    spammers = np.array([f"도배러{i}" for i in range(len(plan['spam_bursts']))], dtype=object)
+    spam_text = np.array([burst['message'] for burst in plan['spam_bursts']], dtype=object)
+    
+    # cp949 has no emoji; they become '?' like in an Excel re-save
+    with open(path, 'w', encoding=encoding, errors='replace', newline='') as f:
+        for offset in range(0, rows, WRITE_CHUNK):
+            chunk = seconds[offset:offset + WRITE_CHUNK]
+            n = len(chunk)
+            nick_index = np.where(rng.random(n) < 0.3,
+                                  np.minimum(rng.zipf(1.5, size=n) - 1, len(nick_pool) - 1),
+                                  rng.integers(len(nick_pool), size=n))
+            nicknames = nick_pool[nick_index]
+            messages = _messages(chunk, in_spike[chunk], vocab, rng)
+            
+            # Spam: inside a burst window, a third of the chat is one user pasting
+            burst = in_burst[chunk]
+            spam = (burst >= 0) & (rng.random(n) < 0.33)
+            nicknames[spam] = spammers[burst[spam]]
+            messages[spam] = spam_text[burst[spam]]
+            
+            system = rng.random(n) < 0.0005
+            nicknames[system] = '[SYSTEM]'
+            messages[system] = '채팅 규칙을 지켜주세요'
+            
+            pd.DataFrame({
+                '재생시간': times[chunk],
+                '닉네임': nicknames,
+                '메시지': messages,
+            }).to_csv(f, header=offset == 0, index=False)
+    
+    return {
+        'path': path,
+        'rows': rows,
+        'duration': duration,
+        'seed': seed,
+        'encoding': encoding,
+        'spikes': plan['spikes'],
+        'spam_bursts': plan['spam_bursts'],
+    }
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="치지직 형식의 합성 채팅 CSV를 생성합니다.")
+    parser.add_argument("rows", type=int, help="메시지 수 (예: 10000 ~ 10000000)")
+    parser.add_argument("output", help="저장할 CSV 경로")
+    parser.add_argument("--duration", type=int, default=None, help="방송 길이(초)")
+    parser.add_argument("--spikes", type=int, default=None, help="심을 채팅 급증 구간 수")
+    parser.add_argument("--spam-bursts", type=int, default=None, help="도배 구간 수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    parser.add_argument("--encoding", default="utf-8-sig", choices=["utf-8-sig", "utf-8", "cp949"])
+    args = parser.parse_args(argv)
+    
+    info = generate_chat(args.rows, args.output, args.duration, args.spikes, args.spam_bursts,
+                         args.seed, args.encoding)
+    # Planted events next to the CSV, for checking what the analyses find
+    with open(os.path.splitext(args.output)[0] + '.json', 'w', encoding='utf-8') as f:
+        json.dump(info, f, ensure_ascii=False, indent=2)
+    print(f"{args.rows:,}개 메시지 -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
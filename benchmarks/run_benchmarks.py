@@ -0,0 +1,384 @@
+"""
+Benchmark suite for the analysis pipeline
+
+Generates (once) synthetic chat logs of the requested sizes, runs every stage
+the GUI and CLI use on them and writes the timings to a JSON file, so runs on
+different commits can be compared.
+
+With --memory every size also gets one profiled pass recording the
+tracemalloc peak and RSS change of each stage and of the steps inside it
+(load.read, keyword.clean, density.bin, ...). --memory-budget turns those
+peaks into a gate: the run exits with status 1 when a stage goes over.
+
+Usage:
+    python benchmarks/run_benchmarks.py --rows 10000 100000 1000000
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/old.json
+    python benchmarks/run_benchmarks.py --rows 1000000 --memory-budget 500 keyword.clean=200
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, os.path.join(REPO_ROOT, 'src'))
+sys.path.insert(0, BENCHMARK_DIR)
+
+import numpy as np
+import pandas as pd
+
+from core import timing
+from core.analyzer import ChatAnalyzer
+from core.csv_loader import read_chat_csv
+from core.jobs import JobControl
+from core.sentiment_analyzer import SentimentAnalyzer
+from core.wordcloud_gen import WordCloudGenerator
+from core.exporters import EXPORTERS, ExportOptions, export_all
+from generate_chat import generate_chat
+
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+DEFAULT_DATA_DIR = os.path.join(BENCHMARK_DIR, 'data')
+DEFAULT_RESULTS_DIR = os.path.join(BENCHMARK_DIR, 'results')
+
+# Analysis settings shared by every run
+KEYWORD = 'ㅋㅋ'
+INTERVAL_MINUTES = 1.0
+WORDCLOUD_SIZE = (800, 400)
+
+
+class BenchmarkRun:
+    """State shared by the stages of one run over one log"""
+    
+    def __init__(self, csv_path: str, output_dir: str):
+        self.csv_path = csv_path
+        self.cp949_path = cp949_copy(csv_path)
+        self.output_dir = output_dir
+        self.analyzer = ChatAnalyzer()
+        self.sentiment = SentimentAnalyzer()
+        self.results: Dict[str, Dict] = {}
+
+
+def stage_load(run: BenchmarkRun):
+    run.analyzer.load_csv(run.csv_path)
+
+
+def stage_load_cp949(run: BenchmarkRun):
+    # The GUI's read path (progress through a JobControl) on an Excel-style
+    # export; it must give the same rows as the plain UTF-8 load
+    frame = read_chat_csv(run.cp949_path, JobControl())
+    if len(frame) != len(run.analyzer.dataset.store):
+        raise RuntimeError(f"cp949 CSV를 {len(frame):,}줄만 읽었습니다: {run.cp949_path}")
+
+
+def stage_keyword(run: BenchmarkRun):
+    run.results['keyword'] = run.analyzer.analyze_keyword(KEYWORD, INTERVAL_MINUTES)
+
+
+def stage_density(run: BenchmarkRun):
+    run.results['density'] = run.analyzer.analyze_chat_density(INTERVAL_MINUTES)
+
+
+def stage_donation(run: BenchmarkRun):
+    run.results['donation'] = run.analyzer.analyze_donations(INTERVAL_MINUTES)
+
+
+def stage_sentiment(run: BenchmarkRun):
+    frame = run.analyzer.get_analysis_frame()
+    run.sentiment.sentiment_results = run.sentiment.analyze_timeline(frame, INTERVAL_MINUTES)
+
+
+def stage_mood(run: BenchmarkRun):
+    run.sentiment.detect_mood_changes(threshold=0.3, min_change=0.2)
+
+
+def stage_wordcloud(run: BenchmarkRun):
+    width, height = WORDCLOUD_SIZE
+    generator = WordCloudGenerator(use_worker_process=False)
+    generator.generate_from_frequencies(run.analyzer.get_word_frequencies(),
+                                        width=width, height=height)
+
+
+def stage_export(run: BenchmarkRun):
+    analyzer = run.analyzer
+    tracks = [analyzer.density_markers(run.results['density']['results'])]
+    if run.results['keyword']['results'] is not None:
+        tracks.append(analyzer.keyword_markers(KEYWORD, run.results['keyword']['results']))
+    if run.results['donation']['results'] is not None:
+        tracks.append(analyzer.donation_markers(run.results['donation']['results']))
+    mood = run.sentiment.mood_markers()
+    if mood is not None:
+        tracks.append(mood)
+    export_all(tracks, list(EXPORTERS), run.output_dir, ExportOptions())
+
+
+# Run in this order, so each stage includes the derived data it is the first
+# to need (e.g. keyword includes cleaning every message)
+STAGES: List[Tuple[str, Callable[[BenchmarkRun], None]]] = [
+    ('load', stage_load),
+    ('load_cp949', stage_load_cp949),
+    ('keyword', stage_keyword),
+    ('density', stage_density),
+    ('donation', stage_donation),
+    ('sentiment', stage_sentiment),
+    ('mood', stage_mood),
+    ('wordcloud', stage_wordcloud),
+    ('export', stage_export),
+]
+
+
+def run_stages(csv_path: str) -> Dict[str, float]:
+    """One fresh pass over every stage, returning seconds per stage"""
+    timings = {}
+    with tempfile.TemporaryDirectory() as output_dir:
+        run = BenchmarkRun(csv_path, output_dir)
+        for name, stage in STAGES:
+            started = time.perf_counter()
+            stage(run)
+            timings[name] = time.perf_counter() - started
+    return timings
+
+
+def profile_memory(csv_path: str) -> Dict[str, Dict]:
+    """
+    One fresh pass with memory profiling, kept apart from the timed runs
+    because tracemalloc slows every allocation down
+    
+    Returns:
+        {stage or step name: {'peak_bytes', 'rss_delta_bytes'}}
+    """
+    timing.enable(memory=True)
+    try:
+        with tempfile.TemporaryDirectory() as output_dir:
+            run = BenchmarkRun(csv_path, output_dir)
+            with timing.collect(csv_path) as timings:
+                for name, stage in STAGES:
+                    with timing.span(name):
+                        stage(run)
+    finally:
+        timing.disable()
+    return timings.to_dict().get('memory', {})
+
+
+def dataset_path(rows: int, data_dir: str, seed: int = 0) -> str:
+    """Synthetic log of the given size, generated on first use"""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"chat_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        print(f"{rows:,}개 메시지 생성 중 -> {path}", file=sys.stderr)
+        generate_chat(rows, path, seed=seed)
+    return path
+
+
+def cp949_copy(path: str) -> str:
+    """cp949 (Korean Excel) copy of a generated log, written next to it on first use"""
+    stem, ext = os.path.splitext(path)
+    copy = f"{stem}_cp949{ext}"
+    if not os.path.exists(copy):
+        # Emoji and other characters cp949 lacks become '?'
+        pd.read_csv(path, dtype=str).to_csv(copy, index=False, encoding='cp949', errors='replace')
+    return copy
+
+
+def git_commit() -> Optional[str]:
+    """Short hash of HEAD, marked '+dirty' with uncommitted changes"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}+dirty" if dirty else commit
+
+
+def environment() -> Dict:
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def summarize(runs: List[float], rows: int) -> Dict:
+    best = min(runs)
+    return {
+        'best': round(best, 6),
+        'median': round(statistics.median(runs), 6),
+        'runs': [round(seconds, 6) for seconds in runs],
+        'rows_per_second': round(rows / best) if best > 0 else None,
+    }
+
+
+def run_benchmarks(rows_list: List[int], repeat: int = 3, data_dir: str = DEFAULT_DATA_DIR,
+                   progress: Optional[Callable[[str], None]] = None,
+                   memory: bool = False) -> Dict:
+    """
+    Time every stage on every log size
+    
+    Args:
+        rows_list: Log sizes in messages
+        repeat: Fresh runs per size (best and median are reported)
+        data_dir: Where generated logs are kept between benchmark runs
+        progress: Called with a line of text after each run
+        memory: Add one memory-profiled pass per size ('memory' in the report)
+        
+    Returns:
+        Report dictionary (see write_report)
+    """
+    results = {}
+    memory_results = {}
+    datasets = []
+    # Imports, regex compilation and font lookups happen once per process;
+    # a discarded pass keeps them out of the first measured run
+    run_stages(dataset_path(min(rows_list), data_dir))
+    
+    for rows in rows_list:
+        path = dataset_path(rows, data_dir)
+        datasets.append({'rows': rows, 'path': os.path.relpath(path, REPO_ROOT),
+                         'bytes': os.path.getsize(path)})
+        timings: Dict[str, List[float]] = {name: [] for name, _ in STAGES}
+        for i in range(repeat):
+            for name, seconds in run_stages(path).items():
+                timings[name].append(seconds)
+            if progress is not None:
+                total = sum(values[-1] for values in timings.values())
+                progress(f"{rows:,}개 메시지 {i + 1}/{repeat}: {total:.2f}초")
+        results[str(rows)] = {name: summarize(runs, rows) for name, runs in timings.items()}
+        if memory:
+            memory_results[str(rows)] = profile_memory(path)
+            if progress is not None:
+                progress(f"{rows:,}개 메시지 메모리 측정 완료")
+    
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'environment': environment(),
+        'repeat': repeat,
+        'datasets': datasets,
+        'results': results,
+    }
+    if memory:
+        report['memory'] = memory_results
+    return report
+
+
+def parse_budgets(specs: List[str]) -> Dict[str, float]:
+    """
+    Memory budgets in MB from "[STAGE=]MB" arguments
+    
+    A bare number applies to every stage without a budget of its own and is
+    stored under '*'.
+    """
+    budgets = {}
+    for spec in specs:
+        name, _, value = spec.rpartition('=')
+        try:
+            budgets[name or '*'] = float(value)
+        except ValueError:
+            raise ValueError(f"메모리 예산 형식이 잘못되었습니다: {spec} (예: 500, keyword.clean=200)")
+    return budgets
+
+
+def check_budgets(report: Dict, budgets: Dict[str, float]) -> List[str]:
+    """
+    Stages whose tracemalloc peak exceeds their budget
+    
+    Returns:
+        One line per violation (empty when everything fits)
+    """
+    violations = []
+    for rows, stages in report.get('memory', {}).items():
+        for name, stage in stages.items():
+            budget = budgets.get(name, budgets.get('*'))
+            if budget is not None and stage['peak_bytes'] > budget * timing.MB:
+                violations.append(f"{int(rows):,}개 메시지 {name}: "
+                                  f"{timing.format_bytes(stage['peak_bytes'])} > {budget:g}MB")
+    return violations
+
+
+def write_report(report: Dict, path: Optional[str] = None) -> str:
+    """Write the report as JSON (default: results/<time>-<commit>.json)"""
+    if path is None:
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(DEFAULT_RESULTS_DIR, f"{stamp}-{report['commit'] or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def format_table(report: Dict, baseline: Optional[Dict] = None) -> str:
+    """Best time per stage and size, with the speedup over a baseline report"""
+    lines = []
+    for rows, stages in report['results'].items():
+        lines.append(f"{int(rows):,}개 메시지")
+        old_stages = (baseline or {}).get('results', {}).get(rows, {})
+        for name, result in stages.items():
+            line = f"  {name:<10} {result['best']:9.3f}초"
+            old = old_stages.get(name)
+            if old is not None and result['best'] > 0:
+                line += f"  (이전 {old['best']:.3f}초, {old['best'] / result['best']:.2f}배)"
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def format_memory_table(report: Dict) -> str:
+    """Peak allocation and RSS change per stage and size"""
+    lines = []
+    for rows, stages in report.get('memory', {}).items():
+        lines.append(f"{int(rows):,}개 메시지 메모리 (최대 할당 / RSS 변화)")
+        lines += timing.format_memory_rows(stages)
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="분석 단계별 성능을 측정해 JSON으로 저장합니다.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS,
+                        help="측정할 메시지 수 (기본: 10000 100000 1000000)")
+    parser.add_argument("--repeat", type=int, default=3, help="크기마다 반복 횟수 (기본: 3)")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="생성한 CSV를 보관할 폴더")
+    parser.add_argument("-o", "--output", default=None, help="결과 JSON 경로")
+    parser.add_argument("--compare", default=None, metavar="JSON", help="비교할 이전 결과 JSON")
+    parser.add_argument("--memory", action="store_true",
+                        help="단계별 최대 메모리 할당과 RSS 변화도 측정")
+    parser.add_argument("--memory-budget", nargs="+", default=[], metavar="[STAGE=]MB",
+                        help="단계별 최대 할당 한도(MB), 넘으면 실패 (--memory 포함)")
+    args = parser.parse_args(argv)
+    try:
+        budgets = parse_budgets(args.memory_budget)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    report = run_benchmarks(args.rows, args.repeat, args.data_dir,
+                            progress=lambda line: print(line, file=sys.stderr),
+                            memory=args.memory or bool(budgets))
+    path = write_report(report, args.output)
+    
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print(format_table(report, baseline))
+    if 'memory' in report:
+        print(format_memory_table(report))
+    print(f"-> {path}")
+    
+    violations = check_budgets(report, budgets)
+    for line in violations:
+        print(f"메모리 예산 초과: {line}", file=sys.stderr)
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
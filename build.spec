@@ -38,10 +38,34 @@ a = Analysis(
         'ui',
         'ui.main_window',
         'ui.styles',
+        'ui.plot_decimation',
+        'ui.workers',
+        'ui.export_dialog',
+        'ui.plotting',
         'core',
         'core.analyzer',
+        'core.csv_loader',
+        'core.chat_store',
+        'core.chat_file',
+        'core.binning',
+        'core.changepoints',
+        'core.detectors',
+        'core.highlights',
+        'core.spam_filter',
         'core.wordcloud_gen',
         'core.sentiment_analyzer',
+        'core.decimation',
+        'core.jobs',
+        'core.timing',
+        'core.result_store',
+        'core.comparison',
+        'core.word_frequency',
+        'core.token_index',
+        'core.markers',
+        'core.exporters',
+        'core.segments',
+        'core.marker_timeline',
+        'core.fonts',
     ] + matplotlib_hiddenimports + pillow_hiddenimports + wordcloud_hiddenimports,
     hookspath=['hooks'],
     hooksconfig={},
@@ -79,7 +103,8 @@ coll = COLLECT(
     a.zipfiles,
     a.datas,
     strip=False,
-    upx=True,
+    # Compressed DLLs are unpacked on every launch, which slows startup
+    upx=False,
     upx_exclude=[],
     name='ChzzkClipMomentCatcher',
 )
@@ -0,0 +1,395 @@
+"""
+Chzzk Chat Analyzer - Command Line Entry Point (no Qt required)
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.analyzer import ChatAnalyzer
+from core.chat_file import CHAT_FILE_SUFFIX
+from core.exporters import EXPORTERS
+from core.detectors import DEFAULT_DETECTOR, DETECTORS, get_detector
+from core.jobs import JobControl
+from core.marker_timeline import DEFAULT_TOLERANCE
+from core.pipeline import ANALYSES, DEFAULT_ANALYSES, PipelineSettings, run_pipeline
+from core.changepoints import DEFAULT_PENALTY, METHODS
+from core.highlights import DEFAULT_WEIGHTS, SIGNALS, HighlightOptions
+from core.spam_filter import SpamOptions
+from core.timing import format_report
+from core.markers import format_hms
+from core.result_store import MOMENT_KINDS, ResultStore
+from core.comparison import compare_streams, top_moments
+from core.batch import collect_inputs, output_dirs, run_batch
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Command line options"""
+    parser = argparse.ArgumentParser(
+        prog="chzzk-analyzer",
+        description="치지직 채팅 CSV를 분석해 편집용 마커와 워드클라우드 PNG를 저장합니다."
+    )
+    parser.add_argument("inputs", nargs="*", metavar="CSV",
+                        help=f"채팅 CSV 또는 {CHAT_FILE_SUFFIX} 파일, 폴더 또는 glob 패턴 (여러 개면 일괄 처리)")
+    parser.add_argument("-o", "--output", default="output", help="결과 저장 폴더 (기본: output)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="일괄 처리 작업 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("-a", "--analyses", nargs="+", choices=ANALYSES, default=None,
+                        help=f"실행할 분석 (기본: {' '.join(DEFAULT_ANALYSES)})")
+    parser.add_argument("-k", "--keywords", nargs="+", default=[], help="키워드 분석에 쓸 키워드")
+    parser.add_argument("-i", "--interval", type=float, default=1.0, help="구간 간격(분) (기본: 1)")
+    parser.add_argument("-s", "--sensitivity", type=float, default=2.0,
+                        help="민감도 Z-Score (1.0=낮음, 2.0=보통, 3.0=높음)")
+    parser.add_argument("--detector", choices=list(DETECTORS), default=DEFAULT_DETECTOR,
+                        help="하이라이트 구간 감지 방식: "
+                             + ", ".join(f"{name}={detector.label}" for name, detector in DETECTORS.items())
+                             + f" (기본: {DEFAULT_DETECTOR})")
+    parser.add_argument("--detector-param", nargs="+", default=[], metavar="KEY=VALUE",
+                        help="감지기 설정 (예: window=10 min_scale=2)")
+    parser.add_argument("--sentiment-interval", type=float, default=1.0,
+                        help="분위기 분석 간격(분) (기본: 1)")
+    parser.add_argument("--top-moods", type=int, default=10, help="내보낼 분위기 변화 수 (기본: 10)")
+    
+    changepoint = parser.add_argument_group("변화점 (-a changepoint)")
+    changepoint.add_argument("--cp-method", choices=list(METHODS), default='pelt',
+                             help="초당 채팅·분위기 변화점 탐색 방법 (기본: pelt)")
+    changepoint.add_argument("--cp-penalty", type=float, default=DEFAULT_PENALTY,
+                             help=f"변화 하나당 벌점, 클수록 큰 변화만 남음 (기본: {DEFAULT_PENALTY:g})")
+    changepoint.add_argument("--cp-min-seconds", type=int, default=60,
+                             help="가장 짧은 구간(초) (기본: 60)")
+    
+    highlight = parser.add_argument_group("하이라이트 (-a highlight)")
+    highlight.add_argument("--top", type=int, default=20, metavar="N",
+                           help="모든 신호를 합친 점수로 고를 하이라이트 수 (기본: 20)")
+    highlight.add_argument("--weights", nargs="+", default=[], metavar="SIGNAL=WEIGHT",
+                           help="신호 가중치, 0이면 제외 (기본: "
+                                + " ".join(f"{name}={DEFAULT_WEIGHTS[name]:g}" for name in SIGNALS)
+                                + ")")
+    highlight.add_argument("--highlight-bin", type=int, default=30, metavar="SECONDS",
+                           help="점수를 매길 구간 크기(초) (기본: 30)")
+    highlight.add_argument("--highlight-gap", type=float, default=None, metavar="SECONDS",
+                           help="하이라이트 사이 최소 간격(초) (기본: 구간 크기의 4배)")
+    
+    spam = parser.add_argument_group("도배 필터")
+    spam.add_argument("--filter-spam", action="store_true",
+                      help="같은 사람의 반복 도배와 여러 사람의 복붙을 한 메시지 정도로만 세기 "
+                           "(채팅 밀도, 키워드, 하이라이트 분석)")
+    spam.add_argument("--spam-window", type=int, default=30, metavar="SECONDS",
+                      help="반복을 세는 구간(초) (기본: 30)")
+    spam.add_argument("--spam-repeats", type=int, default=1, metavar="N",
+                      help="한 사람이 구간마다 같은 메시지를 그대로 셀 횟수 (기본: 1)")
+    spam.add_argument("--spam-copies", type=int, default=5, metavar="N",
+                      help="같은 메시지를 이만큼의 사람이 보내면 복붙으로 봄 (기본: 5)")
+    spam.add_argument("--spam-min-chars", type=int, default=8, metavar="N",
+                      help="복붙으로 볼 가장 짧은 메시지 글자 수, ㅋㅋ 같은 짧은 반응은 제외 (기본: 8)")
+    spam.add_argument("--spam-exact", action="store_true",
+                      help="몇 글자 다른 비슷한 메시지는 묶지 않고 똑같은 메시지만 묶기")
+    
+    markers = parser.add_argument_group("마커")
+    markers.add_argument("-f", "--formats", nargs="+", choices=list(EXPORTERS),
+                         default=['premiere_csv'], help="마커 형식 (기본: premiere_csv)")
+    markers.add_argument("--fps", type=float, default=30.0, help="타임코드 프레임 레이트 (기본: 30)")
+    markers.add_argument("--clips", action="store_true",
+                         help="구간을 하이라이트 클립(In/Out)으로 묶기")
+    markers.add_argument("--gap", type=float, default=30.0, help="묶을 간격(초) (기본: 30)")
+    markers.add_argument("--pre-roll", type=float, default=10.0, help="앞 여유(초) (기본: 10)")
+    markers.add_argument("--post-roll", type=float, default=10.0, help="뒤 여유(초) (기본: 10)")
+    markers.add_argument("--combine", type=float, nargs="?", const=DEFAULT_TOLERANCE, default=None,
+                         metavar="SECONDS",
+                         help=f"모든 분석을 하나의 마커 파일로 합치기 (중복 간격, 기본: {DEFAULT_TOLERANCE:g}초)")
+    
+    wordcloud = parser.add_argument_group("워드클라우드")
+    wordcloud.add_argument("--size", type=int, nargs=2, default=[1600, 800],
+                           metavar=("WIDTH", "HEIGHT"), help="이미지 크기 (기본: 1600 800)")
+    wordcloud.add_argument("--max-words", type=int, default=200, help="최대 단어 수 (기본: 200)")
+    wordcloud.add_argument("--spike-wordclouds", type=int, default=0, metavar="N",
+                           help="채팅이 가장 많은 N개 구간의 워드클라우드도 저장")
+    
+    results = parser.add_argument_group("결과 DB")
+    results.add_argument("--db", default=None, metavar="FILE",
+                         help="분석 결과(구간별 집계, 하이라이트 순간)를 기록하고 검색할 SQLite 파일")
+    results.add_argument("--query", action="store_true",
+                         help="CSV 없이 --db에 기록된 순간 검색 (-k로 키워드 지정)")
+    results.add_argument("--compare", action="store_true",
+                         help="CSV 없이 --db의 방송들을 시청자 규모와 평소 채팅 속도로 정규화해 순간 순위 비교 "
+                              "(-k로 키워드, -i로 구간 간격 지정)")
+    results.add_argument("--per-stream", type=int, default=None, metavar="N",
+                         help="비교 순위에 방송마다 최대 N개만 표시")
+    results.add_argument("--kind", choices=MOMENT_KINDS, default=None, help="검색할 순간 종류")
+    results.add_argument("--since", default=None, metavar="DATE", help="방송 날짜 시작 (예: 2026-10-01)")
+    results.add_argument("--until", default=None, metavar="DATE", help="방송 날짜 끝 (해당 날짜 포함)")
+    results.add_argument("--min-score", type=float, default=None, help="최소 Z-Score")
+    results.add_argument("--limit", type=int, default=50, help="최대 결과 수 (기본: 50)")
+    
+    parser.add_argument("--convert", action="store_true",
+                        help=f"분석 없이 입력을 바로 열 수 있는 {CHAT_FILE_SUFFIX} 파일로 변환해 저장")
+    parser.add_argument("--timing", nargs="?", const="", default=None, metavar="LOG",
+                        help="단계별 소요 시간 출력 (LOG를 주면 JSON lines로도 기록)")
+    parser.add_argument("--memory", action="store_true",
+                        help="단계별 최대 메모리 할당과 RSS 변화 출력 (느려짐)")
+    parser.add_argument("--json", action="store_true", help="요약을 JSON으로 출력")
+    parser.add_argument("-q", "--quiet", action="store_true", help="진행 상황 출력 안 함")
+    return parser
+
+
+def parse_detector_params(items) -> dict:
+    """KEY=VALUE options to detector parameters (numbers and true/false are converted)"""
+    params = {}
+    for item in items:
+        key, sep, value = item.partition('=')
+        if not sep or not key:
+            raise ValueError(f"감지기 설정은 KEY=VALUE 형식이어야 합니다: {item}")
+        if value.lower() in ('true', 'false'):
+            params[key] = value.lower() == 'true'
+            continue
+        try:
+            params[key] = int(value)
+        except ValueError:
+            try:
+                params[key] = float(value)
+            except ValueError:
+                params[key] = value
+    return params
+
+
+def parse_weights(items) -> dict:
+    """SIGNAL=WEIGHT options to highlight weights"""
+    weights = {}
+    for item in items:
+        name, sep, value = item.partition('=')
+        try:
+            weights[name] = float(value)
+        except ValueError:
+            raise ValueError(f"가중치는 SIGNAL=WEIGHT 형식이어야 합니다: {item}") from None
+        if not sep or weights[name] < 0:
+            raise ValueError(f"가중치는 SIGNAL=WEIGHT 형식이어야 합니다: {item}")
+    return weights
+
+
+def spam_filter_from_args(args: argparse.Namespace):
+    """SpamOptions arguments of --filter-spam (None without it)"""
+    if not args.filter_spam:
+        return None
+    return {'window_seconds': args.spam_window, 'max_repeats': args.spam_repeats,
+            'min_copies': args.spam_copies, 'min_chars': args.spam_min_chars,
+            'near_duplicates': not args.spam_exact}
+
+
+def settings_from_args(args: argparse.Namespace) -> PipelineSettings:
+    """Translate parsed options into pipeline settings"""
+    segments = None
+    if args.clips:
+        segments = {'max_gap': args.gap, 'pre_roll': args.pre_roll, 'post_roll': args.post_roll}
+    
+    return PipelineSettings(
+        analyses=args.analyses or DEFAULT_ANALYSES,
+        keywords=args.keywords,
+        interval_minutes=args.interval,
+        sensitivity=args.sensitivity,
+        detector=args.detector,
+        detector_params=parse_detector_params(args.detector_param),
+        sentiment_interval=args.sentiment_interval,
+        mood_top_n=args.top_moods,
+        changepoint_method=args.cp_method,
+        changepoint_penalty=args.cp_penalty,
+        changepoint_min_seconds=args.cp_min_seconds,
+        highlight_top_n=args.top,
+        highlight_seconds=args.highlight_bin,
+        highlight_weights=parse_weights(args.weights),
+        highlight_gap=args.highlight_gap,
+        spam_filter=spam_filter_from_args(args),
+        formats=args.formats,
+        fps=args.fps,
+        segments=segments,
+        combine_tolerance=args.combine,
+        wordcloud_size=args.size,
+        max_words=args.max_words,
+        spike_wordclouds=args.spike_wordclouds,
+        record_timings=args.timing is not None,
+        timing_log=os.path.abspath(args.timing) if args.timing else None,
+        record_memory=args.memory,
+        result_db=os.path.abspath(args.db) if args.db else None
+    )
+
+
+def print_progress(percent: int, message: str):
+    print(f"[{percent:3d}%] {message}", file=sys.stderr)
+
+
+def print_summary(summary: dict):
+    """Human readable summary"""
+    print(f"{summary['file']}: {summary['messages']:,}개 메시지")
+    for name, result in summary['analyses'].items():
+        details = ", ".join(f"{key}={value}" for key, value in result.items())
+        print(f"  {name}: {details}")
+    for path in summary['outputs']:
+        print(f"  -> {path}")
+
+
+def print_timings(timings: dict):
+    """Per-stage table of a summary's 'timings'"""
+    print(format_report(timings), file=sys.stderr)
+
+
+def print_batch_progress(done: int, total: int, entry: dict):
+    status = "완료" if entry['status'] == 'ok' else f"실패 ({entry['error']})"
+    print(f"[{done}/{total}] {entry['file']}: {status}", file=sys.stderr)
+
+
+def run_batch_mode(csv_paths, args) -> int:
+    """Process several logs in parallel and report the manifest"""
+    manifest = run_batch(
+        csv_paths, args.output, settings_from_args(args), workers=args.workers,
+        progress_callback=None if args.quiet else print_batch_progress
+    )
+    
+    if args.json:
+        print(json.dumps(manifest, ensure_ascii=False, indent=2))
+    else:
+        print(f"{manifest['total']}개 중 {manifest['succeeded']}개 완료, "
+              f"{manifest['failed']}개 실패 ({manifest['seconds']:.1f}초)")
+        for entry in manifest['files']:
+            if entry['status'] != 'ok':
+                print(f"  실패: {entry['file']}: {entry['error']}")
+        print(f"  -> {args.output}")
+    return 0 if manifest['failed'] == 0 else 2
+
+
+def run_convert_mode(paths, args) -> int:
+    """Convert logs into memory-mapped chat files in the output folder"""
+    os.makedirs(args.output, exist_ok=True)
+    targets = output_dirs(paths, args.output)
+    failed = 0
+    for path in paths:
+        target = targets[path] + CHAT_FILE_SUFFIX
+        analyzer = ChatAnalyzer()
+        try:
+            count = analyzer.load(path)
+            analyzer.save_chat_file(target)
+        except Exception as e:
+            print(f"실패: {path}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        if not args.quiet:
+            print(f"{path}: {count:,}개 메시지 -> {target}")
+    return 0 if failed == 0 else 2
+
+
+def run_query_mode(args) -> int:
+    """Search the moments recorded in a result store"""
+    if not os.path.exists(args.db):
+        print(f"결과 DB가 없습니다: {args.db}", file=sys.stderr)
+        return 1
+    with ResultStore(args.db) as store:
+        # Several keywords are ranked and limited as one list
+        moments = store.find_moments(args.keywords or None, args.kind, args.since, args.until,
+                                     args.min_score, limit=args.limit)
+    
+    if args.json:
+        print(moments.to_json(orient='records', force_ascii=False, indent=2))
+        return 0
+    if len(moments) == 0:
+        print("조건에 맞는 순간이 없습니다.")
+        return 0
+    for row in moments.itertuples(index=False):
+        what = f"{row.kind}:{row.keyword}" if row.keyword else row.kind
+        score = f"z={row.score:.2f}" if pd.notna(row.score) else ""
+        print(f"{row.streamed_at[:10]}  {row.name}  {format_hms(row.start_seconds)}  "
+              f"{what}  {row.value:g}  {score}".rstrip())
+    return 0
+
+
+def run_compare_mode(args) -> int:
+    """Rank the moments of every VOD in a result store on a shared scale"""
+    if not os.path.exists(args.db):
+        print(f"결과 DB가 없습니다: {args.db}", file=sys.stderr)
+        return 1
+    keyword = args.keywords[0] if args.keywords else None
+    try:
+        with ResultStore(args.db) as store:
+            ranked = compare_streams(store, keyword, int(round(args.interval * 60)),
+                                     args.since, args.until)
+    except ValueError as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+    top = top_moments(ranked, args.limit, args.per_stream)
+    
+    if args.json:
+        print(top.to_json(orient='records', force_ascii=False, indent=2))
+        return 0
+    if len(top) == 0:
+        print("비교할 방송이 없습니다.")
+        return 0
+    print(f"{ranked['vod_id'].nunique()}개 방송 비교 ({'키워드 ' + keyword if keyword else '채팅 수'})")
+    for row in top.itertuples(index=False):
+        print(f"{row.streamed_at[:10]}  {row.name}  {format_hms(row.time_seconds)}  "
+              f"{row.value:g}개  평소의 {row.lift:.1f}배  참여자 1000명당 {row.per_1k:.0f}  "
+              f"점수 {row.score:.2f}")
+    return 0
+
+
+def main(argv=None) -> int:
+    """Command line entry point"""
+    multiprocessing.freeze_support()
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.query:
+        if not args.db:
+            parser.error("--query에는 --db가 필요합니다.")
+        return run_query_mode(args)
+    if args.compare:
+        if not args.db:
+            parser.error("--compare에는 --db가 필요합니다.")
+        return run_compare_mode(args)
+    if not args.inputs:
+        parser.error("분석할 CSV를 지정하세요.")
+    if args.analyses and 'keyword' in args.analyses and not args.keywords:
+        parser.error("키워드 분석에는 --keywords가 필요합니다.")
+    try:
+        # Fail before loading anything when a parameter is unknown or missing
+        detector = get_detector(args.detector)
+        params = parse_detector_params(args.detector_param)
+        if detector.accepts('sensitivity'):
+            params.setdefault('sensitivity', args.sensitivity)
+        detector.bind(params)
+        HighlightOptions(weights=parse_weights(args.weights))
+        if args.filter_spam:
+            SpamOptions(**spam_filter_from_args(args))
+    except ValueError as e:
+        parser.error(str(e))
+    
+    # Several files, a folder or a glob pattern switch to batch mode
+    csv_paths = collect_inputs(args.inputs)
+    if not csv_paths:
+        print("처리할 CSV 파일이 없습니다.", file=sys.stderr)
+        return 1
+    if args.convert:
+        return run_convert_mode(csv_paths, args)
+    if len(args.inputs) > 1 or csv_paths != [os.path.normpath(args.inputs[0])]:
+        return run_batch_mode(csv_paths, args)
+    
+    control = None if args.quiet else JobControl(progress_callback=print_progress)
+    try:
+        summary = run_pipeline(csv_paths[0], args.output, settings_from_args(args), control)
+    except Exception as e:
+        print(f"오류: {e}", file=sys.stderr)
+        return 1
+    
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print_summary(summary)
+    if 'timings' in summary:
+        print_timings(summary['timings'])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
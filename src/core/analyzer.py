@@ -2,29 +2,186 @@
 Chat Analyzer - Core Analysis Logic
 """
 import pandas as pd
+import numpy as np
 import re
-from typing import Optional, Dict, List
+import threading
+from typing import Any, Optional, Dict, List, Callable, Sequence
+
+from core import timing
+from core.jobs import JobControl, apply_chunked, report_progress
+from core.csv_loader import read_chat_csv
+from core.chat_store import ChatStore
+from core.binning import BinEngine
+from core.detectors import DEFAULT_DETECTOR, detect, get_detector
+from core.changepoints import DEFAULT_PENALTY, find_segments, segment_track
+from core.sentiment_analyzer import SentimentAnalyzer
+from core.spam_filter import SpamOptions, SpamScan, scan_messages
+from core.chat_file import is_chat_file, open_chat_file, write_chat_file
+from core.word_frequency import count_tokens
+from core.token_index import TokenBinIndex
+from core.markers import MarkerTrack
+from core.segments import SegmentOptions, build_segments
+from core.exporters import ExportOptions, export_track
+
+
+# Donation messages start with e.g. [후원 1000치즈]
+DONATION_PATTERN = r'\[후원 (\d+)치즈\]'
+
+# Emoticons are written as {:name:}
+EMOTE_PATTERN = rb'\{:[^:]+:\}'
+
+# Per-bin metrics bin_aggregates can compute (plus one column per keyword)
+BIN_METRICS = ('messages', 'chatters', 'donations', 'donation_amount', 'emotes')
+
+
+class ChatDataset:
+    """
+    A loaded chat log plus lazily derived data
+    
+    The messages live in a compact ChatStore. Derived series (cleaned messages,
+    token counts) are computed once and kept next to it, so analyses never
+    mutate the loaded data and can run concurrently.
+    """
+    
+    def __init__(self, store: ChatStore):
+        self.store = store
+        self._derived: Dict[str, Any] = {}
+        # One lock per derived value, so unrelated values compute side by side;
+        # _lock only guards the lock table itself
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+    
+    def derived(self, name: str, compute: Callable[[], Any]) -> Any:
+        """Get a derived value, computing it on first use"""
+        series = self._derived.get(name)
+        if series is not None:
+            return series
+        
+        with self._lock:
+            key_lock = self._key_locks.setdefault(name, threading.Lock())
+        
+        with key_lock:
+            # Another thread may have finished it while we waited
+            series = self._derived.get(name)
+            if series is None:
+                series = compute()
+                self._derived[name] = series
+            return series
 
 
 class ChatAnalyzer:
     """Analyzes Chzzk chat CSV files"""
     
     def __init__(self):
-        self.df: Optional[pd.DataFrame] = None
+        self.dataset: Optional[ChatDataset] = None
+        # Results currently shown in the UI (used as the default for exports)
         self.keyword_results: Optional[pd.DataFrame] = None
     
-    def load_csv(self, file_path: str) -> int:
+    @property
+    def df(self) -> Optional[pd.DataFrame]:
+        """Loaded chat as a DataFrame (built once per dataset and shared; don't modify it)"""
+        dataset = self.dataset
+        if dataset is None:
+            return None
+        return dataset.derived('frame', lambda: dataset.store.to_frame(self.seconds_to_time))
+    
+    @df.setter
+    def df(self, df: Optional[pd.DataFrame]):
+        if df is None:
+            self.dataset = None
+        else:
+            self.dataset = ChatDataset(ChatStore.from_frame(df, self.time_to_seconds))
+    
+    def read_csv(self, file_path: str, control: Optional[JobControl] = None) -> ChatDataset:
+        """
+        Read a CSV file without replacing the loaded data
+        
+        Args:
+            file_path: Path to CSV file
+            control: Optional job control for progress and cancellation
+            
+        Returns:
+            Dataset of the file
+        """
+        with timing.span('load.read'):
+            df = read_chat_csv(file_path, control)
+        with timing.span('load.store'):
+            store = ChatStore.from_frame(df, self.time_to_seconds)
+        return ChatDataset(store)
+    
+    def read_chat_file(self, file_path: str, control: Optional[JobControl] = None) -> ChatDataset:
+        """
+        Open a converted chat file without replacing the loaded data
+        
+        The file is memory-mapped, nothing is parsed.
+        
+        Args:
+            file_path: Path written by save_chat_file
+            control: Optional job control for progress and cancellation
+            
+        Returns:
+            Dataset of the file
+        """
+        report_progress(control, 0, "파일 여는 중")
+        with timing.span('load.open'):
+            store = open_chat_file(file_path)
+        report_progress(control, 100, "파일 여는 중")
+        return ChatDataset(store)
+    
+    def read(self, file_path: str, control: Optional[JobControl] = None) -> ChatDataset:
+        """
+        Read a chat CSV or a converted chat file, whichever file_path is,
+        without replacing the loaded data
+        
+        Jobs that may be superseded read with this and let the caller decide
+        whether the dataset becomes the loaded one.
+        """
+        if is_chat_file(file_path):
+            return self.read_chat_file(file_path, control)
+        return self.read_csv(file_path, control)
+    
+    def load_csv(self, file_path: str, control: Optional[JobControl] = None) -> int:
         """
         Load CSV file and return number of messages
         
         Args:
             file_path: Path to CSV file
+            control: Optional job control for progress and cancellation
             
         Returns:
             Number of messages loaded
         """
-        self.df = pd.read_csv(file_path)
-        return len(self.df)
+        # Only replace the loaded data once the whole file was read
+        self.dataset = self.read_csv(file_path, control)
+        return len(self.dataset.store)
+    
+    def load_chat_file(self, file_path: str, control: Optional[JobControl] = None) -> int:
+        """
+        Open a converted chat file (memory-mapped, nothing is parsed)
+        
+        Args:
+            file_path: Path written by save_chat_file
+            control: Optional job control for progress and cancellation
+            
+        Returns:
+            Number of messages loaded
+        """
+        self.dataset = self.read_chat_file(file_path, control)
+        return len(self.dataset.store)
+    
+    def load(self, file_path: str, control: Optional[JobControl] = None) -> int:
+        """Load a chat CSV or a converted chat file, whichever file_path is"""
+        self.dataset = self.read(file_path, control)
+        return len(self.dataset.store)
+    
+    def save_chat_file(self, file_path: str):
+        """
+        Save the loaded chat in the memory-mapped format for instant reopening
+        
+        Args:
+            file_path: Output path (conventionally ending in CHAT_FILE_SUFFIX)
+        """
+        write_chat_file(self._require_dataset().store, file_path)
     
     def time_to_seconds(self, time_str: str) -> int:
         """Convert HH:MM:SS to seconds"""
@@ -57,7 +214,244 @@ class ChatAnalyzer:
         
         return message.strip()
     
-    def analyze_keyword(self, keyword: str, interval_minutes: float, sensitivity: float = 2.0) -> Dict:
+    def _require_dataset(self) -> ChatDataset:
+        """Snapshot the loaded dataset (a reload mid-analysis won't affect it)"""
+        dataset = self.dataset
+        if dataset is None:
+            raise ValueError("No CSV loaded")
+        return dataset
+    
+    def get_seconds(self, dataset: Optional[ChatDataset] = None) -> pd.Series:
+        """Playback time of every message in seconds (a view of the store's array)"""
+        dataset = dataset or self._require_dataset()
+        return dataset.derived('seconds', lambda: pd.Series(dataset.store.seconds, copy=False))
+    
+    def get_clean_messages(self, dataset: Optional[ChatDataset] = None,
+                           control: Optional[JobControl] = None,
+                           start: float = 30, end: float = 80) -> pd.Series:
+        """Cleaned text of every message (cached per dataset)"""
+        dataset = dataset or self._require_dataset()
+        return dataset.derived('clean_message', lambda: apply_chunked(
+            dataset.store.message_series(), self.clean_message, control, start, end,
+            "메시지 정리 중"
+        ))
+    
+    def get_sentiment_scores(self, control: Optional[JobControl] = None) -> pd.Series:
+        """
+        Sentiment score of every message (cached per dataset)
+        
+        Scoring is the slowest step of any analysis, so the sentiment
+        timeline, its change points and the highlight score share one pass.
+        """
+        dataset = self._require_dataset()
+        return dataset.derived('sentiment_scores', lambda: SentimentAnalyzer().score_messages(
+            self.get_clean_messages(dataset, control, 0, 20), control
+        ))
+    
+    def get_spam_scan(self, options: Optional[SpamOptions] = None,
+                      dataset: Optional[ChatDataset] = None,
+                      control: Optional[JobControl] = None) -> SpamScan:
+        """
+        Repeat floods and copy-paste waves of the loaded log (cached per options)
+        
+        Donations and system messages are never flagged.
+        
+        Args:
+            options: Flood thresholds (defaults to SpamOptions())
+            dataset: Dataset snapshot (defaults to the loaded one)
+            control: Optional job control for progress and cancellation
+        """
+        dataset = dataset or self._require_dataset()
+        options = options or SpamOptions()
+        
+        def compute() -> SpamScan:
+            store = dataset.store
+            exempt = (self.get_donation_amounts(dataset).notna().to_numpy()
+                      | store.nickname_mask('[SYSTEM]'))
+            with timing.span('spam.scan'):
+                return scan_messages(store.seconds, store.nick_codes, store.message_series(),
+                                     exempt, options, control)
+        
+        return dataset.derived(f'spam:{options.key()}', compute)
+    
+    def get_analysis_frame(self, control: Optional[JobControl] = None) -> pd.DataFrame:
+        """
+        Build a new DataFrame with 'seconds' and 'clean_message' columns
+        
+        The loaded data is not modified; the frame can be handed to other analyzers.
+        """
+        dataset = self._require_dataset()
+        with timing.span('frame'):
+            return pd.DataFrame({
+                'seconds': self.get_seconds(dataset),
+                'clean_message': self.get_clean_messages(dataset, control, 20, 50),
+            })
+    
+    def _significant_bins(self, counts: pd.Series, sensitivity: float,
+                          detector: str = DEFAULT_DETECTOR,
+                          detector_params: Optional[Dict] = None) -> Dict:
+        """
+        Filter per-interval counts into a new results DataFrame
+        
+        Args:
+            counts: Feature series (see get_feature)
+            sensitivity: Passed to detectors that take a sensitivity, unless
+                detector_params sets one
+            detector: Registered detector key (core.detectors)
+            detector_params: Further detector parameters
+        """
+        params = dict(detector_params or {})
+        if get_detector(detector).accepts('sensitivity'):
+            params.setdefault('sensitivity', sensitivity)
+        detection = detect(detector, counts, params)
+        
+        results = pd.DataFrame({
+            'time_seconds': detection.moments['time_seconds'].astype(int),
+            'count': detection.moments['value'],
+            'score': detection.moments['score']
+        })
+        results['time_str'] = results['time_seconds'].apply(self.seconds_to_time)
+        
+        # Find peak time
+        if len(results) > 0:
+            peak_idx = results['count'].idxmax()
+            peak_time = results.loc[peak_idx, 'time_str']
+        else:
+            peak_time = None
+        
+        return {
+            'results': results,
+            'peak_time': peak_time,
+            'detector': detector,
+            'threshold': detection.stats.get('threshold'),
+            'mean': detection.stats.get('mean'),
+            'std': detection.stats.get('std')
+        }
+    
+    def get_bin_engine(self, interval_seconds: int, closed: str = 'left',
+                       dataset: Optional[ChatDataset] = None) -> BinEngine:
+        """
+        Bin layout of the loaded messages (cached per dataset and bin size)
+        
+        Args:
+            interval_seconds: Bin size in seconds
+            closed: See BinEngine.from_seconds; the Z-Score analyses use 'right'
+            dataset: Dataset snapshot (defaults to the loaded one)
+        """
+        dataset = dataset or self._require_dataset()
+        return dataset.derived(f'bins_{closed}_{int(interval_seconds)}', lambda: BinEngine.from_seconds(
+            dataset.store.seconds, interval_seconds, closed
+        ))
+    
+    def _interval_totals(self, dataset: ChatDataset, interval_minutes: float,
+                         columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """
+        Per-interval sums over every interval of the stream
+        
+        Args:
+            dataset: Dataset snapshot
+            interval_minutes: Interval size
+            columns: Per-message values to sum (booleans and integers stay integers)
+            
+        Returns:
+            DataFrame indexed by interval start in seconds, one column per entry
+            of columns (intervals without a counted message hold 0)
+        """
+        engine = self.get_bin_engine(int(interval_minutes * 60), 'right', dataset)
+        sums = engine.sums(columns)
+        totals = {}
+        for name, column in columns.items():
+            values = sums[name]
+            if column.dtype == bool or np.issubdtype(column.dtype, np.integer):
+                values = values.astype(np.int64)
+            totals[name] = values
+        return pd.DataFrame(totals, index=pd.Index(engine.starts))
+    
+    def get_keyword_mask(self, keyword: str, dataset: Optional[ChatDataset] = None,
+                         control: Optional[JobControl] = None) -> np.ndarray:
+        """
+        Cleaned messages containing keyword (case-insensitive, cached per dataset)
+        
+        Shared by the keyword analysis and bin_aggregates, so recording a
+        keyword's per-bin counts after analyzing it does not search again.
+        """
+        dataset = dataset or self._require_dataset()
+        
+        def compute() -> np.ndarray:
+            clean_messages = self.get_clean_messages(dataset, control, 30, 80)
+            # Escape regex special chars
+            return clean_messages.str.contains(re.escape(keyword), case=False, na=False,
+                                               regex=True).to_numpy()
+        
+        return dataset.derived(f'keyword_mask:{keyword}', compute)
+    
+    def get_feature(self, name: str, interval_minutes: float,
+                    dataset: Optional[ChatDataset] = None,
+                    control: Optional[JobControl] = None,
+                    spam_filter: Optional[SpamOptions] = None) -> pd.Series:
+        """
+        Per-interval values of one feature (cached per dataset and interval)
+        
+        Detectors (core.detectors) only read these, so trying another detector
+        or sensitivity on the same interval never bins the log again.
+        
+        Args:
+            name: 'density' (messages), 'keyword:<keyword>' (messages containing
+                it), 'donation' (cheese total) or 'donations' (donation count)
+            interval_minutes: Interval size
+            dataset: Dataset snapshot (defaults to the loaded one)
+            control: Optional job control for progress and cancellation
+            spam_filter: Count messages by their flood weight (see
+                get_spam_scan), rounded to whole messages; donations are
+                never flagged, so it doesn't change their features
+                
+        Returns:
+            Series indexed by interval start in seconds, holding every interval
+            of the stream; intervals without a counted message hold 0 and take
+            part in the detector statistics, like the categorical groupby
+            this replaced
+        """
+        dataset = dataset or self._require_dataset()
+        interval_seconds = int(interval_minutes * 60)
+        
+        def effective(counted: Optional[np.ndarray]) -> pd.Series:
+            # Flood weights summed per interval
+            weights = self.get_spam_scan(spam_filter, dataset, control).weights
+            if counted is not None:
+                weights = np.where(counted, weights, 0.0)
+            totals = self._interval_totals(dataset, interval_minutes, {'count': weights})
+            return np.rint(totals['count']).astype(np.int64)
+        
+        def donation_totals() -> pd.DataFrame:
+            amounts = self.get_donation_amounts(dataset)
+            donated = amounts.notna().to_numpy()
+            return self._interval_totals(dataset, interval_minutes,
+                                         {'donation': amounts.to_numpy(), 'donations': donated})
+        
+        def compute() -> pd.Series:
+            if spam_filter is not None and name == 'density':
+                return effective(None)
+            if spam_filter is not None and name.startswith('keyword:'):
+                return effective(self.get_keyword_mask(name[len('keyword:'):], dataset, control))
+            if name == 'density':
+                engine = self.get_bin_engine(interval_seconds, 'right', dataset)
+                return pd.Series(engine.count(), index=pd.Index(engine.starts))
+            if name.startswith('keyword:'):
+                mask = self.get_keyword_mask(name[len('keyword:'):], dataset, control)
+                return self._interval_totals(dataset, interval_minutes, {'count': mask})['count']
+            if name in ('donation', 'donations'):
+                return dataset.derived(f'donation_totals:{interval_seconds}', donation_totals)[name]
+            raise ValueError(f"알 수 없는 분석 항목입니다: {name}")
+        
+        key = f'feature:{name}:{interval_seconds}'
+        if spam_filter is not None and name not in ('donation', 'donations'):
+            key += f':spam:{spam_filter.key()}'
+        return dataset.derived(key, compute)
+    
+    def analyze_keyword(self, keyword: str, interval_minutes: float, sensitivity: float = 2.0,
+                        detector: str = DEFAULT_DETECTOR, detector_params: Optional[Dict] = None,
+                        spam_filter: Optional[SpamOptions] = None,
+                        control: Optional[JobControl] = None) -> Dict:
         """
         Analyze keyword frequency over time with Z-Score based filtering
         
@@ -65,229 +459,565 @@ class ChatAnalyzer:
             keyword: Keyword to search for
             interval_minutes: Time interval in minutes
             sensitivity: Z-Score threshold (1.0=low, 2.0=normal, 3.0=high)
+            detector: Detector picking the significant bins (core.detectors)
+            detector_params: Further detector parameters
+            spam_filter: Count flooded mentions by their flood weight (None
+                counts every message)
+            control: Optional job control for progress and cancellation
             
         Returns:
-            Dictionary with analysis results
+            Dictionary with analysis results ('results' holds the significant bins)
         """
-        if self.df is None:
-            raise ValueError("No CSV loaded")
-        
-        # Convert time to seconds
-        self.df['seconds'] = self.df['재생시간'].apply(self.time_to_seconds)
+        dataset = self._require_dataset()
         
-        # Clean messages
-        self.df['clean_message'] = self.df['메시지'].apply(self.clean_message)
+        # Clean messages (cached, not written into the loaded data)
+        with timing.span('keyword.clean'):
+            self.get_clean_messages(dataset, control, 30, 80)
         
-        # Filter messages containing keyword (escape regex special chars)
-        keyword_df = self.df[self.df['clean_message'].str.contains(re.escape(keyword), case=False, na=False, regex=True)]
+        # Messages containing the keyword
+        with timing.span('keyword.match'):
+            mask = self.get_keyword_mask(keyword, dataset)
+            total_count = int(mask.sum())
         
-        if len(keyword_df) == 0:
+        if total_count == 0:
             return {
                 'total_count': 0,
                 'peak_time': None,
                 'timeline': [],
+                'results': None,
                 'sensitivity': sensitivity
             }
         
-        # Group by time intervals
-        interval_seconds = int(interval_minutes * 60)
-        max_seconds = self.df['seconds'].max()
-        time_bins = list(range(0, max_seconds + interval_seconds, interval_seconds))
-        
-        keyword_df['time_bin'] = pd.cut(keyword_df['seconds'], bins=time_bins, labels=time_bins[:-1])
-        
         # Count keywords per interval
-        keyword_counts = keyword_df.groupby('time_bin').size()
+        report_progress(control, 90, "구간 집계 중")
+        with timing.span('keyword.bin'):
+            keyword_counts = self.get_feature(f'keyword:{keyword}', interval_minutes, dataset,
+                                              control, spam_filter)
         
-        # Z-Score based filtering
-        mean = keyword_counts.mean()
-        std = keyword_counts.std()
+        # Z-Score based filtering (only significant moments are kept)
+        with timing.span('keyword.score'):
+            stats = self._significant_bins(keyword_counts, sensitivity, detector, detector_params)
         
-        # Avoid division by zero
-        if std == 0:
-            threshold = mean
-        else:
-            threshold = mean + (sensitivity * std)
+        return {
+            'total_count': total_count,
+            'peak_time': stats['peak_time'],
+            'timeline': stats['results'].to_dict('records'),
+            'results': stats['results'],
+            'sensitivity': sensitivity,
+            'detector': detector,
+            'threshold': stats['threshold'],
+            'mean': stats['mean'],
+            'std': stats['std'],
+            'spam': self._spam_summary(spam_filter, dataset)
+        }
+    
+    def _spam_summary(self, spam_filter: Optional[SpamOptions],
+                      dataset: ChatDataset) -> Optional[Dict]:
+        """Flood counts of an analysis run with spam_filter (None without it)"""
+        if spam_filter is None:
+            return None
+        return self.get_spam_scan(spam_filter, dataset).summary()
+    
+    def analyze_chat_density(self, interval_minutes: float, sensitivity: float = 2.0,
+                             detector: str = DEFAULT_DETECTOR,
+                             detector_params: Optional[Dict] = None,
+                             spam_filter: Optional[SpamOptions] = None,
+                             control: Optional[JobControl] = None) -> Dict:
+        """
+        Analyze chat density (message frequency) over time to find highlight moments
         
-        # Filter significant moments
-        significant_indices = keyword_counts[keyword_counts >= threshold].index
+        Args:
+            interval_minutes: Time interval in minutes
+            sensitivity: Z-Score threshold (1.0=low, 2.0=normal, 3.0=high)
+            detector: Detector picking the significant bins (core.detectors)
+            detector_params: Further detector parameters
+            spam_filter: Count repeat floods and copy-paste waves by their
+                flood weight, so they don't make fake spikes (None counts
+                every message)
+            control: Optional job control for progress and cancellation
+            
+        Returns:
+            Dictionary with analysis results ('results' holds the significant
+            bins; 'spam' the flood counts when spam_filter is set)
+        """
+        dataset = self._require_dataset()
         
-        # Store results (only significant moments)
-        self.keyword_results = pd.DataFrame({
-            'time_seconds': significant_indices.astype(int),
-            'count': keyword_counts[significant_indices].values
-        })
-        self.keyword_results['time_str'] = self.keyword_results['time_seconds'].apply(self.seconds_to_time)
+        if spam_filter is not None:
+            report_progress(control, 10, "도배 찾는 중")
+            self.get_spam_scan(spam_filter, dataset, control)
         
-        # Find peak time
-        if len(self.keyword_results) > 0:
-            peak_idx = self.keyword_results['count'].idxmax()
-            peak_time = self.keyword_results.loc[peak_idx, 'time_str']
-        else:
-            peak_time = None
+        # Count messages per interval
+        report_progress(control, 70, "구간 집계 중")
+        with timing.span('density.bin'):
+            message_counts = self.get_feature('density', interval_minutes, dataset, control,
+                                              spam_filter)
+        
+        # Z-Score based filtering (chat spikes)
+        with timing.span('density.score'):
+            stats = self._significant_bins(message_counts, sensitivity, detector, detector_params)
         
         return {
-            'total_count': len(keyword_df),
-            'peak_time': peak_time,
-            'timeline': self.keyword_results.to_dict('records'),
+            'total_count': len(dataset.store),
+            'peak_time': stats['peak_time'],
+            'timeline': stats['results'].to_dict('records'),
+            'results': stats['results'],
             'sensitivity': sensitivity,
-            'threshold': threshold,
-            'mean': mean,
-            'std': std
+            'detector': detector,
+            'threshold': stats['threshold'],
+            'mean': stats['mean'],
+            'std': stats['std'],
+            'spike_count': len(stats['results']),
+            'spam': self._spam_summary(spam_filter, dataset)
         }
     
-    def analyze_chat_density(self, interval_minutes: float, sensitivity: float = 2.0) -> Dict:
+    def get_donation_amounts(self, dataset: Optional[ChatDataset] = None) -> pd.Series:
+        """Cheese amount of every donation message, NaN for other messages (cached)"""
+        dataset = dataset or self._require_dataset()
+        
+        def compute() -> pd.Series:
+            # One regex scan over the store's UTF-8 text instead of per message
+            indices, amounts = dataset.store.extract_first(DONATION_PATTERN.encode('utf-8'))
+            values = np.full(len(dataset.store), np.nan)
+            values[indices] = [float(amount) for amount in amounts]
+            return pd.Series(values)
+        
+        return dataset.derived('donation_amounts', compute)
+    
+    def analyze_donations(self, interval_minutes: float, sensitivity: float = 2.0,
+                          detector: str = DEFAULT_DETECTOR, detector_params: Optional[Dict] = None,
+                          control: Optional[JobControl] = None) -> Dict:
         """
-        Analyze chat density (message frequency) over time to find highlight moments
+        Analyze donation amounts over time to find donation bursts
         
         Args:
             interval_minutes: Time interval in minutes
             sensitivity: Z-Score threshold (1.0=low, 2.0=normal, 3.0=high)
+            detector: Detector picking the significant bins (core.detectors)
+            detector_params: Further detector parameters
+            control: Optional job control for progress and cancellation
             
         Returns:
-            Dictionary with analysis results
+            Dictionary with analysis results ('results' holds the significant bins,
+            with the cheese total per bin in 'count' and the number of donations
+            in 'donations')
         """
-        if self.df is None:
-            raise ValueError("No CSV loaded")
+        dataset = self._require_dataset()
         
-        # Convert time to seconds if not already done
-        if 'seconds' not in self.df.columns:
-            self.df['seconds'] = self.df['재생시간'].apply(self.time_to_seconds)
+        report_progress(control, 70, "후원 찾는 중")
+        with timing.span('donation.extract'):
+            amounts = self.get_donation_amounts(dataset)
+        donated = amounts.notna()
         
-        # Group by time intervals
-        interval_seconds = int(interval_minutes * 60)
-        max_seconds = self.df['seconds'].max()
-        time_bins = list(range(0, max_seconds + interval_seconds, interval_seconds))
+        if not donated.any():
+            return {
+                'total_count': 0,
+                'total_amount': 0,
+                'peak_time': None,
+                'timeline': [],
+                'results': None,
+                'sensitivity': sensitivity
+            }
         
-        self.df['time_bin'] = pd.cut(self.df['seconds'], bins=time_bins, labels=time_bins[:-1])
+        # Cheese total and number of donations per interval
+        report_progress(control, 90, "구간 집계 중")
+        with timing.span('donation.bin'):
+            cheese = self.get_feature('donation', interval_minutes, dataset)
+            donations = self.get_feature('donations', interval_minutes, dataset)
         
-        # Count messages per interval
-        message_counts = self.df.groupby('time_bin').size()
+        # Z-Score based filtering on the cheese total per interval
+        with timing.span('donation.score'):
+            stats = self._significant_bins(cheese, sensitivity, detector, detector_params)
+        results = stats['results']
+        results['donations'] = donations[results['time_seconds']].to_numpy()
         
-        # Z-Score based filtering
-        mean = message_counts.mean()
-        std = message_counts.std()
+        return {
+            'total_count': int(donated.sum()),
+            'total_amount': int(amounts[donated].sum()),
+            'peak_time': stats['peak_time'],
+            'timeline': results.to_dict('records'),
+            'results': results,
+            'sensitivity': sensitivity,
+            'detector': detector,
+            'threshold': stats['threshold'],
+            'mean': stats['mean'],
+            'std': stats['std']
+        }
+    
+    def analyze_change_points(self, method: str = 'pelt', penalty: float = DEFAULT_PENALTY,
+                              min_seconds: int = 60,
+                              control: Optional[JobControl] = None) -> Dict:
+        """
+        Split the stream into stretches of steady chat activity
         
-        # Avoid division by zero
-        if std == 0:
-            threshold = mean
-        else:
-            threshold = mean + (sensitivity * std)
+        Runs on messages per second, so a shift is placed to within a few
+        seconds instead of an interval; Z-Score bins find the short spikes,
+        this finds where the level moves and stays.
         
-        # Filter significant moments (chat spikes)
-        significant_indices = message_counts[message_counts >= threshold].index
+        Args:
+            method: 'pelt' or 'binseg' (core.changepoints)
+            penalty: Penalty per change; higher keeps only bigger shifts
+            min_seconds: Shortest segment
+            control: Optional job control for progress and cancellation
+            
+        Returns:
+            Dictionary with 'segments' (core.changepoints.find_segments frame
+            plus 'time_str') and 'change_count'
+        """
+        dataset = self._require_dataset()
         
-        # Store results (only significant moments)
-        self.keyword_results = pd.DataFrame({
-            'time_seconds': significant_indices.astype(int),
-            'count': message_counts[significant_indices].values
-        })
-        self.keyword_results['time_str'] = self.keyword_results['time_seconds'].apply(self.seconds_to_time)
+        report_progress(control, 50, "초당 채팅 집계 중")
+        with timing.span('changepoint.bin'):
+            per_second = self.get_bin_engine(1, 'left', dataset).count()
         
-        # Find peak time
-        if len(self.keyword_results) > 0:
-            peak_idx = self.keyword_results['count'].idxmax()
-            peak_time = self.keyword_results.loc[peak_idx, 'time_str']
-        else:
-            peak_time = None
+        report_progress(control, 80, "변화점 찾는 중")
+        with timing.span('changepoint.search'):
+            segments = find_segments(per_second, method=method, penalty=penalty,
+                                     min_size=min_seconds)
+        segments['time_str'] = segments['start_seconds'].astype(int).apply(self.seconds_to_time)
         
         return {
-            'total_count': len(self.df),
-            'peak_time': peak_time,
-            'timeline': self.keyword_results.to_dict('records'),
-            'sensitivity': sensitivity,
-            'threshold': threshold,
-            'mean': mean,
-            'std': std,
-            'spike_count': len(self.keyword_results)
+            'segments': segments,
+            'change_count': max(len(segments) - 1, 0),
+            'method': method,
+            'penalty': penalty
         }
     
+    def get_emote_counts(self, dataset: Optional[ChatDataset] = None) -> np.ndarray:
+        """Number of {:emoticons:} in every message (cached)"""
+        dataset = dataset or self._require_dataset()
+        return dataset.derived('emote_counts', lambda: dataset.store.count_matches(EMOTE_PATTERN))
+    
+    def bin_aggregates(self, bin_seconds: int, keywords: Sequence[str] = (),
+                       control: Optional[JobControl] = None,
+                       metrics: Sequence[str] = BIN_METRICS,
+                       extra: Optional[Dict[str, np.ndarray]] = None) -> pd.DataFrame:
+        """
+        Per-bin totals over the whole stream (every bin, not just spikes)
+        
+        Every summed metric goes through one BinEngine.sums() pass, so asking
+        for more metrics or keywords does not rescan the messages.
+        
+        Args:
+            bin_seconds: Bin size in seconds
+            keywords: Also count the messages containing each keyword
+            control: Optional job control for progress and cancellation
+            metrics: Names from BIN_METRICS to compute
+            extra: More per-message columns to sum per bin, e.g. sentiment
+                scores (column name -> one value per message)
+                
+        Returns:
+            DataFrame with 'time_seconds' and the requested metrics: 'messages',
+            'chatters' (distinct non-system nicknames), 'donations',
+            'donation_amount', 'emotes', one count column per keyword named
+            after it and the extra columns
+        """
+        unknown = set(metrics) - set(BIN_METRICS)
+        if unknown:
+            raise ValueError(f"Unknown bin metrics: {', '.join(sorted(unknown))}")
+        dataset = self._require_dataset()
+        store = dataset.store
+        engine = self.get_bin_engine(bin_seconds, 'left', dataset)
+        
+        columns: Dict[str, np.ndarray] = {}
+        if 'donations' in metrics or 'donation_amount' in metrics:
+            amounts = self.get_donation_amounts(dataset).to_numpy()
+            if 'donations' in metrics:
+                columns['donations'] = ~np.isnan(amounts)
+            if 'donation_amount' in metrics:
+                columns['donation_amount'] = amounts
+        if 'emotes' in metrics:
+            columns['emotes'] = self.get_emote_counts(dataset)
+        for keyword in keywords:
+            columns[keyword] = self.get_keyword_mask(keyword, dataset, control)
+        if extra:
+            columns.update(extra)
+        
+        with timing.span('aggregate.bin'):
+            sums = engine.sums(columns)
+            frame = pd.DataFrame({'time_seconds': engine.starts})
+            if 'messages' in metrics:
+                frame['messages'] = engine.count()
+            if 'chatters' in metrics:
+                frame['chatters'] = engine.distinct(store.nick_codes,
+                                                    ~store.nickname_mask('[SYSTEM]'))
+            for name in columns:
+                values = sums[name]
+                if extra is None or name not in extra:
+                    # Counts and cheese are whole numbers
+                    values = values.astype(np.int64)
+                frame[name] = values
+        return frame
+    
+    def chatter_count(self) -> int:
+        """Distinct nicknames that chatted (system messages excluded)"""
+        store = self._require_dataset().store
+        codes = store.nick_codes[(store.nick_codes >= 0) & ~store.nickname_mask('[SYSTEM]')]
+        return int(len(np.unique(codes)))
+    
     def get_keyword_timeline(self) -> Optional[pd.DataFrame]:
         """Get keyword analysis timeline"""
         return self.keyword_results
     
-    def export_premiere_csv(self, output_path: str, keyword: str) -> bool:
+    def get_duration(self) -> Optional[float]:
+        """Playback time of the last message in seconds (None before loading)"""
+        if self.dataset is None:
+            return None
+        seconds = self.get_seconds()
+        return float(seconds.max()) if len(seconds) else 0.0
+    
+    def _bin_markers(self, name: str, results: pd.DataFrame,
+                     segments: Optional[SegmentOptions],
+                     label: Callable[[pd.Series], pd.Series],
+                     describe: Callable[[pd.Series, Optional[pd.Series]], pd.Series]) -> MarkerTrack:
         """
-        Export Premiere Pro marker CSV
+        Build a marker track from significant bins, or from clips merged from them
+        
+        Args:
+            name: Track name
+            results: Significant bins ('time_seconds' and 'count' columns)
+            segments: Merge bins into ranged clips (one point marker per bin when None)
+            label: Marker names from the per-marker values (as strings)
+            describe: Marker comments from the values and clip peaks
+                (peaks is None for point markers)
+                
+        Returns:
+            MarkerTrack scored by the bin (or clip total) values
+        """
+        results = results[results['count'] > 0]
+        if segments is None:
+            counts = results['count'].astype(int).astype(str)
+            return MarkerTrack(
+                name,
+                results['time_seconds'].to_numpy(),
+                label(counts).to_numpy(),
+                describe(counts, None).to_numpy(),
+                scores=results['count'].to_numpy()
+            )
+        
+        clips = build_segments(results['time_seconds'].to_numpy(), results['count'].to_numpy(),
+                               segments, self.get_duration())
+        totals = clips['total'].astype(int).astype(str)
+        peaks = clips['peak'].astype(int).astype(str)
+        return MarkerTrack(
+            name,
+            clips['start_seconds'].to_numpy(),
+            label(totals).to_numpy(),
+            describe(totals, peaks).to_numpy(),
+            ends=clips['end_seconds'].to_numpy(),
+            scores=clips['total'].to_numpy()
+        )
+    
+    def keyword_markers(self, keyword: str, results: Optional[pd.DataFrame] = None,
+                        segments: Optional[SegmentOptions] = None) -> Optional[MarkerTrack]:
+        """
+        Build markers for the significant bins of a keyword analysis
+        
+        Args:
+            keyword: Keyword name for markers
+            results: Analysis results (defaults to keyword_results)
+            segments: Merge bins into ranged clips (one point marker per bin when None)
+            
+        Returns:
+            MarkerTrack, or None if there are no results
+        """
+        if results is None:
+            results = self.keyword_results
+        if results is None:
+            return None
+        
+        def describe(counts, peaks):
+            text = keyword + " 키워드가 " + counts + "번 언급됨"
+            return text if peaks is None else text + " (최고 " + peaks + "회)"
+        
+        return self._bin_markers(
+            f"keyword_{keyword}" if keyword else "keyword", results, segments,
+            lambda counts: keyword + " (" + counts + "회)", describe
+        )
+    
+    def density_markers(self, results: pd.DataFrame,
+                        segments: Optional[SegmentOptions] = None) -> MarkerTrack:
+        """
+        Build markers for the spikes of a chat density analysis
+        
+        Args:
+            results: 'results' frame returned by analyze_chat_density
+            segments: Merge bins into ranged clips (one point marker per bin when None)
+            
+        Returns:
+            MarkerTrack
+        """
+        def describe(counts, peaks):
+            if peaks is None:
+                return "채팅이 " + counts + "개로 급증한 구간"
+            return "채팅 " + counts + "개가 몰린 구간 (최고 " + peaks + "개)"
+        
+        return self._bin_markers(
+            "density", results, segments,
+            lambda counts: "채팅 급증 (" + counts + "개)", describe
+        )
+    
+    def donation_markers(self, results: pd.DataFrame,
+                         segments: Optional[SegmentOptions] = None) -> MarkerTrack:
+        """
+        Build markers for donation bursts
+        
+        Args:
+            results: 'results' frame returned by analyze_donations
+            segments: Merge bins into ranged clips (one point marker per bin when None)
+            
+        Returns:
+            MarkerTrack
+        """
+        def describe(amounts, peaks):
+            if peaks is None:
+                return amounts + "치즈 후원이 몰린 구간"
+            return amounts + "치즈 후원이 몰린 구간 (최고 " + peaks + "치즈)"
+        
+        return self._bin_markers(
+            "donation", results, segments,
+            lambda amounts: "후원 (" + amounts + "치즈)", describe
+        )
+    
+    def density_segment_markers(self, segments: pd.DataFrame) -> Optional[MarkerTrack]:
+        """
+        Ranged markers (or chapters) for analyze_change_points segments
+        
+        Returns:
+            MarkerTrack, or None if there are no segments
+        """
+        if segments is None or len(segments) == 0:
+            return None
+        
+        def describe(frame):
+            change = frame['change'].to_numpy()
+            labels = np.where(change > 0, "채팅 흐름 - 증가",
+                              np.where(change < 0, "채팅 흐름 - 감소", "채팅 흐름 - 시작"))
+            descriptions = [f"분당 채팅 {mean * 60:,.0f}개" if i == 0 else
+                            f"분당 채팅 {mean * 60:,.0f}개 (이전 대비 {delta * 60:+,.0f})"
+                            for i, (mean, delta) in enumerate(zip(frame['mean'], change))]
+            return labels, descriptions
+        
+        return segment_track("density_segments", segments, describe)
+    
+    def export_markers(self, output_path: str, keyword: str, format_name: str,
+                       results: Optional[pd.DataFrame] = None,
+                       options: Optional[ExportOptions] = None) -> bool:
+        """
+        Export keyword markers in any registered format
         
         Args:
             output_path: Output file path
             keyword: Keyword name for markers
+            format_name: Format key from core.exporters.EXPORTERS
+            results: Analysis results to export (defaults to keyword_results)
+            options: Export options (frame rate, title, ...)
             
         Returns:
             True if successful
         """
-        if self.keyword_results is None:
+        track = self.keyword_markers(keyword, results)
+        if track is None:
             return False
         
-        # Create Premiere Pro marker format
-        markers = []
-        for _, row in self.keyword_results.iterrows():
-            if row['count'] > 0:
-                markers.append({
-                    'Marker Name': f"{keyword} ({row['count']}회)",
-                    'Description': f"{keyword} 키워드가 {row['count']}번 언급됨",
-                    'In': row['time_str'],
-                    'Out': '',
-                    'Duration': '',
-                    'Marker Type': 'Comment'
-                })
-        
-        markers_df = pd.DataFrame(markers)
-        markers_df.to_csv(output_path, index=False, encoding='utf-8-sig')
+        export_track(track, output_path, format_name, options)
         return True
     
-    def export_edl(self, output_path: str, keyword: str) -> bool:
+    def export_premiere_csv(self, output_path: str, keyword: str,
+                            results: Optional[pd.DataFrame] = None) -> bool:
         """
-        Export EDL (Edit Decision List) for DaVinci Resolve / Final Cut Pro
+        Export Premiere Pro marker CSV
         
         Args:
             output_path: Output file path
             keyword: Keyword name for markers
+            results: Analysis results to export (defaults to keyword_results)
             
         Returns:
             True if successful
         """
-        if self.keyword_results is None:
-            return False
-        
-        # EDL format:
-        # 001  AX       V     C        00:00:10:00 00:00:10:00 00:00:10:00 00:00:10:00
-        # * FROM CLIP NAME: marker_name
-        
-        edl_lines = []
-        edl_lines.append("TITLE: Chzzk Chat Markers")
-        edl_lines.append("FCM: NON-DROP FRAME")
-        edl_lines.append("")
-        
-        for idx, (_, row) in enumerate(self.keyword_results.iterrows(), 1):
-            if row['count'] > 0:
-                # Convert time_str (HH:MM:SS) to timecode (HH:MM:SS:FF)
-                timecode = f"{row['time_str']}:00"
-                
-                # EDL entry
-                edl_lines.append(f"{idx:03d}  AX       V     C        {timecode} {timecode} {timecode} {timecode}")
-                edl_lines.append(f"* FROM CLIP NAME: {keyword} ({row['count']}회)")
-                edl_lines.append(f"* COMMENT: {keyword} 키워드가 {row['count']}번 언급됨")
-                edl_lines.append("")
+        return self.export_markers(output_path, keyword, 'premiere_csv', results)
+    
+    def export_edl(self, output_path: str, keyword: str,
+                   results: Optional[pd.DataFrame] = None, fps: float = 30.0) -> bool:
+        """
+        Export EDL (Edit Decision List) for DaVinci Resolve / Final Cut Pro
         
-        # Write to file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(edl_lines))
+        Args:
+            output_path: Output file path
+            keyword: Keyword name for markers
+            results: Analysis results to export (defaults to keyword_results)
+            fps: Timeline frame rate for the timecodes
+            
+        Returns:
+            True if successful
+        """
+        return self.export_markers(output_path, keyword, 'cmx_edl', results,
+                                   ExportOptions(fps=fps))
+    
+    def _text_messages(self, dataset: ChatDataset, control: Optional[JobControl] = None) -> pd.Series:
+        """Non-empty cleaned messages, excluding system messages"""
+        # Clean messages if not already done
+        clean_messages = self.get_clean_messages(dataset, control, 0, 50)
         
-        return True
+        # Exclude system messages
+        text_messages = clean_messages[~dataset.store.nickname_mask('[SYSTEM]')]
+        return text_messages[text_messages.str.len() > 0]
     
-    def get_all_text(self) -> str:
+    def get_all_text(self, control: Optional[JobControl] = None) -> str:
         """Get all chat text for wordcloud"""
-        if self.df is None:
+        dataset = self.dataset
+        if dataset is None:
             return ""
         
-        # Clean messages if not already done
-        if 'clean_message' not in self.df.columns:
-            self.df['clean_message'] = self.df['메시지'].apply(self.clean_message)
+        text_messages = self._text_messages(dataset, control)
+        with timing.span('wordcloud.join'):
+            return ' '.join(text_messages)
+    
+    def get_word_frequencies(self, control: Optional[JobControl] = None) -> pd.Series:
+        """
+        Get token frequencies of all chat text for wordcloud
         
-        # Exclude system messages
-        text_messages = self.df[self.df['닉네임'] != '[SYSTEM]']['clean_message']
-        text_messages = text_messages[text_messages.str.len() > 0]
+        Counted once per loaded dataset, so re-rendering a wordcloud with other
+        sizes or colors does not touch the messages again.
         
-        return ' '.join(text_messages)
+        Returns:
+            Series of counts indexed by token, most frequent first
+        """
+        dataset = self.dataset
+        if dataset is None:
+            return pd.Series(dtype='int64')
+        
+        def compute() -> pd.Series:
+            with timing.span('wordcloud.clean'):
+                text_messages = self._text_messages(dataset, control)
+            report_progress(control, 60, "단어 빈도 계산 중")
+            with timing.span('wordcloud.tokens'):
+                return count_tokens(text_messages)
+        
+        return dataset.derived('word_frequencies', compute)
+    
+    def get_token_index(self, bin_seconds: int = 10,
+                        control: Optional[JobControl] = None) -> Optional[TokenBinIndex]:
+        """
+        Get per-bin token counts for time-range wordclouds (cached per dataset)
+        
+        Args:
+            bin_seconds: Time resolution of range queries
+            control: Optional job control for progress and cancellation
+            
+        Returns:
+            TokenBinIndex, or None if no CSV is loaded
+        """
+        dataset = self.dataset
+        if dataset is None:
+            return None
+        
+        def compute() -> TokenBinIndex:
+            seconds = self.get_seconds(dataset)
+            with timing.span('wordcloud.clean'):
+                text_messages = self._text_messages(dataset, control)
+            report_progress(control, 60, "구간별 단어 집계 중")
+            with timing.span('wordcloud.index'):
+                return TokenBinIndex(text_messages, seconds, bin_seconds)
+        
+        return dataset.derived(f'token_index_{bin_seconds}', compute)
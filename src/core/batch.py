@@ -0,0 +1,158 @@
+"""
+Batch Processing - Analyze many chat logs in parallel worker processes
+"""
+import glob
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+from core.chat_file import CHAT_FILE_SUFFIX
+from core.pipeline import PipelineSettings, run_pipeline
+
+
+MANIFEST_NAME = "manifest.json"
+
+
+def collect_inputs(patterns: Sequence[str]) -> List[str]:
+    """
+    Expand files, directories and glob patterns into a sorted list of chat logs
+    
+    Args:
+        patterns: File paths, directories (all *.csv and converted chat files
+            inside; a CSV converted next to itself is only taken as the chat
+            file) or glob patterns
+            
+    Returns:
+        Unique paths in a stable order
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            chat_files = glob.glob(os.path.join(pattern, f"*{CHAT_FILE_SUFFIX}"))
+            converted = {os.path.splitext(path)[0] for path in chat_files}
+            paths += [path for path in glob.glob(os.path.join(pattern, "*.csv"))
+                      if os.path.splitext(path)[0] not in converted]
+            paths += chat_files
+        elif glob.has_magic(pattern):
+            paths += glob.glob(pattern, recursive=True)
+        else:
+            paths.append(pattern)
+    return sorted(dict.fromkeys(os.path.normpath(path) for path in paths))
+
+
+def output_dirs(csv_paths: Sequence[str], output_root: str) -> Dict[str, str]:
+    """One output directory per log, named after the file (suffixed on clashes)"""
+    dirs = {}
+    used = set()
+    for path in csv_paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name, n = stem, 2
+        while name in used:
+            name, n = f"{stem}_{n}", n + 1
+        used.add(name)
+        dirs[path] = os.path.join(output_root, name)
+    return dirs
+
+
+def process_log(csv_path: str, output_dir: str, settings: PipelineSettings) -> Dict:
+    """
+    Run the pipeline for one log, turning any failure into a manifest entry
+    
+    Runs inside a worker process, so it never raises.
+    """
+    started = time.perf_counter()
+    try:
+        summary = run_pipeline(csv_path, output_dir, settings)
+    except Exception as e:
+        return {
+            'file': csv_path,
+            'status': 'failed',
+            'error': f"{type(e).__name__}: {e}",
+            'traceback': traceback.format_exc(),
+            'seconds': round(time.perf_counter() - started, 3),
+        }
+    summary.update({
+        'status': 'ok',
+        'output_dir': output_dir,
+        'seconds': round(time.perf_counter() - started, 3),
+    })
+    return summary
+
+
+def _crashed(csv_path: str) -> Dict:
+    return {'file': csv_path, 'status': 'failed', 'error': "작업 프로세스가 비정상 종료되었습니다"}
+
+
+def run_batch(csv_paths: Sequence[str], output_root: str, settings: PipelineSettings,
+              workers: Optional[int] = None,
+              progress_callback: Optional[Callable[[int, int, Dict], None]] = None) -> Dict:
+    """
+    Analyze every log in a process pool and write a summary manifest
+    
+    A log that raises is recorded as failed and the batch carries on. If a
+    worker process dies outright, the logs that were in flight are retried
+    one at a time in fresh processes so only the offending log fails.
+    
+    Args:
+        csv_paths: Chat CSV paths
+        output_root: Root directory; each log gets its own subdirectory
+        settings: Pipeline settings applied to every log
+        workers: Worker process count (defaults to the CPU count)
+        progress_callback: Called with (done, total, entry) after each log
+        
+    Returns:
+        Manifest dictionary (also written to output_root/manifest.json)
+    """
+    os.makedirs(output_root, exist_ok=True)
+    dirs = output_dirs(csv_paths, output_root)
+    workers = workers or os.cpu_count() or 1
+    started_at = datetime.now().isoformat(timespec='seconds')
+    started = time.perf_counter()
+    
+    entries: Dict[str, Dict] = {}
+    crashed = []
+    
+    def record(path: str, entry: Dict):
+        entries[path] = entry
+        if progress_callback is not None:
+            progress_callback(len(entries), len(dirs), entry)
+    
+    if dirs:
+        with ProcessPoolExecutor(max_workers=min(workers, len(dirs))) as executor:
+            futures = {executor.submit(process_log, path, out, settings): path
+                       for path, out in dirs.items()}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    record(path, future.result())
+                except BrokenProcessPool:
+                    crashed.append(path)
+    
+    # Isolate logs caught in a broken pool so one crash doesn't fail the rest
+    for path in crashed:
+        try:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                entry = executor.submit(process_log, path, dirs[path], settings).result()
+        except BrokenProcessPool:
+            entry = _crashed(path)
+        record(path, entry)
+    
+    files = [entries[path] for path in dirs]
+    manifest = {
+        'started': started_at,
+        'seconds': round(time.perf_counter() - started, 3),
+        'workers': workers,
+        'settings': vars(settings),
+        'total': len(files),
+        'succeeded': sum(entry['status'] == 'ok' for entry in files),
+        'failed': sum(entry['status'] != 'ok' for entry in files),
+        'files': files,
+    }
+    with open(os.path.join(output_root, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
@@ -0,0 +1,295 @@
+"""
+Change Points - Split a per-second series into segments of steady level
+
+Z-Score bins catch short spikes; a lasting shift (a boss fight starting, a
+guest joining, the mood turning) shows up instead as a change in the level
+of the series. Both searches minimize the weighted squared error of a
+piecewise-constant fit plus a penalty per change:
+
+- PELT: exact optimum, pruning start positions that can no longer win
+- binary segmentation: greedy splits, faster on very long series
+
+Segment costs come from cumulative sums, so a cost is O(1) for any start
+and end. Weights let a series of per-second means (sentiment) count each
+second by its number of messages; seconds without messages weigh nothing.
+"""
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.markers import MarkerTrack
+
+
+# Default penalty per change, in noise variances times log(n) (BIC-like)
+DEFAULT_PENALTY = 3.0
+
+# Median of a chi-squared variable with one degree of freedom
+CHI2_MEDIAN = 0.4549
+
+# Change points are searched on a grid of this many positions, then moved to
+# the best position within one grid step (PELT prunes nothing inside a long
+# steady stretch, so its work grows with the square of the grid size)
+DEFAULT_JUMP = 30
+
+# Values further than this many noise deviations from their neighbourhood
+# are clipped before the search, so a one-second burst is no lasting shift
+DEFAULT_CLIP = 6.0
+
+
+class SegmentCost:
+    """Weighted squared-error cost of any [start, end) segment in O(1)"""
+    
+    def __init__(self, values: np.ndarray, weights: Optional[np.ndarray] = None):
+        """
+        Args:
+            values: One value per position
+            weights: Weight of every position (defaults to 1)
+        """
+        values = np.asarray(values, dtype=np.float64)
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=np.float64)
+        values = np.where(weights > 0, values, 0.0)
+        self.values = values
+        self.weights = weights
+        self.n = len(values)
+        self._w = np.concatenate(([0.0], np.cumsum(weights)))
+        self._wx = np.concatenate(([0.0], np.cumsum(weights * values)))
+        self._wxx = np.concatenate(([0.0], np.cumsum(weights * values * values)))
+    
+    def __call__(self, starts, ends) -> np.ndarray:
+        """Cost of the segments [starts, ends) (arrays or scalars)"""
+        w = self._w[ends] - self._w[starts]
+        wx = self._wx[ends] - self._wx[starts]
+        # A segment without weight has wx == wxx == 0, so any divisor gives 0
+        return self._wxx[ends] - self._wxx[starts] - wx * wx / np.maximum(w, 1e-300)
+    
+    def totals(self, starts, ends) -> Tuple[np.ndarray, np.ndarray]:
+        """Weight and weighted mean of the segments [starts, ends)"""
+        w = self._w[ends] - self._w[starts]
+        wx = self._wx[ends] - self._wx[starts]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return w, np.where(w > 0, wx / np.where(w > 0, w, 1.0), 0.0)
+    
+    def noise_variance(self) -> float:
+        """
+        Variance of one unit of weight, robust to the level changes
+        
+        Neighbouring weighted positions mostly share a level, so half their
+        squared difference (scaled by their weights) estimates the noise; the
+        median ignores the few pairs straddling a change.
+        """
+        used = np.flatnonzero(self.weights > 0)
+        if len(used) < 2:
+            return 1.0
+        w = self.weights[used]
+        diff = np.diff(self.values[used])
+        pair = diff * diff / (1.0 / w[1:] + 1.0 / w[:-1])
+        variance = float(np.median(pair)) / CHI2_MEDIAN
+        # Mostly flat integer counts have a median difference of 0
+        return variance or float(pair.mean()) or 1.0
+    
+    def penalty(self, factor: float) -> float:
+        """Cost of one change: factor * noise variance * log(n)"""
+        return factor * self.noise_variance() * np.log(max(self.n, 2))
+
+
+def _clip_bursts(cost: SegmentCost, window: int, clip: float) -> np.ndarray:
+    """Values pulled to within clip noise deviations of their rolling median"""
+    weights = cost.weights
+    local = pd.Series(np.where(weights > 0, cost.values, np.nan)).rolling(
+        window, center=True, min_periods=1
+    ).median().to_numpy()
+    with np.errstate(divide='ignore'):
+        spread = clip * np.sqrt(cost.noise_variance() / weights)
+    return np.where(weights > 0, np.clip(cost.values, local - spread, local + spread), 0.0)
+
+
+def _grid(n: int, min_size: int, jump: int) -> np.ndarray:
+    """Allowed segment boundaries: multiples of jump, plus the end"""
+    points = np.arange(0, n, jump)
+    return np.append(points[points + min_size <= n], n) if n else np.array([0])
+
+
+def pelt(cost: SegmentCost, penalty: float, min_size: int = 60, jump: int = 5) -> np.ndarray:
+    """
+    Optimal change points by Pruned Exact Linear Time search
+    
+    Args:
+        cost: Segment cost of the series
+        penalty: Cost added per segment
+        min_size: Shortest segment in positions
+        jump: Only consider change points at multiples of this (a coarser
+            grid is proportionally faster)
+            
+    Returns:
+        Sorted start positions of every segment after the first
+    """
+    n = cost.n
+    min_size = max(int(min_size), 1)
+    jump = max(int(jump), 1)
+    if n < 2 * min_size:
+        return np.array([], dtype=np.int64)
+    
+    points = _grid(n, min_size, jump)
+    best = np.full(n + 1, np.inf)
+    best[0] = -penalty
+    previous = np.zeros(n + 1, dtype=np.int64)
+    candidates = np.array([0], dtype=np.int64)
+    
+    for end in points[1:]:
+        # Candidates are sorted, so the ones far enough back are a prefix
+        ready = int(np.searchsorted(candidates, end - min_size, side='right'))
+        if ready == 0:
+            candidates = np.append(candidates, end)
+            continue
+        starts = candidates[:ready]
+        totals = best[starts] + cost(starts, end)
+        choice = int(np.argmin(totals))
+        best[end] = totals[choice] + penalty
+        previous[end] = starts[choice]
+        # A start that is already worse than the best by more than a
+        # penalty can never become optimal again
+        candidates = np.concatenate((starts[totals <= best[end]], candidates[ready:], [end]))
+    
+    changes = []
+    end = n
+    while end > 0:
+        end = previous[end]
+        if end > 0:
+            changes.append(end)
+    return np.array(changes[::-1], dtype=np.int64)
+
+
+def binary_segmentation(cost: SegmentCost, penalty: float, min_size: int = 60,
+                        jump: int = 5) -> np.ndarray:
+    """
+    Change points by greedy binary splitting
+    
+    Every segment is split at the position that lowers the cost most, as
+    long as that beats the penalty (each split is one vectorized pass over
+    the segment).
+    
+    Args:
+        cost: Segment cost of the series
+        penalty: Cost added per segment
+        min_size: Shortest segment in positions
+        jump: Only consider change points at multiples of this
+        
+    Returns:
+        Sorted start positions of every segment after the first
+    """
+    min_size = max(int(min_size), 1)
+    jump = max(int(jump), 1)
+    changes = []
+    pending = [(0, cost.n)]
+    while pending:
+        start, end = pending.pop()
+        first = -(-(start + min_size) // jump) * jump
+        splits = np.arange(first, end - min_size + 1, jump)
+        if len(splits) == 0:
+            continue
+        gains = cost(start, end) - cost(start, splits) - cost(splits, end)
+        choice = int(np.argmax(gains))
+        if gains[choice] <= penalty:
+            continue
+        split = int(splits[choice])
+        changes.append(split)
+        pending += [(start, split), (split, end)]
+    return np.array(sorted(changes), dtype=np.int64)
+
+
+METHODS: Dict[str, Callable[..., np.ndarray]] = {
+    'pelt': pelt,
+    'binseg': binary_segmentation,
+}
+
+
+def _refine(cost: SegmentCost, changes: np.ndarray, jump: int, min_size: int) -> np.ndarray:
+    """Move every change point to its best position within one grid step"""
+    changes = changes.copy()
+    for i in range(len(changes)):
+        start = changes[i - 1] if i > 0 else 0
+        end = changes[i + 1] if i + 1 < len(changes) else cost.n
+        splits = np.arange(max(changes[i] - jump + 1, start + min_size),
+                           min(changes[i] + jump, end - min_size + 1))
+        if len(splits):
+            changes[i] = splits[np.argmin(cost(start, splits) + cost(splits, end))]
+    return changes
+
+
+def find_segments(values: np.ndarray, weights: Optional[np.ndarray] = None,
+                  method: str = 'pelt', penalty: float = DEFAULT_PENALTY,
+                  min_size: int = 60, jump: int = DEFAULT_JUMP, clip: Optional[float] = DEFAULT_CLIP,
+                  start: float = 0.0, step: float = 1.0) -> pd.DataFrame:
+    """
+    Segments of steady level in a series
+    
+    Args:
+        values: One value per position (e.g. messages per second)
+        weights: Weight of every position (e.g. messages behind a per-second mean)
+        method: 'pelt' or 'binseg'
+        penalty: Penalty per change in noise variances times log(n); higher
+            keeps only bigger, longer-lasting shifts
+        min_size: Shortest segment in positions
+        jump: Grid step of the search; every change is then refined to the
+            best single position within one step
+        clip: Clip values this many noise deviations away from the median
+            of their min_size neighbourhood for the search (None keeps
+            single-position bursts, which then become short segments)
+        start: Time of the first position in seconds
+        step: Seconds per position
+        
+    Returns:
+        DataFrame with one row per segment: 'start_seconds', 'end_seconds',
+        'mean' (weighted mean level), 'change' (level minus the previous
+        segment's) and 'score' (the change in standard errors; 0 for the
+        first segment)
+    """
+    if method not in METHODS:
+        raise ValueError(f"지원하지 않는 변화점 탐색 방법입니다: {method}")
+    cost = SegmentCost(values, weights)
+    if cost.n == 0:
+        return pd.DataFrame(columns=['start_seconds', 'end_seconds', 'mean', 'change', 'score'])
+    
+    search = cost
+    if clip is not None:
+        search = SegmentCost(_clip_bursts(cost, max(int(min_size), 1), clip), cost.weights)
+    changes = METHODS[method](search, cost.penalty(penalty), min_size, jump)
+    if jump > 1:
+        changes = _refine(search, changes, int(jump), max(int(min_size), 1))
+    starts = np.concatenate(([0], changes)).astype(np.int64)
+    ends = np.append(changes, cost.n).astype(np.int64)
+    weight, mean = cost.totals(starts, ends)
+    
+    change = np.diff(mean, prepend=mean[0])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        error = np.sqrt(cost.noise_variance() * (1.0 / weight + 1.0 / np.roll(weight, 1)))
+        score = np.where(error > 0, np.abs(change) / error, 0.0)
+    score[0] = 0.0
+    
+    return pd.DataFrame({
+        'start_seconds': start + starts * step,
+        'end_seconds': start + ends * step,
+        'mean': mean,
+        'change': change,
+        'score': np.nan_to_num(score),
+    })
+
+
+def segment_track(name: str, segments: pd.DataFrame,
+                  describe: Callable[[pd.DataFrame], Tuple[np.ndarray, np.ndarray]]) -> MarkerTrack:
+    """
+    Ranged markers, one per segment
+    
+    Starts double as chapter times, so the youtube_chapters format turns the
+    track into one chapter per segment.
+    
+    Args:
+        name: Track name (used for output file names)
+        segments: find_segments result
+        describe: Gets the segments, returns labels and descriptions
+    """
+    labels, descriptions = describe(segments)
+    return MarkerTrack(name, segments['start_seconds'].to_numpy(), labels, descriptions,
+                       ends=segments['end_seconds'].to_numpy(),
+                       scores=segments['score'].to_numpy())
@@ -0,0 +1,147 @@
+"""
+Chat File - Memory-mapped binary format for converted chat logs
+
+A converted log opens without parsing: the arrays of a ChatStore are laid
+out on disk exactly as they are used in memory and mapped with numpy.memmap.
+Opening costs the same for 1k or 5M messages, and every process that opens
+the file (GUI, CLI, batch workers) shares the OS page cache.
+
+Layout (little-endian, every section 8-byte aligned):
+    
+    header        magic, version, message count, nickname count and the
+                  (offset, length) in bytes of each section below
+    seconds       uint32[messages]
+    nick_codes    int32[messages]
+    offsets       int64[messages + 1]   byte offsets into text
+    text          uint8[]               UTF-8 messages back to back
+    nick_offsets  int64[nicknames + 1]  byte offsets into nick_text
+    nick_text     uint8[]               UTF-8 nicknames back to back
+"""
+import os
+import struct
+from typing import List
+
+import numpy as np
+
+from core.chat_store import ChatStore, encode_arena
+
+
+CHAT_FILE_SUFFIX = ".chzchat"
+CHAT_FILE_MAGIC = b"CHZCHAT\x00"
+CHAT_FILE_VERSION = 1
+
+SECTIONS = ('seconds', 'nick_codes', 'offsets', 'text', 'nick_offsets', 'nick_text')
+SECTION_DTYPES = {
+    'seconds': '<u4',
+    'nick_codes': '<i4',
+    'offsets': '<i8',
+    'text': 'u1',
+    'nick_offsets': '<i8',
+    'nick_text': 'u1',
+}
+
+# magic, version, reserved, messages, nicknames, then (offset, length) per section
+HEADER = struct.Struct('<8sIIQQ' + 'QQ' * len(SECTIONS))
+ALIGNMENT = 8
+
+
+def _aligned(position: int) -> int:
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+def is_chat_file(path: str) -> bool:
+    """Whether path starts with the chat file magic"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(CHAT_FILE_MAGIC)) == CHAT_FILE_MAGIC
+    except OSError:
+        return False
+
+
+def write_chat_file(store: ChatStore, path: str):
+    """
+    Write a ChatStore in the memory-mappable format
+    
+    The file is written next to its destination and renamed into place, so a
+    process reading the old file never sees a half-written one.
+    
+    Args:
+        store: Chat to write
+        path: Output path (conventionally ending in CHAT_FILE_SUFFIX)
+    """
+    nick_offsets, nick_text = encode_arena(np.array(store.nicknames, dtype=object))
+    arrays = {
+        'seconds': store.seconds,
+        'nick_codes': store.nick_codes,
+        'offsets': store.offsets,
+        'text': store.text,
+        'nick_offsets': nick_offsets,
+        'nick_text': nick_text,
+    }
+    
+    table: List[int] = []
+    position = _aligned(HEADER.size)
+    for name in SECTIONS:
+        data = np.ascontiguousarray(arrays[name], dtype=SECTION_DTYPES[name])
+        arrays[name] = data
+        table += [position, data.nbytes]
+        position = _aligned(position + data.nbytes)
+    header = HEADER.pack(CHAT_FILE_MAGIC, CHAT_FILE_VERSION, 0, len(store),
+                         len(store.nicknames), *table)
+    
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(header)
+            for name, offset in zip(SECTIONS, table[::2]):
+                f.write(b'\x00' * (offset - f.tell()))
+                f.write(arrays[name].data)
+        os.replace(temp_path, path)
+    except BaseException:
+        # Don't leave a partial file next to the source log
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def open_chat_file(path: str) -> ChatStore:
+    """
+    Map a chat file into a ChatStore without reading the messages
+    
+    Only the header and the nickname table are read; seconds, nickname codes
+    and text stay on disk until an analysis touches them.
+    
+    Args:
+        path: Path written by write_chat_file
+        
+    Returns:
+        ChatStore whose arrays are read-only views of the mapped file
+        
+    Raises:
+        ValueError: If the file is not a chat file or is truncated
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size or not header.startswith(CHAT_FILE_MAGIC):
+        raise ValueError(f"채팅 파일 형식이 아닙니다: {path}")
+    
+    magic, version, _reserved, messages, nicknames, *table = HEADER.unpack(header)
+    if version != CHAT_FILE_VERSION:
+        raise ValueError(f"지원하지 않는 채팅 파일 버전입니다: {version}")
+    
+    mapped = np.memmap(path, dtype=np.uint8, mode='r')
+    sections = {}
+    for name, offset, length in zip(SECTIONS, table[::2], table[1::2]):
+        if offset + length > len(mapped):
+            raise ValueError(f"채팅 파일이 손상되었습니다: {path}")
+        sections[name] = mapped[offset:offset + length].view(SECTION_DTYPES[name])
+    
+    if len(sections['seconds']) != messages or len(sections['nick_offsets']) != nicknames + 1:
+        raise ValueError(f"채팅 파일이 손상되었습니다: {path}")
+    
+    nick_blob = sections['nick_text'].tobytes()
+    bounds = sections['nick_offsets'].tolist()
+    names = [nick_blob[a:b].decode('utf-8') for a, b in zip(bounds[:-1], bounds[1:])]
+    
+    return ChatStore(sections['seconds'], sections['nick_codes'], names,
+                     sections['offsets'], sections['text'])
@@ -0,0 +1,252 @@
+"""
+Chat Store - Compact array-backed representation of a loaded chat log
+"""
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Nickname code of a message without a nickname
+MISSING_CODE = -1
+
+# Largest playback time a uint32 can hold (about 136 years)
+MAX_SECONDS = np.iinfo(np.uint32).max
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    """Read-only view, so shared arrays can't be modified by an analysis"""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def encode_arena(messages: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    UTF-8 encode messages into one arena
+    
+    Args:
+        messages: Object array of message strings
+        
+    Returns:
+        (int64 offsets with one more entry than messages, uint8 text)
+    """
+    try:
+        # One join and one encode; the NUL separators then give the offsets
+        joined = np.frombuffer('\x00'.join(messages).encode('utf-8'), dtype=np.uint8)
+        separators = np.flatnonzero(joined == 0)
+    except TypeError:
+        separators = None
+    
+    if separators is not None and len(separators) == max(len(messages) - 1, 0):
+        text = np.delete(joined, separators)
+        offsets = np.empty(len(messages) + 1, dtype=np.int64)
+        offsets[0] = 0
+        offsets[1:-1] = separators - np.arange(len(separators))
+        offsets[-1] = len(text)
+        return offsets, text
+    
+    # A message holding NUL or a non-string value: encode one by one
+    encoded = [str(message).encode('utf-8') for message in messages]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)),
+              out=offsets[1:])
+    return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+
+class ChatStore:
+    """
+    Chat messages held in a few flat numpy arrays
+    
+    - seconds: uint32 playback time of each message
+    - nick_codes: int32 index into nicknames (MISSING_CODE when empty)
+    - offsets: int64, message i is text[offsets[i]:offsets[i + 1]]
+    - text: uint8 arena with every message UTF-8 encoded back to back
+    
+    That is 16 bytes plus the UTF-8 text per message, instead of two Python
+    string objects per message in a DataFrame. The arrays are handed out as
+    read-only views, so every analysis shares them without copying.
+    """
+    
+    __slots__ = ('_seconds', '_nick_codes', '_nicknames', '_nickname_index', '_offsets', '_text')
+    
+    def __init__(self, seconds: np.ndarray, nick_codes: np.ndarray, nicknames: Sequence[str],
+                 offsets: np.ndarray, text: np.ndarray):
+        """
+        Args:
+            seconds: uint32 playback time per message
+            nick_codes: int32 nickname code per message
+            nicknames: Distinct nicknames (indexed by nick_codes)
+            offsets: int64 byte offsets into text (one more than messages)
+            text: uint8 UTF-8 text arena
+        """
+        if not (len(seconds) == len(nick_codes) == len(offsets) - 1):
+            raise ValueError("seconds, nick_codes and offsets lengths do not match")
+        self._seconds = _readonly(np.asarray(seconds, dtype=np.uint32))
+        self._nick_codes = _readonly(np.asarray(nick_codes, dtype=np.int32))
+        self._nicknames = tuple(nicknames)
+        self._nickname_index: Optional[Dict[str, int]] = None
+        self._offsets = _readonly(np.asarray(offsets, dtype=np.int64))
+        self._text = _readonly(np.asarray(text, dtype=np.uint8))
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, time_to_seconds: Callable[[str], int]) -> "ChatStore":
+        """
+        Build a store from a DataFrame with 재생시간 / 닉네임 / 메시지 columns
+        
+        Args:
+            df: Loaded chat CSV
+            time_to_seconds: Parser for one HH:MM:SS string
+            
+        Returns:
+            ChatStore with the same messages in the same order
+        """
+        # Timestamps repeat heavily, so each distinct string is parsed once
+        time_codes, times = pd.factorize(df['재생시간'])
+        parsed = np.fromiter((time_to_seconds(t) for t in times), dtype=np.int64, count=len(times))
+        # Code -1 (missing time) picks the appended 0
+        seconds = np.append(parsed, 0)[time_codes]
+        
+        nick_codes, nicknames = pd.factorize(df['닉네임'])
+        
+        offsets, text = encode_arena(df['메시지'].to_numpy(dtype=object, na_value=''))
+        
+        return cls(np.clip(seconds, 0, MAX_SECONDS), nick_codes, [str(n) for n in nicknames],
+                   offsets, text)
+    
+    def __len__(self) -> int:
+        return len(self._seconds)
+    
+    @property
+    def seconds(self) -> np.ndarray:
+        """uint32 playback time of every message"""
+        return self._seconds
+    
+    @property
+    def nick_codes(self) -> np.ndarray:
+        """int32 nickname code of every message"""
+        return self._nick_codes
+    
+    @property
+    def nicknames(self) -> Tuple[str, ...]:
+        """Distinct nicknames in order of first appearance"""
+        return self._nicknames
+    
+    @property
+    def offsets(self) -> np.ndarray:
+        """int64 byte offsets of the messages in text"""
+        return self._offsets
+    
+    @property
+    def text(self) -> np.ndarray:
+        """uint8 UTF-8 text arena"""
+        return self._text
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the arrays (nickname strings not included)"""
+        return sum(array.nbytes for array in (self._seconds, self._nick_codes,
+                                              self._offsets, self._text))
+    
+    def nickname_code(self, nickname: str) -> Optional[int]:
+        """Code of a nickname, or None if nobody used it"""
+        if self._nickname_index is None:
+            self._nickname_index = {name: code for code, name in enumerate(self._nicknames)}
+        return self._nickname_index.get(nickname)
+    
+    def nickname_mask(self, nickname: str) -> np.ndarray:
+        """Boolean mask of the messages written by nickname"""
+        code = self.nickname_code(nickname)
+        if code is None:
+            return np.zeros(len(self), dtype=bool)
+        return self._nick_codes == code
+    
+    def nickname(self, index: int) -> Optional[str]:
+        """Nickname of one message"""
+        code = self._nick_codes[index]
+        return self._nicknames[code] if code != MISSING_CODE else None
+    
+    def message(self, index: int) -> str:
+        """Text of one message"""
+        return self._text[self._offsets[index]:self._offsets[index + 1]].tobytes().decode('utf-8')
+    
+    def messages(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """Decode the text of messages start..stop"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return []
+        offsets = self._offsets[start:stop + 1]
+        blob = self._text[offsets[0]:offsets[-1]].tobytes()
+        bounds = (offsets - offsets[0]).tolist()
+        return [blob[a:b].decode('utf-8') for a, b in zip(bounds[:-1], bounds[1:])]
+    
+    def message_series(self) -> pd.Series:
+        """All message texts as a Series (decoded on every call, not cached)"""
+        return pd.Series(self.messages(), dtype=object)
+    
+    def extract_first(self, pattern: bytes) -> Tuple[np.ndarray, List[bytes]]:
+        """
+        First match of a regex in each message, searched in the raw text arena
+        
+        One scan over the whole arena replaces a per-message regex call.
+        Matches that would run into the next message are dropped.
+        
+        Args:
+            pattern: Bytes regex with one capture group
+            
+        Returns:
+            (message indices, captured group of the first match in each)
+        """
+        starts, ends, groups = [], [], []
+        for match in re.finditer(pattern, memoryview(self._text)):
+            starts.append(match.start())
+            ends.append(match.end())
+            groups.append(match.group(1))
+        if not starts:
+            return np.zeros(0, dtype=np.int64), []
+        
+        starts = np.array(starts, dtype=np.int64)
+        indices = np.searchsorted(self._offsets, starts, side='right') - 1
+        inside = np.array(ends, dtype=np.int64) <= self._offsets[indices + 1]
+        candidates = np.flatnonzero(inside)
+        
+        # Matches come in text order, so the first per message wins
+        indices, first = np.unique(indices[candidates], return_index=True)
+        return indices, [groups[i] for i in candidates[first]]
+    
+    def count_matches(self, pattern: bytes) -> np.ndarray:
+        """
+        Number of regex matches in each message, counted in one arena scan
+        
+        Matches that would run into the next message are dropped.
+        
+        Args:
+            pattern: Bytes regex
+            
+        Returns:
+            int64 count per message
+        """
+        spans = [match.span() for match in re.finditer(pattern, memoryview(self._text))]
+        if not spans:
+            return np.zeros(len(self), dtype=np.int64)
+        
+        spans = np.array(spans, dtype=np.int64)
+        indices = np.searchsorted(self._offsets, spans[:, 0], side='right') - 1
+        inside = spans[:, 1] <= self._offsets[indices + 1]
+        return np.bincount(indices[inside], minlength=len(self))
+    
+    def to_frame(self, seconds_to_time: Callable[[int], str]) -> pd.DataFrame:
+        """
+        Rebuild a 재생시간 / 닉네임 / 메시지 DataFrame (a full copy)
+        
+        Args:
+            seconds_to_time: Formatter for the 재생시간 column
+        """
+        nicknames = pd.Categorical.from_codes(self._nick_codes,
+                                              categories=pd.Index(self._nicknames, dtype=object))
+        return pd.DataFrame({
+            '재생시간': [seconds_to_time(int(s)) for s in self._seconds],
+            '닉네임': nicknames,
+            '메시지': self.messages(),
+        })
@@ -0,0 +1,148 @@
+"""
+Stream Comparison - Rank moments across many VODs on a common scale
+
+A stream's own mean/std says nothing about how it compares to others: a
+small stream's spike may be a quiet minute for a large one. Here every bin
+is measured two ways, both computed from the per-bin totals kept in a
+ResultStore, so no CSV is read:
+
+- lift: the bin against the stream's own baseline chat rate (its median bin)
+- intensity: the bin per audience member, against the median of that over
+  every compared stream
+
+Chat logs carry no viewer counts, so the distinct chatters of a stream
+stand in for its audience size.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from core.result_store import ResultStore
+
+
+# How much intensity (per-audience rate) counts against lift in the score
+DEFAULT_AUDIENCE_WEIGHT = 0.5
+
+
+def rebin(bins: pd.DataFrame, stored_seconds: int, bin_seconds: int) -> pd.DataFrame:
+    """
+    Merge stored bins into coarser ones
+    
+    Args:
+        bins: ResultStore.bins frame
+        stored_seconds: Bin size of the stored totals
+        bin_seconds: Requested bin size (a whole multiple of stored_seconds)
+        
+    Returns:
+        Frame with the same columns; counts are summed, and chatters (which
+        can't be summed) take the largest value of the merged bins
+    """
+    if bin_seconds % stored_seconds != 0:
+        raise ValueError(f"구간 간격은 {stored_seconds}초의 배수여야 합니다: {bin_seconds}초")
+    if bin_seconds == stored_seconds:
+        return bins
+    
+    bins = bins.assign(time_seconds=bins['time_seconds'] // bin_seconds * bin_seconds)
+    sums = {column: 'sum' for column in bins.columns if column not in ('vod_id', 'time_seconds')}
+    sums['chatters'] = 'max'
+    return bins.groupby(['vod_id', 'time_seconds'], sort=False, as_index=False).agg(sums)
+
+
+def compare_streams(store: ResultStore, keyword: Optional[str] = None,
+                    bin_seconds: int = 60, since: Optional[str] = None,
+                    until: Optional[str] = None,
+                    audience_weight: float = DEFAULT_AUDIENCE_WEIGHT) -> pd.DataFrame:
+    """
+    Score every bin of every stored VOD on a scale shared by all of them
+    
+    Args:
+        store: Result store holding the VODs
+        keyword: Compare this keyword's mentions instead of all chat
+        bin_seconds: Bin size of the comparison
+        since: Earliest stream date (ISO, inclusive)
+        until: Latest stream date (ISO, inclusive)
+        audience_weight: 0 ranks by lift only, 1 by intensity only
+        
+    Returns:
+        One row per non-empty bin, highest score first, with the VOD's
+        'name' and 'streamed_at', 'time_seconds', 'value' (messages or
+        mentions), 'audience', 'baseline' (the stream's median per bin),
+        'lift', 'per_1k' (value per 1,000 audience members), 'intensity'
+        and 'score' (weighted mean of log2 lift and log2 intensity)
+    """
+    vods = store.vods(since, until)
+    if len(vods) == 0:
+        return pd.DataFrame(columns=['vod_id', 'name', 'streamed_at', 'time_seconds', 'value',
+                                     'audience', 'baseline', 'lift', 'per_1k', 'intensity',
+                                     'score'])
+    stored_seconds = int(vods['bin_seconds'].max())
+    if (vods['bin_seconds'] != stored_seconds).any():
+        raise ValueError("구간 크기가 다른 방송이 섞여 있습니다. 같은 설정으로 다시 기록하세요.")
+    
+    bins = rebin(store.bins(vod_ids=vods['id'].tolist(), keyword=keyword),
+                 stored_seconds, bin_seconds)
+    value = bins['keyword_count' if keyword is not None else 'messages'].to_numpy(np.float64)
+    
+    # Per-stream baseline and audience, broadcast back onto the bins
+    by_vod = vods.set_index('id')
+    audience = np.maximum(by_vod['chatters'].reindex(bins['vod_id']).to_numpy(np.float64), 1.0)
+    baseline = pd.Series(value).groupby(bins['vod_id'].to_numpy()).transform('median').to_numpy()
+    
+    # +1 keeps a single mention in a quiet stream (or in a keyword that is
+    # usually never said) from scoring as an infinite jump
+    lift = (value + 1.0) / (baseline + 1.0)
+    per_viewer = (value + 1.0) / audience
+    intensity = per_viewer / float(np.median(per_viewer))
+    score = (1.0 - audience_weight) * np.log2(lift) + audience_weight * np.log2(intensity)
+    
+    result = pd.DataFrame({
+        'vod_id': bins['vod_id'].to_numpy(),
+        'name': by_vod['name'].reindex(bins['vod_id']).to_numpy(),
+        'streamed_at': by_vod['streamed_at'].reindex(bins['vod_id']).to_numpy(),
+        'time_seconds': bins['time_seconds'].to_numpy(),
+        'value': value,
+        'audience': audience,
+        'baseline': baseline,
+        'lift': lift,
+        'per_1k': value / audience * 1000.0,
+        'intensity': intensity,
+        'score': score,
+    })
+    result = result[result['value'] > 0]
+    return result.sort_values('score', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def top_moments(ranked: pd.DataFrame, n: int = 20, per_stream: Optional[int] = None) -> pd.DataFrame:
+    """
+    Best moments of a compare_streams ranking
+    
+    Args:
+        ranked: compare_streams result
+        n: Number of moments
+        per_stream: Keep at most this many from one VOD (None for no limit)
+    """
+    if per_stream is not None:
+        ranked = ranked[ranked.groupby('vod_id').cumcount() < per_stream]
+    return ranked.head(n).reset_index(drop=True)
+
+
+def stream_summary(ranked: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per VOD: audience, baseline and its best bin
+    
+    Args:
+        ranked: compare_streams result
+        
+    Returns:
+        Frame indexed by VOD name with 'audience', 'baseline', 'best_score',
+        'best_time' and 'best_lift', best stream first
+    """
+    best = ranked.drop_duplicates('vod_id')
+    return pd.DataFrame({
+        'audience': best['audience'].to_numpy(),
+        'baseline': best['baseline'].to_numpy(),
+        'best_score': best['score'].to_numpy(),
+        'best_time': best['time_seconds'].to_numpy(),
+        'best_lift': best['lift'].to_numpy(),
+    }, index=pd.Index(best['name'].to_numpy(), name='name'))
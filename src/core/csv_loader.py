@@ -0,0 +1,130 @@
+"""
+CSV Loader - Schema-aware reading of Chzzk chat exports
+"""
+import codecs
+import importlib.util
+import io
+import os
+from typing import Optional
+
+import pandas as pd
+
+from core.jobs import JobControl, report_progress
+
+
+# Columns the analyses use; anything else in the export is skipped while parsing
+CHAT_COLUMNS = ['재생시간', '닉네임', '메시지']
+
+# Explicit dtypes skip per-column type inference. Nicknames repeat all stream
+# long, so a category stores each one once.
+CHAT_DTYPES = {'재생시간': str, '닉네임': 'category', '메시지': str}
+
+# Bytes read to guess the encoding
+SNIFF_BYTES = 64 * 1024
+
+# Tried in order; cp949 covers Korean Windows (Excel) exports
+SNIFF_ENCODINGS = ('utf-8', 'cp949')
+
+
+def has_pyarrow() -> bool:
+    """Whether the multi-threaded pyarrow CSV engine is installed"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def sniff_encoding(file_path: str, sample_size: int = SNIFF_BYTES) -> str:
+    """
+    Guess the text encoding of a CSV from its first bytes
+    
+    Args:
+        file_path: Path to CSV file
+        sample_size: Number of bytes inspected
+        
+    Returns:
+        'utf-8-sig', 'utf-8' or 'cp949' (utf-8 when nothing decodes cleanly)
+    """
+    with open(file_path, 'rb') as f:
+        sample = f.read(sample_size)
+    
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    
+    for encoding in SNIFF_ENCODINGS:
+        # Incremental decoding tolerates a character cut off at the sample end
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            decoder.decode(sample, final=False)
+        except UnicodeDecodeError:
+            continue
+        return encoding
+    return 'utf-8'
+
+
+class _ProgressReader(io.RawIOBase):
+    """Binary file wrapper that reports the read position as progress"""
+    
+    def __init__(self, f, total_bytes: int, control: JobControl):
+        super().__init__()
+        self._file = f
+        self._total_bytes = max(total_bytes, 1)
+        self._control = control
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        size = self._file.readinto(buffer)
+        # Also raises AnalysisCancelled, which aborts the parse
+        self._control.report(self._file.tell() / self._total_bytes * 100, "파일 읽는 중")
+        return size
+
+
+def read_chat_csv(file_path: str, control: Optional[JobControl] = None,
+                  engine: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read the chat columns of a Chzzk CSV export
+    
+    Args:
+        file_path: Path to CSV file
+        control: Optional job control for progress and cancellation
+        engine: 'pyarrow' or 'c' (default: pyarrow when installed)
+        
+    Returns:
+        DataFrame with the CHAT_COLUMNS columns
+        
+    Raises:
+        ValueError: If a required column is missing
+    """
+    encoding = sniff_encoding(file_path)
+    # Both parsers skip a UTF-8 BOM themselves, and plain utf-8 is the only
+    # encoding they decode natively (anything else goes through Python codecs)
+    if encoding == 'utf-8-sig':
+        encoding = 'utf-8'
+    
+    header = pd.read_csv(file_path, nrows=0, encoding=encoding).columns
+    missing = [column for column in CHAT_COLUMNS if column not in header]
+    if missing:
+        raise ValueError(f"채팅 CSV에 필요한 열이 없습니다: {', '.join(missing)}")
+    
+    options = {'usecols': CHAT_COLUMNS, 'dtype': CHAT_DTYPES, 'encoding': encoding}
+    if engine is None:
+        engine = 'pyarrow' if has_pyarrow() else 'c'
+    
+    if engine == 'pyarrow':
+        # Parses with several threads in one call, so there is no progress in between
+        report_progress(control, 0, "파일 읽는 중")
+        df = pd.read_csv(file_path, engine='pyarrow', **options)
+        report_progress(control, 100, "파일 읽는 중")
+        return df
+    
+    if control is None:
+        return pd.read_csv(file_path, engine='c', **options)
+    
+    # Progress follows the file position as the parser pulls in blocks. pandas
+    # only applies the encoding to handles it opens itself, so anything but
+    # utf-8 (which the parser decodes natively) is decoded by a text wrapper.
+    with open(file_path, 'rb') as f:
+        reader = io.BufferedReader(_ProgressReader(f, os.path.getsize(file_path), control))
+        if encoding == 'utf-8':
+            return pd.read_csv(reader, engine='c', **options)
+        del options['encoding']
+        return pd.read_csv(io.TextIOWrapper(reader, encoding=encoding), engine='c', **options)
@@ -0,0 +1,99 @@
+"""
+Timeline Decimation - Peak-preserving downsampling for long timelines
+"""
+import numpy as np
+from typing import Tuple
+
+
+def minmax_indices(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Select the min and max point of each bucket (one bucket per pixel column)
+
+    Args:
+        y: Values to decimate
+        n_buckets: Number of buckets, usually the axes width in pixels
+
+    Returns:
+        Sorted indices into y (first and last point always included)
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    n_buckets = max(1, int(n_buckets))
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+
+    # Pad to a rectangular (bucket, slot) grid so argmin/argmax run vectorized
+    size = -(-n // n_buckets)
+    rows = -(-n // size)
+    padded_max = np.full(rows * size, -np.inf)
+    padded_min = np.full(rows * size, np.inf)
+    padded_max[:n] = y
+    padded_min[:n] = y
+
+    offsets = np.arange(rows) * size
+    max_idx = offsets + padded_max.reshape(rows, size).argmax(axis=1)
+    min_idx = offsets + padded_min.reshape(rows, size).argmin(axis=1)
+
+    return np.unique(np.concatenate(([0, n - 1], min_idx, max_idx)))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Args:
+        x: X coordinates (monotonically increasing)
+        y: Y values
+        n_out: Number of points to keep
+
+    Returns:
+        Sorted indices into x/y
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    n_out = int(n_out)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        if end <= start:
+            selected[i + 1] = start
+            a = start
+            continue
+
+        # Average of the next bucket is the third vertex of the triangle
+        avg_x = x[next_start:next_end].mean() if next_end > next_start else x[-1]
+        avg_y = y[next_start:next_end].mean() if next_end > next_start else y[-1]
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+
+    return selected
+
+
+def visible_range(x: np.ndarray, x_min: float, x_max: float) -> Tuple[int, int]:
+    """
+    Get the slice of a sorted x array inside [x_min, x_max], padded by one point
+    on each side so lines continue to the axes edge
+
+    Returns:
+        (start, stop) indices
+    """
+    start = max(int(np.searchsorted(x, x_min, side='left')) - 1, 0)
+    stop = min(int(np.searchsorted(x, x_max, side='right')) + 1, len(x))
+    return start, stop
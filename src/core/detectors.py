@@ -0,0 +1,304 @@
+"""
+Moment Detectors - Pluggable spike / change detection over per-bin features
+
+A feature is a pd.Series with one value per bin, indexed by bin start in
+seconds (message counts, keyword hits, cheese totals, sentiment, ...). A
+detector looks at the values only and picks the bins worth marking, each
+with a score where larger means stronger. Features are computed and cached
+by the analyzer, so any number of detectors can run over the same series
+without touching the chat log again.
+
+Register your own with the decorator:
+    
+    @register_detector('quiet', "조용한 구간")
+    def detect_quiet(values, ratio=0.2):
+        picked = np.flatnonzero(values <= values.mean() * ratio)
+        return picked, values.mean() - values[picked]
+"""
+import inspect
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from core.changepoints import DEFAULT_PENALTY, find_segments
+
+
+# Scales a median absolute deviation to the standard deviation of normal data
+MAD_TO_STD = 1.4826
+
+DEFAULT_DETECTOR = 'zscore'
+
+
+class DetectorResult:
+    """What a detector function returns: picked bins, their scores and any statistics"""
+    
+    def __init__(self, indices: np.ndarray, scores: np.ndarray, **stats):
+        """
+        Args:
+            indices: Positions of the picked bins in the feature
+            scores: Score of every picked bin (larger is stronger)
+            **stats: Detector statistics (e.g. mean, std, threshold)
+        """
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self.stats = stats
+
+
+class Detection:
+    """Moments one detector found in one feature"""
+    
+    def __init__(self, detector: str, params: Dict, moments: pd.DataFrame, stats: Dict):
+        """
+        Args:
+            detector: Registered detector key
+            params: Parameters it ran with (defaults filled in)
+            moments: 'time_seconds', 'value' and 'score' of every picked bin,
+                in time order
+            stats: Detector statistics
+        """
+        self.detector = detector
+        self.params = params
+        self.moments = moments
+        self.stats = stats
+    
+    def __len__(self) -> int:
+        return len(self.moments)
+
+
+class Detector:
+    """Registered moment detector"""
+    
+    def __init__(self, name: str, label: str,
+                 func: Callable[..., Union[DetectorResult, Tuple[np.ndarray, np.ndarray]]]):
+        self.name = name
+        self.label = label
+        self.func = func
+        # Keyword parameters and their defaults, from the function signature
+        self.defaults = {
+            parameter.name: parameter.default
+            for parameter in list(inspect.signature(func).parameters.values())[1:]
+        }
+    
+    def accepts(self, param: str) -> bool:
+        """Whether the detector takes this parameter"""
+        return param in self.defaults
+    
+    def bind(self, params: Optional[Dict] = None) -> Dict:
+        """Defaults overridden by params (unknown parameters are rejected)"""
+        params = params or {}
+        unknown = [name for name in params if name not in self.defaults]
+        if unknown:
+            raise ValueError(f"'{self.name}' 감지기에 없는 설정입니다: {', '.join(unknown)}")
+        bound = dict(self.defaults, **params)
+        missing = [name for name, value in bound.items() if value is inspect.Parameter.empty]
+        if missing:
+            raise ValueError(f"'{self.name}' 감지기에 필요한 설정이 없습니다: {', '.join(missing)}")
+        return bound
+
+
+DETECTORS: Dict[str, Detector] = {}
+
+
+def register_detector(name: str, label: str):
+    """
+    Decorator registering a detector function
+    
+    The function receives the feature values as a float64 array, plus its
+    keyword parameters, and returns a DetectorResult or a plain
+    (indices, scores) tuple.
+    
+    Args:
+        name: Detector key (e.g. 'zscore')
+        label: Name shown in the GUI / CLI help
+    """
+    def decorator(func):
+        DETECTORS[name] = Detector(name, label, func)
+        return func
+    return decorator
+
+
+def get_detector(name: str) -> Detector:
+    """Look up a registered detector"""
+    if name not in DETECTORS:
+        raise ValueError(f"지원하지 않는 감지기입니다: {name}")
+    return DETECTORS[name]
+
+
+def detect(name: str, feature: pd.Series, params: Optional[Dict] = None) -> Detection:
+    """
+    Run one detector over one feature
+    
+    Args:
+        name: Registered detector key
+        feature: One value per bin, indexed by bin start in seconds
+        params: Detector parameters (missing ones use the defaults)
+        
+    Returns:
+        Detection with the picked bins in time order
+    """
+    detector = get_detector(name)
+    params = detector.bind(params)
+    values = feature.to_numpy(dtype=np.float64)
+    
+    if len(values) == 0:
+        result = DetectorResult([], [])
+    else:
+        result = detector.func(values, **params)
+        if not isinstance(result, DetectorResult):
+            result = DetectorResult(*result)
+    
+    order = np.argsort(result.indices, kind='stable')
+    indices = result.indices[order]
+    moments = pd.DataFrame({
+        'time_seconds': feature.index.to_numpy()[indices].astype(np.int64),
+        'value': feature.to_numpy()[indices],
+        'score': result.scores[order],
+    })
+    return Detection(name, params, moments, result.stats)
+
+
+def run_detectors(feature: pd.Series,
+                  specs: Iterable[Union[str, Tuple[str, Dict]]]) -> List[Detection]:
+    """
+    Run several detectors over the same feature
+    
+    Args:
+        feature: One value per bin, indexed by bin start in seconds
+        specs: Detector keys, or (key, params) pairs
+        
+    Returns:
+        One Detection per spec, in order
+    """
+    detections = []
+    for spec in specs:
+        name, params = (spec, None) if isinstance(spec, str) else spec
+        detections.append(detect(name, feature, params))
+    return detections
+
+
+@register_detector('zscore', "Z-Score (평균 + 표준편차)")
+def detect_zscore(values: np.ndarray, sensitivity: float = 2.0) -> DetectorResult:
+    """Bins at least sensitivity standard deviations above the mean"""
+    mean = float(values.mean())
+    # Like pd.Series.std, a single bin has no spread (NaN) and is never picked
+    std = float(values.std(ddof=1)) if len(values) > 1 else float('nan')
+    
+    # Avoid division by zero
+    if std == 0:
+        threshold = mean
+        scores = np.zeros(len(values))
+    else:
+        threshold = mean + (sensitivity * std)
+        scores = (values - mean) / std
+    
+    picked = np.flatnonzero(values >= threshold)
+    return DetectorResult(picked, scores[picked], mean=mean, std=std, threshold=threshold)
+
+
+@register_detector('rolling_robust', "이동 중앙값 (급변 구간)")
+def detect_rolling_robust(values: np.ndarray, sensitivity: float = 3.0, window: int = 15,
+                          min_scale: float = 1.0) -> DetectorResult:
+    """
+    Bins far above the median of their neighbourhood
+    
+    The local median and median absolute deviation ignore the spikes
+    themselves and follow slow changes in chat rate, so a busy second half
+    doesn't hide the spikes of a quiet first half.
+    
+    Args:
+        sensitivity: Robust Z-Score a bin must reach
+        window: Neighbourhood size in bins (centered)
+        min_scale: Smallest deviation scale, so flat stretches (MAD 0) don't
+            turn every +1 into a spike
+    """
+    series = pd.Series(values)
+    rolling = dict(window=max(int(window), 1), center=True, min_periods=1)
+    median = series.rolling(**rolling).median()
+    mad = (series - median).abs().rolling(**rolling).median()
+    scale = np.maximum(mad.to_numpy() * MAD_TO_STD, min_scale)
+    scores = (values - median.to_numpy()) / scale
+    
+    picked = np.flatnonzero(scores >= sensitivity)
+    return DetectorResult(picked, scores[picked], threshold=sensitivity)
+
+
+@register_detector('change_point', "수준 변화 (전후 중앙값 비교)")
+def detect_change_point(values: np.ndarray, sensitivity: float = 2.0,
+                        window: int = 5) -> DetectorResult:
+    """
+    Bins where the level of the series shifts and stays
+    
+    Compares the median of the window bins before each bin with the median of
+    the window bins from it on and keeps the local maxima of the shift.
+    Medians make a lone spike (which the other detectors catch) no shift.
+    
+    Args:
+        sensitivity: Shift in noise levels (spread of bin-to-bin changes,
+            which the level shifts themselves barely move)
+        window: Bins on each side
+    """
+    n = len(values)
+    window = max(int(window), 1)
+    if n < 2 * window:
+        return DetectorResult([], [], threshold=sensitivity)
+    
+    medians = np.median(np.lib.stride_tricks.sliding_window_view(values, window), axis=1)
+    cut = np.arange(window, n - window + 1)
+    before = medians[cut - window]
+    after = medians[cut]
+    steps = np.abs(np.diff(values))
+    # Mostly flat integer counts have a median step of 0; fall back to the mean
+    noise = float(np.median(steps)) or float(steps.mean()) or 1.0
+    shift = np.abs(after - before) / (noise * MAD_TO_STD / np.sqrt(2))
+    
+    # Medians give runs of equal shifts around a change; the mean shift breaks
+    # the tie, then only the strongest cut within a window of another is kept
+    total = np.concatenate(([0.0], np.cumsum(values)))
+    mean_shift = np.abs(total[cut + window] - 2 * total[cut] + total[cut - window])
+    candidates = np.flatnonzero(shift >= sensitivity)
+    blocked = np.zeros(len(cut), dtype=bool)
+    kept = []
+    for i in candidates[np.lexsort((-mean_shift[candidates], -shift[candidates]))]:
+        if not blocked[i]:
+            kept.append(i)
+            blocked[max(i - window + 1, 0):i + window] = True
+    kept = np.array(kept, dtype=np.int64)
+    return DetectorResult(cut[kept], shift[kept], threshold=sensitivity)
+
+
+@register_detector('threshold', "고정 기준값")
+def detect_threshold(values: np.ndarray, threshold: float,
+                     difference: bool = False) -> DetectorResult:
+    """
+    Bins at or above a fixed value
+    
+    Args:
+        threshold: Value (or, with difference, absolute change) to reach
+        difference: Compare the change from the previous bin instead of the
+            value itself; the first bin then never qualifies
+    """
+    if difference:
+        change = np.abs(np.diff(values))
+        picked = np.flatnonzero(change >= threshold)
+        return DetectorResult(picked + 1, change[picked], threshold=threshold)
+    
+    picked = np.flatnonzero(values >= threshold)
+    return DetectorResult(picked, values[picked], threshold=threshold)
+
+
+@register_detector('pelt', "변화점 (PELT)")
+def detect_pelt(values: np.ndarray, penalty: float = DEFAULT_PENALTY, min_size: int = 3,
+                jump: int = 1) -> DetectorResult:
+    """
+    First bin of every segment after a lasting level change
+    
+    Args:
+        penalty: Penalty per change (see core.changepoints.find_segments)
+        min_size: Shortest segment in bins
+        jump: Change points only at multiples of this many bins
+    """
+    segments = find_segments(values, method='pelt', penalty=penalty, min_size=min_size,
+                             jump=jump)
+    picked = segments['start_seconds'].to_numpy()[1:].astype(np.int64)
+    return DetectorResult(picked, segments['score'].to_numpy()[1:])
@@ -0,0 +1,314 @@
+"""
+Marker Exporters - Stream marker tracks to NLE / platform formats
+"""
+import csv
+import os
+import re
+from fractions import Fraction
+from typing import Callable, Dict, Iterable, List, Optional, TextIO, Tuple
+from xml.sax.saxutils import quoteattr
+
+from core.markers import MarkerTrack, format_hms
+
+
+# Common NTSC rates are stored as exact fractions (29.97 -> 30000/1001)
+NTSC_RATES = {23.976: Fraction(24000, 1001), 29.97: Fraction(30000, 1001),
+              59.94: Fraction(60000, 1001)}
+
+# DaVinci Resolve timelines start at 01:00:00:00 unless changed in the project
+RESOLVE_TIMELINE_START = 3600.0
+
+# YouTube only accepts chapters that are at least 10 seconds long
+YOUTUBE_MIN_CHAPTER_SECONDS = 10
+
+
+class ExportOptions:
+    """Settings shared by every exporter"""
+    
+    def __init__(self, fps: float = 30.0, title: str = "Chzzk Chat Markers",
+                 point_duration: float = 5.0, timeline_start: Optional[float] = None):
+        """
+        Args:
+            fps: Frame rate for timecode based formats
+            title: Title written into EDL / FCPXML headers
+            point_duration: Display length of point markers in SRT (seconds)
+            timeline_start: Record timecode of the first frame in seconds
+                (defaults to 0, or 01:00:00:00 for DaVinci Resolve)
+        """
+        self.fps = fps
+        self.title = title
+        self.point_duration = point_duration
+        self.timeline_start = timeline_start
+    
+    @property
+    def frame_rate(self) -> Fraction:
+        """Exact frame rate"""
+        return NTSC_RATES.get(round(self.fps, 3), Fraction(self.fps).limit_denominator(1001))
+    
+    def frames(self, seconds: float) -> int:
+        """Seconds to a whole frame count"""
+        return int(round(Fraction(seconds).limit_denominator(1000) * self.frame_rate))
+    
+    @property
+    def nominal_fps(self) -> int:
+        """Frames per timecode second (30 for 29.97 non-drop-frame)"""
+        return max(int(round(self.fps)), 1)
+    
+    def timecode_from_frames(self, frames: int) -> str:
+        """Frame count to non-drop-frame HH:MM:SS:FF"""
+        total_seconds, frame = divmod(frames, self.nominal_fps)
+        return f"{format_hms(total_seconds)}:{frame:02d}"
+    
+    def timecode(self, seconds: float) -> str:
+        """Seconds to non-drop-frame HH:MM:SS:FF"""
+        return self.timecode_from_frames(self.frames(seconds))
+    
+    def start_frames(self, default: float = 0.0) -> int:
+        """
+        Frame count of the timeline start timecode
+        
+        Timeline start is a timecode label, so it is counted in nominal frames
+        (01:00:00:00 at 29.97 is 108000 frames, not 3600 real seconds).
+        """
+        start = default if self.timeline_start is None else self.timeline_start
+        return int(round(start * self.nominal_fps))
+
+
+class Exporter:
+    """Registered marker format"""
+    
+    def __init__(self, name: str, label: str, suffix: str,
+                 writer: Callable[[TextIO, MarkerTrack, ExportOptions], int],
+                 encoding: str = 'utf-8', newline: Optional[str] = None):
+        self.name = name
+        self.label = label
+        self.suffix = suffix
+        self.writer = writer
+        self.encoding = encoding
+        self.newline = newline
+
+
+EXPORTERS: Dict[str, Exporter] = {}
+
+
+def register_exporter(name: str, label: str, suffix: str,
+                      encoding: str = 'utf-8', newline: Optional[str] = None):
+    """
+    Decorator registering a marker writer
+    
+    The writer receives an open text stream, the track and the export options,
+    writes markers one at a time and returns the number written.
+    
+    Args:
+        name: Format key (e.g. 'premiere_csv')
+        label: Name shown in the GUI
+        suffix: File name suffix including the extension
+        encoding: Output file encoding
+        newline: newline argument for open()
+    """
+    def decorator(writer):
+        EXPORTERS[name] = Exporter(name, label, suffix, writer, encoding, newline)
+        return writer
+    return decorator
+
+
+def get_exporter(name: str) -> Exporter:
+    """Look up a registered format"""
+    if name not in EXPORTERS:
+        raise ValueError(f"지원하지 않는 내보내기 형식입니다: {name}")
+    return EXPORTERS[name]
+
+
+def export_track(track: MarkerTrack, output_path: str, format_name: str,
+                 options: Optional[ExportOptions] = None) -> int:
+    """
+    Write one marker track in one format
+    
+    Args:
+        track: Markers to write
+        output_path: Output file path
+        format_name: Registered format key
+        options: Export options (defaults to ExportOptions())
+        
+    Returns:
+        Number of markers written
+    """
+    exporter = get_exporter(format_name)
+    options = options or ExportOptions()
+    with open(output_path, 'w', encoding=exporter.encoding, newline=exporter.newline) as f:
+        return exporter.writer(f, track, options)
+
+
+def export_all(tracks: Iterable[MarkerTrack], format_names: Iterable[str], output_dir: str,
+               options: Optional[ExportOptions] = None) -> List[str]:
+    """
+    Write every track in every format
+    
+    Files are named <track name><format suffix> inside output_dir.
+    
+    Returns:
+        Paths of the written files
+    """
+    options = options or ExportOptions()
+    exporters = [get_exporter(name) for name in format_names]
+    os.makedirs(output_dir, exist_ok=True)
+    
+    paths = []
+    for track in tracks:
+        for exporter in exporters:
+            path = os.path.join(output_dir, safe_filename(track.name) + exporter.suffix)
+            export_track(track, path, exporter.name, options)
+            paths.append(path)
+    return paths
+
+
+def safe_filename(name: str) -> str:
+    """Replace characters that are not allowed in file names"""
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', name).strip('_') or 'markers'
+
+
+@register_exporter('premiere_csv', "Premiere Pro 마커 (CSV)", '_premiere.csv',
+                   encoding='utf-8-sig', newline='')
+def write_premiere_csv(f: TextIO, track: MarkerTrack, options: ExportOptions) -> int:
+    """Premiere Pro marker CSV"""
+    writer = csv.writer(f, lineterminator='\n')
+    writer.writerow(['Marker Name', 'Description', 'In', 'Out', 'Duration', 'Marker Type'])
+    count = 0
+    for start, end, label, description in track:
+        if end > start:
+            out_time, duration = format_hms(end), format_hms(end - start)
+        else:
+            out_time, duration = '', ''
+        writer.writerow([label, description, format_hms(start), out_time, duration, 'Comment'])
+        count += 1
+    return count
+
+
+def _write_edl_header(f: TextIO, options: ExportOptions):
+    f.write(f"TITLE: {options.title}\n")
+    f.write("FCM: NON-DROP FRAME\n\n")
+
+
+def _edl_times(options: ExportOptions, start: float, end: float,
+               offset: int) -> Tuple[str, str, str, str]:
+    """Source in/out and record in/out timecodes"""
+    start_frame, end_frame = options.frames(start), options.frames(end)
+    return (options.timecode_from_frames(start_frame), options.timecode_from_frames(end_frame),
+            options.timecode_from_frames(start_frame + offset),
+            options.timecode_from_frames(end_frame + offset))
+
+
+@register_exporter('cmx_edl', "CMX 3600 EDL", '.edl')
+def write_cmx_edl(f: TextIO, track: MarkerTrack, options: ExportOptions) -> int:
+    """CMX 3600 EDL with one event per marker"""
+    _write_edl_header(f, options)
+    offset = options.start_frames()
+    count = 0
+    for count, (start, end, label, description) in enumerate(track, 1):
+        src_in, src_out, rec_in, rec_out = _edl_times(options, start, end, offset)
+        f.write(f"{count:03d}  AX       V     C        {src_in} {src_out} {rec_in} {rec_out}\n")
+        f.write(f"* FROM CLIP NAME: {label}\n")
+        f.write(f"* COMMENT: {description}\n\n")
+    return count
+
+
+@register_exporter('resolve_edl', "DaVinci Resolve 마커 EDL", '_resolve.edl')
+def write_resolve_edl(f: TextIO, track: MarkerTrack, options: ExportOptions) -> int:
+    """EDL in the layout DaVinci Resolve uses for timeline marker import"""
+    _write_edl_header(f, options)
+    offset = options.start_frames(RESOLVE_TIMELINE_START)
+    count = 0
+    for count, (start, end, label, description) in enumerate(track, 1):
+        # Resolve markers are at least one frame long
+        start_frame = options.frames(start) + offset
+        duration = max(options.frames(end) + offset - start_frame, 1)
+        rec_in = options.timecode_from_frames(start_frame)
+        rec_out = options.timecode_from_frames(start_frame + duration)
+        f.write(f"{count:03d}  001      V     C        {rec_in} {rec_out} {rec_in} {rec_out}  \n")
+        f.write(f"{description} |C:ResolveColorBlue |M:{label} |D:{duration}\n\n")
+    return count
+
+
+@register_exporter('fcpxml', "Final Cut Pro XML", '.fcpxml')
+def write_fcpxml(f: TextIO, track: MarkerTrack, options: ExportOptions) -> int:
+    """FCPXML 1.9 project with the markers placed on a gap clip"""
+    rate = options.frame_rate
+    
+    def rational(frames: int) -> str:
+        # Frame count as seconds in FCPXML rational notation
+        value = frames / rate
+        return f"{value.numerator}/{value.denominator}s" if value.denominator != 1 else f"{value.numerator}s"
+    
+    offset = options.start_frames()
+    total_frames = max(options.frames(track.end_time) + 1, 1)
+    title = quoteattr(options.title)
+    
+    f.write('<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE fcpxml>\n')
+    f.write('<fcpxml version="1.9">\n  <resources>\n')
+    f.write(f'    <format id="r1" frameDuration="{rational(1)}" width="1920" height="1080"/>\n')
+    f.write('  </resources>\n  <library>\n')
+    f.write(f'    <event name={title}>\n      <project name={title}>\n')
+    f.write(f'        <sequence format="r1" duration="{rational(total_frames)}" '
+            f'tcStart="{rational(offset)}" tcFormat="NDF">\n          <spine>\n')
+    f.write(f'            <gap name="Gap" offset="{rational(offset)}" '
+            f'start="{rational(offset)}" duration="{rational(total_frames)}">\n')
+    
+    count = 0
+    for start, end, label, description in track:
+        start_frame = options.frames(start)
+        duration = max(options.frames(end) - start_frame, 1)
+        f.write(f'              <marker start="{rational(start_frame + offset)}" '
+                f'duration="{rational(duration)}" value={quoteattr(label)} '
+                f'note={quoteattr(description)}/>\n')
+        count += 1
+    
+    f.write('            </gap>\n          </spine>\n        </sequence>\n')
+    f.write('      </project>\n    </event>\n  </library>\n</fcpxml>\n')
+    return count
+
+
+def _chapter_time(seconds: float, with_hours: bool) -> str:
+    seconds = int(seconds)
+    if with_hours:
+        return f"{seconds // 3600}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+@register_exporter('youtube_chapters', "YouTube 챕터", '_chapters.txt')
+def write_youtube_chapters(f: TextIO, track: MarkerTrack, options: ExportOptions) -> int:
+    """YouTube description chapters (first at 0:00, each at least 10 seconds)"""
+    with_hours = track.end_time >= 3600
+    count = 0
+    previous = None
+    for start, _end, label, _description in track:
+        if previous is None:
+            # YouTube requires the first chapter to start at 0:00
+            if start >= YOUTUBE_MIN_CHAPTER_SECONDS:
+                f.write(f"{_chapter_time(0, with_hours)} 시작\n")
+                count += 1
+                previous = 0
+            else:
+                start = 0
+        elif start - previous < YOUTUBE_MIN_CHAPTER_SECONDS:
+            continue
+        f.write(f"{_chapter_time(start, with_hours)} {label.replace(chr(10), ' ')}\n")
+        count += 1
+        previous = start
+    return count
+
+
+def _srt_time(seconds: float) -> str:
+    millis = int(round(seconds * 1000))
+    secs, millis = divmod(millis, 1000)
+    return f"{format_hms(secs)},{millis:03d}"
+
+
+@register_exporter('srt', "SRT 자막", '.srt')
+def write_srt(f: TextIO, track: MarkerTrack, options: ExportOptions) -> int:
+    """SubRip subtitles showing each marker while it is active"""
+    count = 0
+    for count, (start, end, label, description) in enumerate(track, 1):
+        if end <= start:
+            end = start + options.point_duration
+        f.write(f"{count}\n{_srt_time(start)} --> {_srt_time(end)}\n{label}\n{description}\n\n")
+    return count
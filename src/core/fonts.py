@@ -0,0 +1,113 @@
+"""
+Font Lookup - Korean font discovery cached on disk between runs
+"""
+import json
+import os
+import platform
+from pathlib import Path
+from typing import Callable, Optional
+
+
+APP_NAME = "ChzzkClipMomentCatcher"
+FONT_CACHE_FILE = "fonts.json"
+
+
+def user_cache_dir() -> Path:
+    """Per-user cache directory for this application"""
+    system = platform.system()
+    if system == 'Windows':
+        base = os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local'
+    elif system == 'Darwin':
+        base = Path.home() / 'Library' / 'Caches'
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / APP_NAME
+
+
+def _cache_path() -> Path:
+    return user_cache_dir() / FONT_CACHE_FILE
+
+
+def _load_cache() -> dict:
+    try:
+        with open(_cache_path(), encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # A cache copied from another OS is useless
+    if not isinstance(cache, dict) or cache.get('platform') != platform.system():
+        return {}
+    return cache
+
+
+def _save_cache(cache: dict):
+    cache['platform'] = platform.system()
+    try:
+        path = _cache_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+    except OSError:
+        # Read-only home directory etc.; the lookup just runs again next time
+        pass
+
+
+def cached_lookup(key: str, lookup: Callable[[], Optional[str]],
+                  is_valid: Callable[[str], bool] = lambda value: True) -> Optional[str]:
+    """
+    Return a cached font setting, running lookup only on a cache miss
+    
+    Args:
+        key: Cache entry name
+        lookup: Finds the value (may be slow, e.g. a font scan)
+        is_valid: Rejects a stale cached value (e.g. a deleted font file)
+        
+    Returns:
+        The cached or freshly looked-up value (None results are not cached)
+    """
+    cache = _load_cache()
+    value = cache.get(key)
+    if value is not None and is_valid(value):
+        return value
+    
+    value = lookup()
+    if value is not None:
+        cache[key] = value
+        _save_cache(cache)
+    return value
+
+
+def find_korean_font_file() -> Optional[str]:
+    """Path of a Korean-capable font file for wordcloud rendering"""
+    system = platform.system()
+    
+    if system == 'Darwin':  # macOS
+        fonts = [
+            '/System/Library/Fonts/AppleSDGothicNeo.ttc',
+            # Fallback
+            '/System/Library/Fonts/Supplemental/Arial Unicode.ttf',
+        ]
+    elif system == 'Windows':
+        fonts = [
+            'C:\\Windows\\Fonts\\malgun.ttf',  # 맑은 고딕
+            'C:\\Windows\\Fonts\\gulim.ttc',   # 굴림
+            'C:\\Windows\\Fonts\\batang.ttc',  # 바탕
+            # Fallback to Arial Unicode
+            'C:\\Windows\\Fonts\\arial.ttf',
+        ]
+    else:  # Linux
+        fonts = [
+            '/usr/share/fonts/truetype/nanum/NanumGothic.ttf',
+            '/usr/share/fonts/truetype/nanum/NanumBarunGothic.ttf',
+        ]
+    
+    for font in fonts:
+        if Path(font).exists():
+            return font
+    # The last Windows entry is used even if missing (previous behavior)
+    return fonts[-1] if system == 'Windows' else None
+
+
+def korean_font_file() -> Optional[str]:
+    """Cached find_korean_font_file()"""
+    return cached_lookup('font_file', find_korean_font_file, lambda path: Path(path).exists())
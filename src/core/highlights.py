@@ -0,0 +1,286 @@
+"""
+Highlight Score - One ranked list of the best moments from every signal
+
+Each analysis finds its own moments; an editor wants the N best overall.
+Every signal is computed over one shared bin grid (one bin_aggregates pass),
+turned into a robust Z-Score so chat counts and cheese amounts are on the
+same scale, and mixed with configurable weights. The best bins are then
+taken from a heap, skipping any bin too close to one already picked
+(non-maximum suppression), so one long hype moment doesn't fill the list.
+"""
+import heapq
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from core.analyzer import ChatAnalyzer
+from core.detectors import MAD_TO_STD
+from core.jobs import JobControl, report_progress
+from core.markers import MarkerTrack, format_hms
+from core.spam_filter import SpamOptions
+from core import timing
+
+
+SIGNALS = ('density', 'chatters', 'keywords', 'sentiment', 'donations', 'emotes')
+
+SIGNAL_LABELS = {
+    'density': "채팅 급증",
+    'chatters': "참여자 증가",
+    'keywords': "키워드",
+    'sentiment': "분위기 변화",
+    'donations': "후원",
+    'emotes': "이모티콘",
+}
+
+DEFAULT_WEIGHTS = {
+    'density': 1.0,
+    'chatters': 1.0,
+    'keywords': 1.0,
+    'sentiment': 0.5,
+    'donations': 0.5,
+    'emotes': 0.5,
+}
+
+# Messages of pseudo-count pulling a bin's mean sentiment toward the stream's,
+# so a bin with two messages can't swing the mood on its own
+SENTIMENT_PRIOR = 5.0
+
+
+class HighlightOptions:
+    """How the highlight score is computed and picked"""
+    
+    def __init__(self, bin_seconds: int = 30, weights: Optional[Dict[str, float]] = None,
+                 top_n: int = 20, min_gap: Optional[float] = None,
+                 keywords: Sequence[str] = (), spam_filter: Optional[SpamOptions] = None):
+        """
+        Args:
+            bin_seconds: Bin size of the grid every signal is computed on
+            weights: Signal -> weight (missing signals keep DEFAULT_WEIGHTS;
+                0 leaves a signal out)
+            top_n: Number of highlights
+            min_gap: Picked highlights start at least this many seconds apart
+                (defaults to 4 bins)
+            keywords: Keywords counted by the 'keywords' signal
+            spam_filter: Count messages, keyword mentions and emoticons by
+                their flood weight (see ChatAnalyzer.get_spam_scan)
+        """
+        unknown = set(weights or {}) - set(SIGNALS)
+        if unknown:
+            raise ValueError(f"알 수 없는 하이라이트 신호입니다: {', '.join(sorted(unknown))}")
+        self.bin_seconds = max(int(bin_seconds), 1)
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.top_n = top_n
+        self.min_gap = 4 * self.bin_seconds if min_gap is None else min_gap
+        self.keywords = tuple(keywords)
+        self.spam_filter = spam_filter
+
+
+def robust_scores(values: np.ndarray) -> np.ndarray:
+    """
+    How far each value sits above the typical one, in robust deviations
+    
+    Median and MAD ignore the spikes being looked for. Sparse signals
+    (mostly zero, like donations) have a MAD of 0 and fall back to the mean
+    absolute deviation. Values below the median score 0: a quiet bin is no
+    evidence against a highlight. Deviations are compressed with log1p, so a
+    500-deviation flood in one signal still ranks first but can't drown out
+    every other signal.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return values
+    median = np.median(values)
+    deviation = np.abs(values - median)
+    scale = np.median(deviation) * MAD_TO_STD or deviation.mean() * np.sqrt(np.pi / 2)
+    if scale == 0:
+        return np.zeros(len(values))
+    return np.log1p(np.maximum((values - median) / scale, 0.0))
+
+
+def signal_frame(analyzer: ChatAnalyzer, options: HighlightOptions,
+                 sentiment_scores: Optional[pd.Series] = None,
+                 control: Optional[JobControl] = None) -> pd.DataFrame:
+    """
+    Raw value of every signal in every bin of the stream
+    
+    Args:
+        analyzer: Analyzer with a loaded log
+        options: Highlight options
+        sentiment_scores: Score of every message (ChatAnalyzer.get_sentiment_scores);
+            without it the 'sentiment' signal is 0
+        control: Optional job control for progress and cancellation
+        
+    Returns:
+        DataFrame with 'time_seconds' and one column per name in SIGNALS:
+        messages, distinct chatters, keyword mentions, change of mean
+        sentiment from the previous bin, cheese and emoticons
+    """
+    extra = {}
+    if sentiment_scores is not None:
+        scores = sentiment_scores.to_numpy(dtype=np.float64)
+        extra = {'_sentiment_sum': scores, '_sentiment_count': ~np.isnan(scores)}
+    metrics = ('messages', 'chatters', 'donation_amount', 'emotes')
+    keywords = options.keywords
+    if options.spam_filter is not None:
+        # Floods count by their weight; a flooding bot is still one chatter
+        weights = analyzer.get_spam_scan(options.spam_filter, control=control).weights
+        extra['messages'] = weights
+        extra['emotes'] = analyzer.get_emote_counts() * weights
+        for keyword in keywords:
+            extra[keyword] = analyzer.get_keyword_mask(keyword, control=control) * weights
+        metrics = ('chatters', 'donation_amount')
+        keywords = ()
+    totals = analyzer.bin_aggregates(options.bin_seconds, keywords, control, metrics,
+                                     extra or None)
+    if options.spam_filter is not None:
+        # Whole messages, like the unfiltered counts
+        for name in ('messages', 'emotes') + options.keywords:
+            totals[name] = np.rint(totals[name]).astype(np.int64)
+    
+    keyword_hits = np.zeros(len(totals), dtype=np.int64)
+    for keyword in options.keywords:
+        keyword_hits += totals[keyword].to_numpy()
+    
+    sentiment_shift = np.zeros(len(totals))
+    if sentiment_scores is not None and len(totals):
+        sums = totals['_sentiment_sum'].to_numpy()
+        counts = totals['_sentiment_count'].to_numpy()
+        overall = sums.sum() / max(counts.sum(), 1.0)
+        mood = (sums + SENTIMENT_PRIOR * overall) / (counts + SENTIMENT_PRIOR)
+        sentiment_shift = np.abs(np.diff(mood, prepend=mood[0]))
+    
+    return pd.DataFrame({
+        'time_seconds': totals['time_seconds'].to_numpy(),
+        'density': totals['messages'].to_numpy(),
+        'chatters': totals['chatters'].to_numpy(),
+        'keywords': keyword_hits,
+        'sentiment': sentiment_shift,
+        'donations': totals['donation_amount'].to_numpy(),
+        'emotes': totals['emotes'].to_numpy(),
+    })
+
+
+def score_bins(signals: pd.DataFrame, weights: Dict[str, float]) -> pd.DataFrame:
+    """
+    Weighted highlight score of every bin
+    
+    Args:
+        signals: signal_frame result
+        weights: Signal -> weight
+        
+    Returns:
+        DataFrame with 'time_seconds', 'score' (weighted mean of the
+        compressed signal Z-Scores) and the share of every signal in it, '<signal>_contribution'
+    """
+    used = [name for name in SIGNALS if weights.get(name, 0.0) > 0]
+    total_weight = sum(weights[name] for name in used)
+    result = pd.DataFrame({'time_seconds': signals['time_seconds'].to_numpy()})
+    score = np.zeros(len(signals))
+    for name in SIGNALS:
+        contribution = np.zeros(len(signals))
+        if name in used:
+            contribution = weights[name] * robust_scores(signals[name].to_numpy()) / total_weight
+        result[f'{name}_contribution'] = contribution
+        score += contribution
+    result['score'] = score
+    return result
+
+
+def select_top(times: np.ndarray, scores: np.ndarray, k: int, min_gap: float) -> List[int]:
+    """
+    Positions of the k best scores, none closer than min_gap to a better one
+    
+    A heap gives the next best bin in O(log n), so picking k highlights never
+    sorts every bin; accepted times stay sorted for an O(log k) gap check.
+    
+    Args:
+        times: Time of every bin
+        scores: Score of every bin (only positive scores are picked)
+        k: Number to pick
+        min_gap: Smallest distance between two picks
+        
+    Returns:
+        Picked positions, best first
+    """
+    heap = [(-score, i) for i, score in enumerate(scores.tolist()) if score > 0]
+    heapq.heapify(heap)
+    picked: List[int] = []
+    taken: List[float] = []
+    while heap and len(picked) < k:
+        _, i = heapq.heappop(heap)
+        time = float(times[i])
+        at = bisect_left(taken, time)
+        if at < len(taken) and taken[at] - time < min_gap:
+            continue
+        if at > 0 and time - taken[at - 1] < min_gap:
+            continue
+        insort(taken, time)
+        picked.append(i)
+    return picked
+
+
+def find_highlights(analyzer: ChatAnalyzer, options: Optional[HighlightOptions] = None,
+                    sentiment_scores: Optional[pd.Series] = None,
+                    control: Optional[JobControl] = None) -> pd.DataFrame:
+    """
+    The best moments of a stream by the combined highlight score
+    
+    Args:
+        analyzer: Analyzer with a loaded log
+        options: Highlight options (defaults to HighlightOptions())
+        sentiment_scores: Score of every message; needed for the 'sentiment'
+            signal
+        control: Optional job control for progress and cancellation
+        
+    Returns:
+        DataFrame, best first: 'rank', 'time_seconds', 'end_seconds',
+        'time_str', 'score', 'reason' (the signal adding most), the raw value
+        of every signal and its '<signal>_contribution' to the score
+    """
+    options = options or HighlightOptions()
+    report_progress(control, 60, "신호 집계 중")
+    with timing.span('highlight.signals'):
+        signals = signal_frame(analyzer, options, sentiment_scores, control)
+    
+    report_progress(control, 90, "하이라이트 고르는 중")
+    with timing.span('highlight.score'):
+        scored = score_bins(signals, options.weights)
+        picked = select_top(scored['time_seconds'].to_numpy(), scored['score'].to_numpy(),
+                            options.top_n, options.min_gap)
+    
+    shares = [f'{name}_contribution' for name in SIGNALS]
+    contributions = scored[shares].to_numpy()[picked]
+    starts = signals['time_seconds'].to_numpy()[picked]
+    best = pd.DataFrame({
+        'rank': np.arange(1, len(picked) + 1),
+        'time_seconds': starts,
+        'end_seconds': starts + options.bin_seconds,
+        'time_str': [format_hms(start) for start in starts.tolist()],
+        'score': scored['score'].to_numpy()[picked],
+        'reason': [SIGNALS[i] for i in contributions.argmax(axis=1)] if len(picked) else [],
+    })
+    for name in SIGNALS:
+        best[name] = signals[name].to_numpy()[picked]
+    best[shares] = contributions
+    return best
+
+
+def highlight_track(highlights: pd.DataFrame) -> MarkerTrack:
+    """
+    Ranged markers for find_highlights results
+    
+    Labels carry the rank; descriptions name the signals that add at least
+    a quarter of the score.
+    """
+    labels = [f"하이라이트 {rank}위" for rank in highlights['rank'].tolist()]
+    descriptions = []
+    for _, row in highlights.iterrows():
+        reasons = [SIGNAL_LABELS[name] for name in SIGNALS
+                   if row[f'{name}_contribution'] >= row['score'] / 4]
+        descriptions.append(f"점수 {row['score']:.2f} - {', '.join(reasons)} "
+                            f"(채팅 {int(row['density']):,}개, 참여자 {int(row['chatters']):,}명)")
+    return MarkerTrack("highlights", highlights['time_seconds'].to_numpy(), labels, descriptions,
+                       ends=highlights['end_seconds'].to_numpy(),
+                       scores=highlights['score'].to_numpy())
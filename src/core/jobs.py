@@ -0,0 +1,94 @@
+"""
+Job Control - Cooperative cancellation and progress reporting for analyses
+"""
+import threading
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    # pandas is only needed once an analysis runs, not to start the GUI
+    import pandas as pd
+
+
+# Rows processed between cancellation checks / progress updates
+CHUNK_SIZE = 50_000
+
+
+class AnalysisCancelled(Exception):
+    """Raised inside an analysis when its job has been cancelled"""
+
+
+class JobControl:
+    """
+    Handle passed into long-running analyses
+    
+    The analysis calls check() between chunks of work and report() to publish
+    progress; the owner of the job calls cancel() from any thread.
+    """
+    
+    def __init__(self, progress_callback: Optional[Callable[[int, str], None]] = None):
+        self._cancelled = threading.Event()
+        self._progress_callback = progress_callback
+    
+    def cancel(self):
+        """Request cancellation (takes effect at the next check())"""
+        self._cancelled.set()
+    
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+    
+    def check(self):
+        """Raise AnalysisCancelled if cancellation was requested"""
+        if self._cancelled.is_set():
+            raise AnalysisCancelled()
+    
+    def report(self, percent: float, message: str = ""):
+        """Publish progress (0-100) and check for cancellation"""
+        self.check()
+        if self._progress_callback is not None:
+            self._progress_callback(int(max(0, min(100, percent))), message)
+
+
+def check_cancelled(control: Optional[JobControl]):
+    """check() that accepts a missing control"""
+    if control is not None:
+        control.check()
+
+
+def report_progress(control: Optional[JobControl], percent: float, message: str = ""):
+    """report() that accepts a missing control"""
+    if control is not None:
+        control.report(percent, message)
+
+
+def apply_chunked(series: "pd.Series", func: Callable, control: Optional[JobControl] = None,
+                  start: float = 0, end: float = 100, message: str = "") -> "pd.Series":
+    """
+    Series.apply in chunks so a job can report progress and be cancelled
+    
+    Args:
+        series: Input series
+        func: Element-wise function
+        control: Job control (plain apply when None)
+        start: Progress percent at the first chunk
+        end: Progress percent after the last chunk
+        message: Progress message
+        
+    Returns:
+        Series with the same index as the input
+    """
+    if control is None or len(series) <= CHUNK_SIZE:
+        report_progress(control, start, message)
+        result = series.apply(func)
+        report_progress(control, end, message)
+        return result
+    
+    parts = []
+    total = len(series)
+    for offset in range(0, total, CHUNK_SIZE):
+        control.report(start + (end - start) * offset / total, message)
+        parts.append(series.iloc[offset:offset + CHUNK_SIZE].apply(func))
+    control.report(end, message)
+    
+    import pandas as pd
+    return pd.concat(parts)
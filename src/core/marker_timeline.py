@@ -0,0 +1,67 @@
+"""
+Marker Timeline - Combine marker tracks from several analyses into one
+"""
+import heapq
+from typing import Iterable, List, Optional
+
+from core.markers import MarkerTrack, ScoredMarker
+
+
+# Markers of different analyses closer than this are the same moment (seconds)
+DEFAULT_TOLERANCE = 30.0
+
+
+def _collapse(group: List[ScoredMarker]) -> ScoredMarker:
+    """Reduce markers of one moment to the highest-scoring one"""
+    best = max(group, key=lambda marker: marker[4])
+    start, end, label, description, score = best
+    
+    # A ranged winner grows to cover every clip of the moment
+    if end > start:
+        start = min(marker[0] for marker in group)
+        end = max(marker[1] for marker in group)
+    
+    others = list(dict.fromkeys(marker[2] for marker in group if marker[2] != label))
+    if others:
+        description = f"{description} / 함께: {', '.join(others)}"
+    return start, end, label, description, score
+
+
+def combine_tracks(tracks: Iterable[Optional[MarkerTrack]], tolerance: float = DEFAULT_TOLERANCE,
+                   name: str = "combined") -> MarkerTrack:
+    """
+    Merge marker tracks by time and drop duplicates of the same moment
+    
+    Every track is already sorted, so heapq.merge streams all markers in time
+    order (a k-way merge). A marker joins the current moment when it starts
+    within `tolerance` of the moment's first marker or inside one of its clips;
+    each moment keeps the label of its highest-scoring marker and mentions the
+    other analyses in the description.
+    
+    Args:
+        tracks: Marker tracks (None entries are skipped)
+        tolerance: Duplicate window in seconds
+        name: Name of the combined track
+        
+    Returns:
+        Combined MarkerTrack
+    """
+    merged = heapq.merge(*(track.scored() for track in tracks if track is not None),
+                         key=lambda marker: marker[0])
+    
+    combined: List[ScoredMarker] = []
+    group: List[ScoredMarker] = []
+    group_reach = 0.0
+    for marker in merged:
+        if group and marker[0] > group_reach:
+            combined.append(_collapse(group))
+            group = []
+        if not group:
+            group_reach = marker[0] + tolerance
+        group.append(marker)
+        group_reach = max(group_reach, marker[1])
+    if group:
+        combined.append(_collapse(group))
+    
+    starts, ends, labels, descriptions, scores = zip(*combined) if combined else ([],) * 5
+    return MarkerTrack(name, starts, labels, descriptions, ends=ends, scores=scores)
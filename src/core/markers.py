@@ -0,0 +1,84 @@
+"""
+Markers - Timeline markers shared by every exporter
+"""
+import numpy as np
+from typing import Iterator, Optional, Sequence, Tuple
+
+# (start_seconds, end_seconds, label, description)
+Marker = Tuple[float, float, str, str]
+
+# Marker plus its relative strength within the track (0-1)
+ScoredMarker = Tuple[float, float, str, str, float]
+
+
+def format_hms(seconds: float) -> str:
+    """Convert seconds to HH:MM:SS format"""
+    seconds = int(seconds)
+    hours = seconds // 3600
+    minutes = (seconds % 3600) // 60
+    secs = seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+class MarkerTrack:
+    """
+    Markers produced by one analysis, stored as parallel arrays sorted by time
+    
+    A marker whose end equals its start is a point marker; anything longer is
+    exported as a ranged clip (In/Out) by formats that support it. Scores say
+    how strong each marker is relative to the rest of its track, so markers
+    from different analyses can be compared when tracks are combined.
+    """
+    
+    def __init__(self, name: str, starts: Sequence[float], labels: Sequence[str],
+                 descriptions: Sequence[str], ends: Optional[Sequence[float]] = None,
+                 scores: Optional[Sequence[float]] = None):
+        """
+        Create a marker track
+        
+        Args:
+            name: Track name (used for output file names)
+            starts: Marker start times in seconds
+            labels: Short marker names
+            descriptions: Longer marker comments
+            ends: Marker end times in seconds (defaults to point markers)
+            scores: Marker strength; scaled to 0-1 by the track maximum
+                (defaults to 1 for every marker)
+        """
+        self.name = name
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.ends = self.starts.copy() if ends is None else np.asarray(ends, dtype=np.float64)
+        self.labels = np.asarray(labels, dtype=object)
+        self.descriptions = np.asarray(descriptions, dtype=object)
+        if scores is None:
+            self.scores = np.ones(len(self.starts))
+        else:
+            scores = np.asarray(scores, dtype=np.float64)
+            peak = scores.max() if len(scores) else 0.0
+            self.scores = scores / peak if peak > 0 else np.ones(len(scores))
+        
+        # Every format expects markers in time order
+        if len(self.starts) > 1 and np.any(np.diff(self.starts) < 0):
+            order = np.argsort(self.starts, kind='stable')
+            self.starts = self.starts[order]
+            self.ends = self.ends[order]
+            self.labels = self.labels[order]
+            self.descriptions = self.descriptions[order]
+            self.scores = self.scores[order]
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def __iter__(self) -> Iterator[Marker]:
+        return zip(self.starts.tolist(), self.ends.tolist(),
+                   self.labels.tolist(), self.descriptions.tolist())
+    
+    def scored(self) -> Iterator[ScoredMarker]:
+        """Iterate markers together with their scores"""
+        return zip(self.starts.tolist(), self.ends.tolist(), self.labels.tolist(),
+                   self.descriptions.tolist(), self.scores.tolist())
+    
+    @property
+    def end_time(self) -> float:
+        """Time of the last marker end (0 for an empty track)"""
+        return float(self.ends.max()) if len(self.ends) else 0.0
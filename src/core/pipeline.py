@@ -0,0 +1,324 @@
+"""
+Analysis Pipeline - Load, analyze and export one chat log without the GUI
+"""
+import os
+from typing import Dict, List, Optional, Sequence
+
+from core import timing
+from core.analyzer import ChatAnalyzer
+from core.detectors import DEFAULT_DETECTOR
+from core.changepoints import DEFAULT_PENALTY
+from core.highlights import HighlightOptions, find_highlights, highlight_track
+from core.sentiment_analyzer import SentimentAnalyzer
+from core.spam_filter import SpamOptions
+from core.wordcloud_gen import WordCloudGenerator
+from core.exporters import ExportOptions, export_all, safe_filename
+from core.marker_timeline import combine_tracks
+from core.segments import SegmentOptions
+from core.jobs import JobControl, report_progress
+from core.result_store import (DEFAULT_BIN_SECONDS, ResultStore, mood_moments,
+                               significant_moments)
+
+
+# Run when no analyses are chosen
+DEFAULT_ANALYSES = ('density', 'keyword', 'sentiment', 'donation', 'wordcloud')
+
+ANALYSES = DEFAULT_ANALYSES + ('changepoint', 'highlight')
+
+
+class PipelineSettings:
+    """Everything a headless run needs to know (picklable for worker processes)"""
+    
+    def __init__(self, analyses: Sequence[str] = DEFAULT_ANALYSES, keywords: Sequence[str] = (),
+                 interval_minutes: float = 1.0, sensitivity: float = 2.0,
+                 detector: str = DEFAULT_DETECTOR, detector_params: Optional[Dict] = None,
+                 sentiment_interval: float = 1.0, mood_top_n: int = 10,
+                 changepoint_method: str = 'pelt', changepoint_penalty: float = DEFAULT_PENALTY,
+                 changepoint_min_seconds: int = 60, highlight_top_n: int = 20,
+                 highlight_seconds: int = 30, highlight_weights: Optional[Dict[str, float]] = None,
+                 highlight_gap: Optional[float] = None, spam_filter: Optional[Dict] = None,
+                 formats: Sequence[str] = ('premiere_csv',), fps: float = 30.0,
+                 segments: Optional[Dict[str, float]] = None,
+                 combine_tolerance: Optional[float] = None,
+                 wordcloud_size: Sequence[int] = (1600, 800), max_words: int = 200,
+                 spike_wordclouds: int = 0, record_timings: bool = False,
+                 timing_log: Optional[str] = None, record_memory: bool = False,
+                 result_db: Optional[str] = None):
+        """
+        Args:
+            analyses: Analyses to run (subset of ANALYSES)
+            keywords: Keywords for the keyword analysis
+            interval_minutes: Bin size for density / keyword / donation analyses
+            sensitivity: Z-Score threshold (1.0=low, 2.0=normal, 3.0=high)
+            detector: Detector picking the significant bins of the density /
+                keyword / donation analyses (keys of core.detectors.DETECTORS)
+            detector_params: Further detector parameters
+            sentiment_interval: Bin size for the sentiment analysis
+            mood_top_n: Number of mood changes exported
+            changepoint_method: 'pelt' or 'binseg' for the change point analysis
+            changepoint_penalty: Penalty per change (higher finds fewer, bigger shifts)
+            changepoint_min_seconds: Shortest change point segment
+            highlight_top_n: Number of highlights ranked by the combined score
+            highlight_seconds: Bin size of the highlight score
+            highlight_weights: Signal weights of the highlight score
+                (core.highlights.DEFAULT_WEIGHTS for missing signals)
+            highlight_gap: Smallest distance between two highlights in seconds
+                (defaults to 4 bins)
+            spam_filter: SpamOptions arguments (window_seconds, max_repeats,
+                min_copies, min_chars, near_duplicates) to count repeat floods
+                and copy-paste waves by their flood weight in the density,
+                keyword and highlight analyses; None counts every message
+            formats: Marker formats (keys of core.exporters.EXPORTERS)
+            fps: Frame rate for timecode based formats
+            segments: SegmentOptions arguments (max_gap, pre_roll, post_roll) to
+                export ranged clips; None exports one point marker per bin
+            combine_tolerance: Combine all analyses into one file with this
+                duplicate window; None writes one file per analysis
+            wordcloud_size: Wordcloud PNG width and height
+            max_words: Words per wordcloud
+            spike_wordclouds: Also render the chat of the N biggest density spikes
+            record_timings: Add per-stage timings to the summary
+            timing_log: Also append every timed stage to this JSON lines file
+            record_memory: Add the memory peak and RSS change of every stage
+                to the timings (tracemalloc; slows the run down)
+            result_db: Also record per-bin totals and detected moments in this
+                SQLite result store (core.result_store)
+        """
+        self.analyses = tuple(analyses)
+        # Repeated keywords would analyze and write the same results twice
+        self.keywords = tuple(dict.fromkeys(keywords))
+        self.interval_minutes = interval_minutes
+        self.sensitivity = sensitivity
+        self.detector = detector
+        self.detector_params = dict(detector_params or {})
+        self.sentiment_interval = sentiment_interval
+        self.mood_top_n = mood_top_n
+        self.changepoint_method = changepoint_method
+        self.changepoint_penalty = changepoint_penalty
+        self.changepoint_min_seconds = changepoint_min_seconds
+        self.highlight_top_n = highlight_top_n
+        self.highlight_seconds = highlight_seconds
+        self.highlight_weights = dict(highlight_weights or {})
+        self.highlight_gap = highlight_gap
+        self.spam_filter = dict(spam_filter) if spam_filter is not None else None
+        self.formats = tuple(formats)
+        self.fps = fps
+        self.segments = dict(segments) if segments is not None else None
+        self.combine_tolerance = combine_tolerance
+        self.wordcloud_size = tuple(wordcloud_size)
+        self.max_words = max_words
+        self.spike_wordclouds = spike_wordclouds
+        self.record_timings = record_timings
+        self.timing_log = timing_log
+        self.record_memory = record_memory
+        self.result_db = result_db
+    
+    def segment_options(self, interval_minutes: float) -> Optional[SegmentOptions]:
+        """Clip settings for an analysis binned at interval_minutes"""
+        if self.segments is None:
+            return None
+        return SegmentOptions(bin_seconds=interval_minutes * 60, **self.segments)
+    
+    def highlight_options(self) -> HighlightOptions:
+        """Options of the highlight score (keywords come from the keyword list)"""
+        return HighlightOptions(self.highlight_seconds, self.highlight_weights,
+                                self.highlight_top_n, self.highlight_gap, self.keywords,
+                                self.spam_options())
+    
+    def spam_options(self) -> Optional[SpamOptions]:
+        """Flood thresholds, or None when every message counts"""
+        if self.spam_filter is None:
+            return None
+        return SpamOptions(**self.spam_filter)
+
+
+def run_pipeline(csv_path: str, output_dir: str, settings: PipelineSettings,
+                 control: Optional[JobControl] = None) -> Dict:
+    """
+    Load one chat log, run the selected analyses and write markers and PNGs
+    
+    Args:
+        csv_path: Chat CSV path
+        output_dir: Directory for the exported files (created if missing)
+        settings: Pipeline settings
+        control: Optional job control for progress and cancellation
+        
+    Returns:
+        Summary dictionary (per-analysis results and written files, plus
+        'timings' when timing or memory profiling is enabled)
+    """
+    if settings.record_timings or settings.timing_log or settings.record_memory:
+        timing.enable(settings.timing_log, memory=settings.record_memory)
+    
+    with timing.collect(csv_path) as timings:
+        summary = _run_analyses(csv_path, output_dir, settings, control)
+    if timings is not None:
+        summary['timings'] = timings.to_dict()
+    return summary
+
+
+def _run_analyses(csv_path: str, output_dir: str, settings: PipelineSettings,
+                  control: Optional[JobControl]) -> Dict:
+    os.makedirs(output_dir, exist_ok=True)
+    analyzer = ChatAnalyzer()
+    report_progress(control, 0, "파일 읽는 중")
+    count = analyzer.load(csv_path)
+    
+    summary = {'file': csv_path, 'messages': count, 'analyses': {}, 'outputs': []}
+    tracks = []
+    moments = []
+    interval = settings.interval_minutes
+    clip_options = settings.segment_options(interval)
+    spam_filter = settings.spam_options()
+    
+    if spam_filter is not None:
+        report_progress(control, 5, "도배 찾는 중")
+        summary['analyses']['spam'] = analyzer.get_spam_scan(spam_filter).summary()
+    
+    if 'density' in settings.analyses:
+        report_progress(control, 10, "채팅 밀도 분석 중")
+        result = analyzer.analyze_chat_density(interval, settings.sensitivity, settings.detector,
+                                               settings.detector_params, spam_filter)
+        density_results = result['results']
+        summary['analyses']['density'] = {
+            'peak_time': result['peak_time'], 'spikes': result['spike_count']
+        }
+        moments += significant_moments('density', result, interval * 60)
+        tracks.append(analyzer.density_markers(density_results, clip_options))
+    else:
+        density_results = None
+    
+    if 'keyword' in settings.analyses:
+        for keyword in settings.keywords:
+            report_progress(control, 25, f"키워드 분석 중: {keyword}")
+            result = analyzer.analyze_keyword(keyword, interval, settings.sensitivity,
+                                              settings.detector, settings.detector_params,
+                                              spam_filter)
+            summary['analyses'][f"keyword:{keyword}"] = {
+                'total_count': result['total_count'], 'peak_time': result['peak_time']
+            }
+            moments += significant_moments('keyword', result, interval * 60, keyword)
+            if result['results'] is not None:
+                tracks.append(analyzer.keyword_markers(keyword, result['results'], clip_options))
+    
+    if 'donation' in settings.analyses:
+        report_progress(control, 40, "후원 분석 중")
+        result = analyzer.analyze_donations(interval, settings.sensitivity, settings.detector,
+                                            settings.detector_params)
+        summary['analyses']['donation'] = {
+            'total_count': result['total_count'], 'total_amount': result['total_amount'],
+            'peak_time': result['peak_time']
+        }
+        moments += significant_moments('donation', result, interval * 60)
+        if result['results'] is not None:
+            tracks.append(analyzer.donation_markers(result['results'], clip_options))
+    
+    # Sentiment based analyses share one scoring pass
+    sentiment = SentimentAnalyzer()
+    highlight_options = settings.highlight_options()
+    if ('sentiment' in settings.analyses or 'changepoint' in settings.analyses
+            or ('highlight' in settings.analyses and highlight_options.weights['sentiment'] > 0)):
+        frame = analyzer.get_analysis_frame()
+        report_progress(control, 50, "감정 점수 계산 중")
+        scores = analyzer.get_sentiment_scores()
+    else:
+        scores = None
+    
+    if 'sentiment' in settings.analyses:
+        report_progress(control, 55, "분위기 분석 중")
+        timeline = sentiment.analyze_timeline(frame, settings.sentiment_interval, scores=scores)
+        sentiment.sentiment_results = timeline
+        changes = sentiment.detect_mood_changes(threshold=0.3, min_change=0.2)
+        summary['analyses']['sentiment'] = {
+            'average': float(timeline['sentiment_score'].mean()) if len(timeline) else 0.0,
+            'mood_changes': len(changes)
+        }
+        moments += mood_moments(changes, settings.sentiment_interval * 60)
+        mood_track = sentiment.mood_markers(
+            settings.mood_top_n, settings.segment_options(settings.sentiment_interval)
+        )
+        if mood_track is not None:
+            tracks.append(mood_track)
+    
+    if 'changepoint' in settings.analyses:
+        report_progress(control, 65, "변화점 분석 중")
+        result = analyzer.analyze_change_points(settings.changepoint_method,
+                                                settings.changepoint_penalty,
+                                                settings.changepoint_min_seconds)
+        mood_segments = sentiment.analyze_change_points(frame, scores, settings.changepoint_method,
+                                                        settings.changepoint_penalty,
+                                                        settings.changepoint_min_seconds)
+        summary['analyses']['changepoint'] = {
+            'density_segments': len(result['segments']), 'mood_segments': len(mood_segments)
+        }
+        for track in (analyzer.density_segment_markers(result['segments']),
+                      sentiment.segment_markers(mood_segments)):
+            if track is not None:
+                tracks.append(track)
+    
+    if 'highlight' in settings.analyses:
+        report_progress(control, 70, "하이라이트 점수 계산 중")
+        highlights = find_highlights(analyzer, highlight_options, scores)
+        summary['analyses']['highlight'] = {
+            'count': len(highlights),
+            'best_time': highlights['time_str'].iloc[0] if len(highlights) else None
+        }
+        if len(highlights):
+            tracks.append(highlight_track(highlights))
+    
+    # Markers
+    report_progress(control, 75, "마커 저장 중")
+    if settings.combine_tolerance is not None:
+        tracks = [combine_tracks(tracks, settings.combine_tolerance)]
+    if tracks and settings.formats:
+        with timing.span('export'):
+            summary['outputs'] += export_all(tracks, settings.formats, output_dir,
+                                             ExportOptions(fps=settings.fps))
+    
+    if 'wordcloud' in settings.analyses:
+        report_progress(control, 85, "워드클라우드 생성 중")
+        summary['outputs'] += _write_wordclouds(analyzer, density_results, output_dir, settings)
+    
+    if settings.result_db:
+        report_progress(control, 95, "결과 DB에 기록 중")
+        with timing.span('store'):
+            summary['vod_id'] = _record_results(analyzer, csv_path, moments, settings)
+    
+    report_progress(control, 100, "완료")
+    return summary
+
+
+def _record_results(analyzer: ChatAnalyzer, csv_path: str, moments: List,
+                    settings: PipelineSettings) -> int:
+    """Add the loaded log and its moments to the result store"""
+    keywords = settings.keywords if 'keyword' in settings.analyses else ()
+    aggregates = analyzer.bin_aggregates(DEFAULT_BIN_SECONDS, keywords)
+    with ResultStore(settings.result_db) as store:
+        return store.add_vod(csv_path, aggregates, DEFAULT_BIN_SECONDS, moments, keywords,
+                             chatters=analyzer.chatter_count(),
+                             duration=analyzer.get_duration() or 0.0)
+
+
+def _write_wordclouds(analyzer: ChatAnalyzer, density_results, output_dir: str,
+                      settings: PipelineSettings) -> List[str]:
+    """Whole-stream wordcloud plus one per top density spike"""
+    generator = WordCloudGenerator(use_worker_process=False)
+    width, height = settings.wordcloud_size
+    options = {'width': width, 'height': height, 'max_words': settings.max_words}
+    paths = []
+    
+    if generator.generate_from_frequencies(analyzer.get_word_frequencies(), **options):
+        path = os.path.join(output_dir, "wordcloud.png")
+        generator.save(path)
+        paths.append(path)
+    
+    if settings.spike_wordclouds > 0 and density_results is not None and len(density_results):
+        token_index = analyzer.get_token_index()
+        bin_seconds = settings.interval_minutes * 60
+        top = density_results.nlargest(settings.spike_wordclouds, 'count')
+        for start, time_str in zip(top['time_seconds'], top['time_str']):
+            if generator.generate_for_range(token_index, start, start + bin_seconds, **options):
+                path = os.path.join(output_dir, f"wordcloud_{safe_filename(time_str)}.png")
+                generator.save(path)
+                paths.append(path)
+    return paths
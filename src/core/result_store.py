@@ -0,0 +1,361 @@
+"""
+Result Store - Analysis results of many VODs kept in one SQLite file
+
+Every analyzed log becomes one row in vods, its per-bin totals go into bins
+(and keyword_bins for each analyzed keyword), and its significant bins and
+mood changes go into moments. Queries across hundreds of streams then run
+on indexed tables instead of reloading any CSV.
+"""
+import os
+import sqlite3
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+
+SCHEMA_VERSION = 1
+
+# Bin size of the stored per-bin totals; fine enough to re-bin to any whole
+# number of these when comparing streams
+DEFAULT_BIN_SECONDS = 10
+
+MOMENT_KINDS = ('density', 'keyword', 'donation', 'mood')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vods (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    streamed_at TEXT NOT NULL,
+    analyzed_at TEXT NOT NULL,
+    messages INTEGER NOT NULL,
+    chatters INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    bin_seconds INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS vods_streamed_at ON vods (streamed_at);
+
+CREATE TABLE IF NOT EXISTS bins (
+    vod_id INTEGER NOT NULL REFERENCES vods (id) ON DELETE CASCADE,
+    time_seconds INTEGER NOT NULL,
+    messages INTEGER NOT NULL,
+    chatters INTEGER NOT NULL,
+    donations INTEGER NOT NULL,
+    donation_amount REAL NOT NULL,
+    PRIMARY KEY (vod_id, time_seconds)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS keyword_bins (
+    keyword TEXT NOT NULL,
+    vod_id INTEGER NOT NULL REFERENCES vods (id) ON DELETE CASCADE,
+    time_seconds INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (keyword, vod_id, time_seconds)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS keyword_bins_vod ON keyword_bins (vod_id);
+
+-- Keywords analyzed per VOD, so a VOD without any mention still counts
+CREATE TABLE IF NOT EXISTS vod_keywords (
+    keyword TEXT NOT NULL,
+    vod_id INTEGER NOT NULL REFERENCES vods (id) ON DELETE CASCADE,
+    total INTEGER NOT NULL,
+    PRIMARY KEY (keyword, vod_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS moments (
+    id INTEGER PRIMARY KEY,
+    vod_id INTEGER NOT NULL REFERENCES vods (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    keyword TEXT NOT NULL DEFAULT '',
+    start_seconds REAL NOT NULL,
+    end_seconds REAL NOT NULL,
+    value REAL NOT NULL,
+    score REAL,
+    label TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS moments_keyword ON moments (keyword, kind, start_seconds);
+CREATE INDEX IF NOT EXISTS moments_kind ON moments (kind, score);
+CREATE INDEX IF NOT EXISTS moments_vod ON moments (vod_id, start_seconds);
+"""
+
+# (kind, keyword, start_seconds, end_seconds, value, score, label)
+Moment = Tuple[str, str, float, float, float, Optional[float], str]
+
+
+def significant_moments(kind: str, result: Dict, bin_seconds: float,
+                        keyword: str = '') -> List[Moment]:
+    """
+    Moments from the significant bins of an analysis
+    
+    Args:
+        kind: 'density', 'keyword' or 'donation'
+        result: Dictionary returned by the matching ChatAnalyzer.analyze_* call
+        bin_seconds: Bin size the analysis used
+        keyword: Keyword of a keyword analysis
+        
+    Returns:
+        One moment per bin, scored by the analysis' detector (the Z-Score
+        within the stream by default)
+    """
+    results = result.get('results')
+    if results is None or len(results) == 0:
+        return []
+    moments = []
+    for start, value, score in zip(results['time_seconds'].tolist(), results['count'].tolist(),
+                                   results['score'].tolist()):
+        moments.append((kind, keyword, float(start), float(start + bin_seconds),
+                        float(value), float(score), ''))
+    return moments
+
+
+def mood_moments(changes: Sequence[Dict], bin_seconds: float) -> List[Moment]:
+    """Moments from SentimentAnalyzer.detect_mood_changes (value is the change)"""
+    return [('mood', '', float(change['time_seconds']),
+             float(change['time_seconds'] + bin_seconds), float(change['change']), None,
+             change['description'])
+            for change in changes]
+
+
+def _file_time(path: str) -> str:
+    """Modification time of a log, the best guess at when it was streamed"""
+    try:
+        stamp = os.path.getmtime(path)
+    except OSError:
+        return datetime.now().isoformat(timespec='seconds')
+    return datetime.fromtimestamp(stamp).isoformat(timespec='seconds')
+
+
+def _upper_bound(until: str) -> str:
+    """Exclusive upper bound; a bare date includes that whole day"""
+    try:
+        return (date.fromisoformat(until) + timedelta(days=1)).isoformat()
+    except ValueError:
+        return until
+
+
+class ResultStore:
+    """
+    SQLite file holding the results of many analyzed VODs
+    
+    Safe to open from several processes at once (batch workers each add
+    their own VOD); writes wait for each other instead of failing.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Open (or create) a result store
+        
+        Args:
+            path: SQLite file path
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=60)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            self._conn.close()
+            raise ValueError(f"지원하지 않는 결과 DB 버전입니다: {version} ({path})")
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
+    def close(self):
+        self._conn.close()
+    
+    def __enter__(self) -> "ResultStore":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+    
+    def add_vod(self, path: str, aggregates: pd.DataFrame, bin_seconds: int,
+                moments: Iterable[Moment] = (), keywords: Sequence[str] = (),
+                chatters: int = 0, duration: float = 0.0,
+                streamed_at: Optional[str] = None) -> int:
+        """
+        Record one analyzed VOD, replacing an earlier record of the same file
+        
+        Args:
+            path: Chat log path (stored absolute; identifies the VOD)
+            aggregates: ChatAnalyzer.bin_aggregates frame
+            bin_seconds: Bin size of aggregates
+            moments: Detected moments (see significant_moments / mood_moments)
+            keywords: Keyword columns of aggregates to store in keyword_bins
+            chatters: Distinct chatters over the whole stream
+            duration: Stream length in seconds
+            streamed_at: ISO date/time of the stream (defaults to the file's
+                modification time)
+                
+        Returns:
+            Id of the VOD row
+        """
+        path = os.path.abspath(path)
+        name = os.path.splitext(os.path.basename(path))[0]
+        streamed_at = streamed_at or _file_time(path)
+        analyzed_at = datetime.now().isoformat(timespec='seconds')
+        
+        with self._conn:
+            self._conn.execute("DELETE FROM vods WHERE path = ?", (path,))
+            vod_id = self._conn.execute(
+                "INSERT INTO vods (path, name, streamed_at, analyzed_at, messages, chatters,"
+                " duration, bin_seconds) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, name, streamed_at, analyzed_at, int(aggregates['messages'].sum()),
+                 int(chatters), float(duration), int(bin_seconds))
+            ).lastrowid
+            
+            columns = ['time_seconds', 'messages', 'chatters', 'donations', 'donation_amount']
+            rows = aggregates[columns].itertuples(index=False, name=None)
+            self._conn.executemany(
+                "INSERT INTO bins VALUES (?, ?, ?, ?, ?, ?)",
+                ((vod_id, int(t), int(m), int(c), int(d), float(a)) for t, m, c, d, a in rows)
+            )
+            
+            # A keyword given twice is still one keyword of the VOD
+            for keyword in dict.fromkeys(keywords):
+                self._conn.execute("INSERT INTO vod_keywords VALUES (?, ?, ?)",
+                                   (keyword, vod_id, int(aggregates[keyword].sum())))
+                hits = aggregates[aggregates[keyword] > 0]
+                self._conn.executemany(
+                    "INSERT INTO keyword_bins VALUES (?, ?, ?, ?)",
+                    ((keyword, vod_id, int(t), int(c))
+                     for t, c in zip(hits['time_seconds'].tolist(), hits[keyword].tolist()))
+                )
+            
+            self._conn.executemany(
+                "INSERT INTO moments (vod_id, kind, keyword, start_seconds, end_seconds, value,"
+                " score, label) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((vod_id,) + tuple(moment) for moment in moments)
+            )
+        return vod_id
+    
+    def remove_vod(self, path: str) -> bool:
+        """Forget a VOD and everything recorded for it"""
+        with self._conn:
+            cursor = self._conn.execute("DELETE FROM vods WHERE path = ?", (os.path.abspath(path),))
+        return cursor.rowcount > 0
+    
+    def _vod_filter(self, since: Optional[str], until: Optional[str],
+                    vod_ids: Optional[Sequence[int]]) -> Tuple[List[str], List]:
+        """WHERE clauses (on alias v) selecting VODs by stream date or id"""
+        clauses, params = [], []
+        if since:
+            clauses.append("v.streamed_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("v.streamed_at < ?")
+            params.append(_upper_bound(until))
+        if vod_ids is not None:
+            clauses.append(f"v.id IN ({','.join('?' * len(vod_ids))})")
+            params += [int(vod_id) for vod_id in vod_ids]
+        return clauses, params
+    
+    def vods(self, since: Optional[str] = None, until: Optional[str] = None) -> pd.DataFrame:
+        """
+        Recorded VODs, oldest stream first
+        
+        Args:
+            since: Earliest stream date (ISO, inclusive)
+            until: Latest stream date (ISO, inclusive)
+        """
+        clauses, params = self._vod_filter(since, until, None)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return pd.read_sql_query(
+            f"SELECT v.* FROM vods v {where} ORDER BY v.streamed_at, v.id",
+            self._conn, params=params
+        )
+    
+    def find_moments(self, keyword: Union[str, Sequence[str], None] = None,
+                     kind: Optional[str] = None,
+                     since: Optional[str] = None, until: Optional[str] = None,
+                     min_score: Optional[float] = None, min_value: Optional[float] = None,
+                     limit: Optional[int] = 100) -> pd.DataFrame:
+        """
+        Search detected moments across every recorded VOD
+        
+        Args:
+            keyword: Only moments of this keyword analysis (or, given several
+                keywords, of any of them, ranked and limited together)
+            kind: Only this kind of moment (see MOMENT_KINDS)
+            since: Earliest stream date (ISO, inclusive)
+            until: Latest stream date (ISO, inclusive)
+            min_score: Smallest Z-Score
+            min_value: Smallest bin value (messages, mentions, cheese, mood change)
+            limit: Most moments returned (None for all)
+            
+        Returns:
+            DataFrame of moments with their VOD's path, name and stream date,
+            strongest first
+        """
+        clauses, params = self._vod_filter(since, until, None)
+        if keyword is not None:
+            keywords = [keyword] if isinstance(keyword, str) else list(keyword)
+            clauses.append(f"m.keyword IN ({','.join('?' * len(keywords))})")
+            params += keywords
+        if kind is not None:
+            clauses.append("m.kind = ?")
+            params.append(kind)
+        if min_score is not None:
+            clauses.append("m.score >= ?")
+            params.append(min_score)
+        if min_value is not None:
+            clauses.append("m.value >= ?")
+            params.append(min_value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        tail = ""
+        if limit is not None:
+            tail = "LIMIT ?"
+            params.append(int(limit))
+        
+        return pd.read_sql_query(
+            "SELECT v.name, v.path, v.streamed_at, m.kind, m.keyword, m.start_seconds,"
+            " m.end_seconds, m.value, m.score, m.label, m.vod_id"
+            f" FROM moments m JOIN vods v ON v.id = m.vod_id {where}"
+            f" ORDER BY m.score IS NULL, m.score DESC, ABS(m.value) DESC {tail}",
+            self._conn, params=params
+        )
+    
+    def bins(self, vod_ids: Optional[Sequence[int]] = None, since: Optional[str] = None,
+             until: Optional[str] = None, keyword: Optional[str] = None) -> pd.DataFrame:
+        """
+        Stored per-bin totals of many VODs in one frame
+        
+        Args:
+            vod_ids: Only these VODs
+            since: Earliest stream date (ISO, inclusive)
+            until: Latest stream date (ISO, inclusive)
+            keyword: Add this keyword's mention count per bin as 'keyword_count'
+                (only VODs analyzed with that keyword are returned)
+                
+        Returns:
+            DataFrame with 'vod_id', 'time_seconds', 'messages', 'chatters',
+            'donations', 'donation_amount' (and 'keyword_count'), ordered by
+            VOD and time
+        """
+        clauses, params = self._vod_filter(since, until, vod_ids)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        if keyword is None:
+            return pd.read_sql_query(
+                f"SELECT b.* FROM bins b JOIN vods v ON v.id = b.vod_id {where}"
+                " ORDER BY b.vod_id, b.time_seconds",
+                self._conn, params=params
+            )
+        return pd.read_sql_query(
+            "SELECT b.*, COALESCE(k.count, 0) AS keyword_count"
+            " FROM bins b JOIN vods v ON v.id = b.vod_id"
+            " JOIN vod_keywords vk ON vk.keyword = ? AND vk.vod_id = b.vod_id"
+            " LEFT JOIN keyword_bins k ON k.keyword = ? AND k.vod_id = b.vod_id"
+            f" AND k.time_seconds = b.time_seconds {where}"
+            " ORDER BY b.vod_id, b.time_seconds",
+            self._conn, params=[keyword, keyword] + params
+        )
+    
+    def keywords(self) -> List[str]:
+        """Keywords with stored per-bin counts"""
+        return [row[0] for row in
+                self._conn.execute("SELECT DISTINCT keyword FROM vod_keywords ORDER BY keyword")]
@@ -0,0 +1,121 @@
+"""
+Highlight Segments - Merge significant bins into In/Out ranges
+"""
+import numpy as np
+import pandas as pd
+from typing import Optional, Sequence, Tuple
+
+
+SEGMENT_COLUMNS = ['start_seconds', 'end_seconds', 'bins', 'total', 'peak', 'peak_seconds',
+                   'peak_index']
+
+
+class SegmentOptions:
+    """How significant bins are grouped into clips"""
+    
+    def __init__(self, bin_seconds: float, max_gap: float = 0.0,
+                 pre_roll: float = 10.0, post_roll: float = 10.0):
+        """
+        Args:
+            bin_seconds: Length of one analysis bin
+            max_gap: Bins separated by at most this many seconds are merged
+            pre_roll: Seconds added before each clip
+            post_roll: Seconds added after each clip
+        """
+        self.bin_seconds = bin_seconds
+        self.max_gap = max_gap
+        self.pre_roll = pre_roll
+        self.post_roll = post_roll
+
+
+def merge_ranges(starts: Sequence[float], ends: Sequence[float],
+                 max_gap: float = 0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Merge overlapping or nearby ranges in one sorted sweep
+    
+    A range joins the current group when it starts no later than max_gap after
+    the furthest end seen so far in that group.
+    
+    Args:
+        starts: Range start times
+        ends: Range end times
+        max_gap: Largest gap that is still merged
+        
+    Returns:
+        (merged starts, merged ends, group id of every input range)
+    """
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.float64)
+    if len(starts) == 0:
+        empty = np.empty(0, dtype=np.float64)
+        return empty, empty, np.empty(0, dtype=np.int64)
+    
+    order = np.argsort(starts, kind='stable')
+    sorted_starts = starts[order]
+    sorted_ends = ends[order]
+    
+    # Furthest end among all earlier ranges; a new group starts past it + gap
+    reach = np.maximum.accumulate(sorted_ends)
+    breaks = np.empty(len(order), dtype=bool)
+    breaks[0] = True
+    breaks[1:] = sorted_starts[1:] > reach[:-1] + max_gap
+    sorted_groups = np.cumsum(breaks) - 1
+    
+    heads = np.flatnonzero(breaks)
+    merged_starts = sorted_starts[heads]
+    merged_ends = np.maximum.reduceat(sorted_ends, heads)
+    
+    groups = np.empty(len(order), dtype=np.int64)
+    groups[order] = sorted_groups
+    return merged_starts, merged_ends, groups
+
+
+def build_segments(times: Sequence[float], values: Sequence[float], options: SegmentOptions,
+                   duration: Optional[float] = None) -> pd.DataFrame:
+    """
+    Turn significant bins into padded highlight clips
+    
+    Args:
+        times: Start time of each significant bin (seconds)
+        values: Count (or score) of each bin
+        options: Grouping and padding settings
+        duration: Stream length; clips are clipped to [0, duration]
+        
+    Returns:
+        DataFrame with start_seconds, end_seconds, bins, total, peak,
+        peak_seconds and peak_index (position in the inputs) per clip,
+        sorted by start
+    """
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    
+    # Padding first means a shared pre/post-roll also merges the clips
+    starts = times - options.pre_roll
+    ends = times + options.bin_seconds + options.post_roll
+    seg_starts, seg_ends, groups = merge_ranges(starts, ends, options.max_gap)
+    
+    n_segments = len(seg_starts)
+    if n_segments == 0:
+        return pd.DataFrame(columns=SEGMENT_COLUMNS)
+    
+    totals = np.bincount(groups, weights=values, minlength=n_segments)
+    bins = np.bincount(groups, minlength=n_segments)
+    
+    # Peak bin per clip: sort by (group, value) and take the last of each group
+    order = np.lexsort((values, groups))
+    last = np.flatnonzero(np.r_[groups[order][1:] != groups[order][:-1], True])
+    peak_index = order[last]
+    
+    seg_starts = np.maximum(seg_starts, 0.0)
+    if duration is not None:
+        seg_ends = np.minimum(seg_ends, max(duration, 0.0))
+    
+    return pd.DataFrame({
+        'start_seconds': seg_starts,
+        'end_seconds': seg_ends,
+        'bins': bins,
+        'total': totals,
+        'peak': values[peak_index],
+        'peak_seconds': times[peak_index],
+        'peak_index': peak_index,
+    })
@@ -7,12 +7,21 @@ from typing import Dict, List, Optional, Tuple
 import re
 
 from core.sentiment_lexicon import SENTIMENT_LEXICON, EMOTICON_SENTIMENT, get_all_keywords
+from core import timing
+from core.jobs import JobControl, apply_chunked, report_progress
+from core.binning import BinEngine
+from core.detectors import detect
+from core.changepoints import DEFAULT_PENALTY, find_segments, segment_track
+from core.markers import MarkerTrack
+from core.segments import SegmentOptions, build_segments
+from core.exporters import ExportOptions, export_track
 
 
 class SentimentAnalyzer:
     """Analyzes sentiment and detects mood changes in chat data"""
     
     def __init__(self):
+        # Timeline currently shown in the UI (default for detect_mood_changes)
         self.sentiment_results: Optional[pd.DataFrame] = None
         self.mood_changes: List[Dict] = []
         
@@ -60,23 +69,45 @@ class SentimentAnalyzer:
         Returns:
             DataFrame with time bins and message counts
         """
-        max_seconds = df['seconds'].max()
-        time_bins = list(range(0, max_seconds + interval_seconds, interval_seconds))
-        
-        df['time_bin'] = pd.cut(df['seconds'], bins=time_bins, labels=time_bins[:-1])
-        frequency = df.groupby('time_bin').size().reset_index(name='frequency')
+        engine = BinEngine.from_seconds(df['seconds'].to_numpy(), interval_seconds, 'right')
+        frequency = pd.DataFrame({
+            'time_bin': engine.starts,
+            'frequency': engine.count(),
+        })
         frequency['time_seconds'] = frequency['time_bin'].astype(int)
         
         return frequency
     
+    def score_messages(self, messages: pd.Series,
+                       control: Optional[JobControl] = None) -> pd.Series:
+        """
+        Sentiment score of every message
+        
+        Args:
+            messages: Cleaned chat messages
+            control: Optional job control for progress and cancellation
+            
+        Returns:
+            Series of scores (-1.0 to 1.0) aligned with messages
+        """
+        with timing.span('sentiment.score'):
+            return apply_chunked(
+                messages, self.analyze_message, control, 0, 90, "감정 점수 계산 중"
+            )
+    
     def analyze_timeline(self, df: pd.DataFrame, 
-                        interval_minutes: float = 1.0) -> pd.DataFrame:
+                        interval_minutes: float = 1.0,
+                        control: Optional[JobControl] = None,
+                        scores: Optional[pd.Series] = None) -> pd.DataFrame:
         """
         Analyze sentiment over time
         
         Args:
-            df: DataFrame with chat messages (must have 'seconds' and 'clean_message' columns)
+            df: DataFrame with chat messages (must have 'seconds' and 'clean_message' columns;
+                it is not modified)
             interval_minutes: Time interval in minutes
+            control: Optional job control for progress and cancellation
+            scores: score_messages result for df, to reuse instead of scoring again
             
         Returns:
             DataFrame with time, sentiment score, and message frequency
@@ -86,68 +117,85 @@ class SentimentAnalyzer:
         
         interval_seconds = int(interval_minutes * 60)
         
-        # Calculate sentiment for each message
-        df['sentiment'] = df['clean_message'].apply(self.analyze_message)
+        # Calculate sentiment for each message (kept local, not written into df)
+        if scores is None:
+            scores = self.score_messages(df['clean_message'], control)
         
         # Group by time intervals
-        max_seconds = df['seconds'].max()
-        time_bins = list(range(0, max_seconds + interval_seconds, interval_seconds))
-        
-        df['time_bin'] = pd.cut(df['seconds'], bins=time_bins, labels=time_bins[:-1])
+        report_progress(control, 95, "구간 집계 중")
+        with timing.span('sentiment.bin'):
+            return self._bin_timeline(df, scores, interval_seconds)
+    
+    def _bin_timeline(self, df: pd.DataFrame, sentiment: pd.Series,
+                      interval_seconds: int) -> pd.DataFrame:
+        """Average sentiment and message count per interval"""
+        engine = BinEngine.from_seconds(df['seconds'].to_numpy(), interval_seconds, 'right')
         
-        # Calculate average sentiment and message count per interval
-        grouped = df.groupby('time_bin').agg({
-            'sentiment': 'mean',
-            'clean_message': 'count'
-        }).reset_index()
+        # Sentiment sum and count of scored / non-empty messages in one pass
+        scores = sentiment.to_numpy(dtype=np.float64)
+        sums = engine.sums({
+            'sentiment_sum': scores,
+            'sentiment_count': ~np.isnan(scores),
+            'message_count': df['clean_message'].notna().to_numpy(),
+        })
+        counts = sums['sentiment_count']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            average = sums['sentiment_sum'] / counts
         
-        grouped.columns = ['time_bin', 'sentiment_score', 'message_count']
+        # Every interval of the stream; ones without a scored message count as neutral
+        grouped = pd.DataFrame({
+            'time_bin': engine.starts,
+            'sentiment_score': np.where(counts > 0, average, 0.0),
+            'message_count': sums['message_count'].astype(np.int64),
+        })
         grouped['time_seconds'] = grouped['time_bin'].astype(int)
         
         # Convert seconds to HH:MM:SS
         grouped['time_str'] = grouped['time_seconds'].apply(self._seconds_to_time)
         
-        # Fill NaN with 0
-        grouped['sentiment_score'] = grouped['sentiment_score'].fillna(0)
-        
-        self.sentiment_results = grouped
         return grouped
     
+    @timing.timed('mood.detect')
     def detect_mood_changes(self, threshold: float = 0.3, 
-                           min_change: float = 0.2) -> List[Dict]:
+                           min_change: float = 0.2,
+                           timeline: Optional[pd.DataFrame] = None) -> List[Dict]:
         """
         Detect significant mood changes
         
         Args:
             threshold: Minimum absolute sentiment score to consider
             min_change: Minimum change in sentiment to detect
+            timeline: Sentiment timeline (defaults to the last analyzed one)
             
         Returns:
             List of mood change events with time, change amount, and type
         """
-        if self.sentiment_results is None or len(self.sentiment_results) < 2:
+        df = self.sentiment_results if timeline is None else timeline
+        if df is None or len(df) < 2:
             return []
         
-        changes = []
-        df = self.sentiment_results
+        # Bins whose score moved at least min_change from the previous bin
+        # (indexed by row position so the picks point back into the timeline)
+        scores = df['sentiment_score'].to_numpy()
+        detection = detect('threshold', pd.Series(scores, index=pd.RangeIndex(len(scores))),
+                           {'threshold': min_change, 'difference': True})
+        time_strs = df['time_str'].to_numpy()
+        time_seconds = df['time_seconds'].to_numpy()
         
-        for i in range(1, len(df)):
-            prev_score = df.iloc[i-1]['sentiment_score']
-            curr_score = df.iloc[i]['sentiment_score']
-            change = curr_score - prev_score
+        changes = []
+        for i in detection.moments['time_seconds'].tolist():
+            curr_score = scores[i]
+            change = curr_score - scores[i - 1]
+            change_type = self._classify_mood_change(curr_score, change)
             
-            # Detect significant changes
-            if abs(change) >= min_change:
-                change_type = self._classify_mood_change(curr_score, change)
-                
-                changes.append({
-                    'time': df.iloc[i]['time_str'],
-                    'time_seconds': df.iloc[i]['time_seconds'],
-                    'sentiment_score': curr_score,
-                    'change': change,
-                    'type': change_type,
-                    'description': self._get_change_description(change_type, change)
-                })
+            changes.append({
+                'time': time_strs[i],
+                'time_seconds': time_seconds[i],
+                'sentiment_score': curr_score,
+                'change': change,
+                'type': change_type,
+                'description': self._get_change_description(change_type, change)
+            })
         
         # Sort by absolute change (largest first)
         changes.sort(key=lambda x: abs(x['change']), reverse=True)
@@ -155,6 +203,69 @@ class SentimentAnalyzer:
         self.mood_changes = changes
         return changes
     
+    def analyze_change_points(self, df: pd.DataFrame, scores: Optional[pd.Series] = None,
+                              method: str = 'pelt', penalty: float = DEFAULT_PENALTY,
+                              min_seconds: int = 60,
+                              control: Optional[JobControl] = None) -> pd.DataFrame:
+        """
+        Split the stream into stretches of steady mood
+        
+        The per-second sentiment is the mean score of that second's messages,
+        weighted by their number, so quiet seconds barely move a segment.
+        
+        Args:
+            df: DataFrame with 'seconds' and 'clean_message' columns
+            scores: score_messages result for df (computed when None)
+            method: 'pelt' or 'binseg' (core.changepoints)
+            penalty: Penalty per change; higher keeps only bigger shifts
+            min_seconds: Shortest segment
+            control: Optional job control for progress and cancellation
+            
+        Returns:
+            core.changepoints.find_segments frame plus 'time_str', 'type' and
+            'description' of every segment
+        """
+        if df is None or len(df) == 0:
+            return pd.DataFrame(columns=['start_seconds', 'end_seconds', 'mean', 'change', 'score',
+                                         'time_str', 'type', 'description'])
+        if scores is None:
+            scores = self.score_messages(df['clean_message'], control)
+        
+        report_progress(control, 95, "변화점 찾는 중")
+        with timing.span('sentiment.changepoint'):
+            engine = BinEngine.from_seconds(df['seconds'].to_numpy(), 1)
+            values = scores.to_numpy(dtype=np.float64)
+            sums = engine.sums({'sum': values, 'count': ~np.isnan(values)})
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means = sums['sum'] / sums['count']
+            segments = find_segments(means, sums['count'], method, penalty, min_seconds)
+        
+        segments['time_str'] = segments['start_seconds'].astype(int).apply(self._seconds_to_time)
+        segments['type'] = [self._classify_mood_change(mean, change) for mean, change
+                            in zip(segments['mean'].tolist(), segments['change'].tolist())]
+        segments['description'] = [self._get_change_description(kind, change) for kind, change
+                                   in zip(segments['type'].tolist(), segments['change'].tolist())]
+        return segments
+    
+    def segment_markers(self, segments: pd.DataFrame) -> Optional[MarkerTrack]:
+        """
+        Ranged markers (or chapters) for analyze_change_points segments
+        
+        Returns:
+            MarkerTrack, or None if there are no segments
+        """
+        if segments is None or len(segments) == 0:
+            return None
+        
+        def describe(frame):
+            labels = [f"분위기 구간 - {kind}" for kind in frame['type']]
+            descriptions = [f"평균 {mean:+.2f}" if i == 0 else f"{description} (평균 {mean:+.2f}, {change:+.2f})"
+                            for i, (description, mean, change)
+                            in enumerate(zip(frame['description'], frame['mean'], frame['change']))]
+            return labels, descriptions
+        
+        return segment_track("mood_segments", segments, describe)
+    
     def _classify_mood_change(self, score: float, change: float) -> str:
         """Classify type of mood change"""
         if change > 0:
@@ -193,36 +304,60 @@ class SentimentAnalyzer:
         secs = seconds % 60
         return f"{hours:02d}:{minutes:02d}:{secs:02d}"
     
-    def export_mood_markers(self, output_path: str, top_n: int = 10) -> bool:
+    def mood_markers(self, top_n: int = 10,
+                     segments: Optional[SegmentOptions] = None) -> Optional[MarkerTrack]:
         """
-        Export top mood changes as Premiere Pro markers
+        Build markers for the largest mood changes
         
         Args:
-            output_path: Output CSV file path
-            top_n: Number of top changes to export
+            top_n: Number of top changes to include
+            segments: Pad changes into ranged clips (point markers when None)
             
         Returns:
-            True if successful
+            MarkerTrack, or None if no mood changes were detected
         """
         if not self.mood_changes:
-            return False
+            return None
         
-        # Get top N changes
+        # Changes are sorted by magnitude; the track re-sorts them by time
         top_changes = self.mood_changes[:top_n]
+        times = np.array([change['time_seconds'] for change in top_changes], dtype=np.float64)
+        labels = np.array([f"분위기 변화 - {change['type']}" for change in top_changes], dtype=object)
+        descriptions = np.array(
+            [f"{change['description']} ({change['change']:+.2f})" for change in top_changes],
+            dtype=object
+        )
+        strengths = np.array([abs(change['change']) for change in top_changes])
+        if segments is None:
+            return MarkerTrack("mood", times, labels, descriptions, scores=strengths)
         
-        markers = []
-        for change in top_changes:
-            markers.append({
-                'Marker Name': f"분위기 변화 - {change['type']}",
-                'Description': f"{change['description']} ({change['change']:+.2f})",
-                'In': change['time'],
-                'Out': '',
-                'Duration': '',
-                'Marker Type': 'Comment'
-            })
+        # Overlapping clips keep the label of their largest change
+        clips = build_segments(times, strengths, segments)
+        peak = clips['peak_index'].to_numpy(dtype=np.int64)
+        return MarkerTrack("mood", clips['start_seconds'].to_numpy(), labels[peak],
+                           descriptions[peak], ends=clips['end_seconds'].to_numpy(),
+                           scores=clips['peak'].to_numpy())
+    
+    def export_mood_markers(self, output_path: str, top_n: int = 10,
+                            format_name: str = 'premiere_csv',
+                            options: Optional[ExportOptions] = None) -> bool:
+        """
+        Export top mood changes as editor markers
+        
+        Args:
+            output_path: Output file path
+            top_n: Number of top changes to export
+            format_name: Format key from core.exporters.EXPORTERS
+            options: Export options (frame rate, title, ...)
+            
+        Returns:
+            True if successful
+        """
+        track = self.mood_markers(top_n)
+        if track is None:
+            return False
         
-        markers_df = pd.DataFrame(markers)
-        markers_df.to_csv(output_path, index=False, encoding='utf-8-sig')
+        export_track(track, output_path, format_name, options)
         return True
     
     def get_sentiment_timeline(self) -> Optional[pd.DataFrame]:
@@ -0,0 +1,408 @@
+"""
+Spam Filter - Find repeat floods and copy-paste waves by message hashing
+
+One viewer (or bot) sending the same line thirty times, or a copypasta
+pasted by half the chat, makes a chat spike without anything happening on
+stream. Every distinct message is normalized (case, spacing, punctuation
+and stretched characters like ㅋㅋㅋㅋㅋ are ignored) and hashed; long
+messages are also grouped with their near-duplicates ("오늘 방송 레전드"
+/ "오늘방송 레전드!!1") by MinHash over character shingles, banded so only
+messages sharing a band are compared. Within each time window:
+
+- repeats: copies of one group by the same user beyond max_repeats
+- copy-paste: one group of long messages posted by min_copies or more users
+
+Both are down-weighted so a flood counts about like one message. Hashing
+runs once per distinct text and counting on integer keys, so millions of
+messages take one factorize, one hashing pass and a few sorts.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.jobs import JobControl, report_progress
+
+
+# Flags of a message (bit mask)
+REPEAT = 1
+COPY_PASTE = 2
+
+# Characters per shingle for near-duplicate hashing
+SHINGLE_SIZE = 3
+
+# MinHash bands and rows per band: texts sharing all rows of any band are
+# candidates (10 x 3 finds most pairs above a shingle Jaccard similarity
+# of 0.5; one typo in a 20 character message leaves about 0.7)
+MINHASH_BANDS = 10
+MINHASH_ROWS = 3
+
+# Share of equal MinHash values a candidate needs to be a near-duplicate,
+# which keeps chains of loosely similar texts from merging into one group
+DEFAULT_SIMILARITY = 0.6
+
+# Multiplier of the polynomial shingle hash
+_PRIME = np.uint64(0x100000001B3)
+
+
+class SpamOptions:
+    """What counts as a flood"""
+    
+    def __init__(self, window_seconds: int = 30, max_repeats: int = 1, min_copies: int = 5,
+                 min_chars: int = 8, near_duplicates: bool = True):
+        """
+        Args:
+            window_seconds: Repeats are counted within windows of this size
+            max_repeats: Copies of one message a user may send per window
+                before they are down-weighted
+            min_copies: Users posting one message in a window that make it
+                a copy-paste wave
+            min_chars: Shortest normalized message that can be copy-paste
+                (shorter ones, like ㅋㅋ or 와, are how a whole chat reacts)
+            near_duplicates: Also group messages that differ by a few
+                characters (exact normalized copies only when False)
+        """
+        if window_seconds < 1 or max_repeats < 1 or min_copies < 2:
+            raise ValueError("도배 기준이 올바르지 않습니다 (구간 1초 이상, 반복 1회 이상, 복사 2명 이상)")
+        self.window_seconds = int(window_seconds)
+        self.max_repeats = int(max_repeats)
+        self.min_copies = int(min_copies)
+        self.min_chars = int(min_chars)
+        self.near_duplicates = bool(near_duplicates)
+    
+    def key(self) -> str:
+        """Cache key of these options"""
+        return (f"{self.window_seconds}:{self.max_repeats}:{self.min_copies}:"
+                f"{self.min_chars}:{int(self.near_duplicates)}")
+
+
+class SpamScan:
+    """Per-message result of scan_messages"""
+    
+    def __init__(self, groups: np.ndarray, repeats: np.ndarray, copies: np.ndarray,
+                 flags: np.ndarray, weights: np.ndarray):
+        """
+        Args:
+            groups: Duplicate group of every message (-1 for exempt messages)
+            repeats: Copies of the group the same user sent in the window
+            copies: Distinct users who sent the group in the window
+            flags: REPEAT / COPY_PASTE bits
+            weights: How much every message counts (1 for normal messages)
+        """
+        self.groups = groups
+        self.repeats = repeats
+        self.copies = copies
+        self.flags = flags
+        self.weights = weights
+    
+    def __len__(self) -> int:
+        return len(self.weights)
+    
+    def summary(self) -> Dict:
+        """Flagged message counts and the messages the weights take away"""
+        return {
+            'repeats': int(np.count_nonzero(self.flags & REPEAT)),
+            'copy_paste': int(np.count_nonzero(self.flags & COPY_PASTE)),
+            'removed': int(round(len(self.weights) - float(self.weights.sum())))
+        }
+
+
+def normalize_points(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Texts reduced to what makes two messages the same, as code points
+    
+    Lowercase, only letters and digits (no spacing, punctuation or emoticon
+    braces), and runs of one character cut to two (ㅋㅋㅋㅋㅋ and ㅋㅋㅋ both
+    become ㅋㅋ). Works on one UTF-32 array of all texts instead of a regex
+    per text.
+    
+    Args:
+        texts: Texts to normalize
+        
+    Returns:
+        (uint32 code points of all normalized texts back to back, int64
+        normalized length of every text)
+    """
+    if len(texts) == 0:
+        return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.int64)
+    # NUL separates the texts (the store never holds NUL)
+    points = np.frombuffer('\x00'.join(texts).lower().encode('utf-32-le'), dtype=np.uint32)
+    
+    # Letters and digits, looked up once per distinct character
+    present = np.flatnonzero(np.bincount(points))
+    kept = np.zeros(int(present[-1]) + 1, dtype=bool)
+    kept[present] = [code == 0 or chr(code).isalnum() for code in present.tolist()]
+    points = points[kept[points]]
+    
+    stretched = np.zeros(len(points), dtype=bool)
+    stretched[2:] = (points[2:] == points[1:-1]) & (points[1:-1] == points[:-2]) & (points[2:] != 0)
+    points = points[~stretched]
+    
+    separators = np.flatnonzero(points == 0)
+    lengths = np.diff(np.concatenate(([-1], separators, [len(points)]))) - 1
+    return points[points != 0], lengths
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer: spreads every input bit over the whole hash"""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def text_hashes(points: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    64-bit hash of every text (normalize_points layout)
+    
+    Every character is hashed together with its position and the hashes of
+    a text are summed, so all texts are hashed in a few array passes.
+    """
+    starts = np.cumsum(lengths) - lengths
+    positions = np.arange(len(points), dtype=np.int64) - np.repeat(starts, lengths)
+    # Code points fit in 21 bits, positions go above them
+    mixed = _mix(points.astype(np.uint64) | (positions.astype(np.uint64) << np.uint64(24)))
+    totals = np.zeros(len(lengths), dtype=np.uint64)
+    filled = lengths > 0
+    if filled.any():
+        totals[filled] = np.add.reduceat(mixed, starts[filled])
+    return _mix(totals ^ lengths.astype(np.uint64))
+
+
+def shingle_hashes(points: np.ndarray, lengths: np.ndarray,
+                   size: int = SHINGLE_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hash of every run of size characters in every text, in one array pass
+    
+    Args:
+        points: Code points of the texts back to back (normalize_points)
+        lengths: Length of every text (those shorter than size have no shingles)
+        size: Characters per shingle
+        
+    Returns:
+        (uint64 shingle hashes, index of the text each came from), grouped by text
+    """
+    points = points.astype(np.uint64)
+    starts = np.cumsum(lengths) - lengths
+    counts = np.maximum(lengths - size + 1, 0)
+    owners = np.repeat(np.arange(len(lengths), dtype=np.int64), counts)
+    firsts = np.cumsum(counts) - counts
+    positions = np.arange(int(counts.sum()), dtype=np.int64) + np.repeat(starts - firsts, counts)
+    
+    hashes = np.zeros(len(positions), dtype=np.uint64)
+    for offset in range(size):
+        # uint64 arithmetic wraps around, which is what a hash wants
+        hashes = hashes * _PRIME + points[positions + offset]
+    return _mix(hashes), owners
+
+
+def minhash_signatures(points: np.ndarray, lengths: np.ndarray,
+                       count: int = MINHASH_BANDS * MINHASH_ROWS,
+                       size: int = SHINGLE_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    MinHash signature of every text
+    
+    The share of equal values in two signatures estimates the Jaccard
+    similarity of the texts' shingle sets. Shingle hashes are already well
+    mixed, so every value uses a cheap odd multiply-add permutation of them.
+    
+    Args:
+        points: Code points of the texts back to back (normalize_points)
+        lengths: Length of every text
+        count: MinHash values per text
+        size: Characters per shingle
+        
+    Returns:
+        (indices of the texts with shingles, uint32 signatures of shape
+        (texts with shingles, count))
+    """
+    hashes, owners = shingle_hashes(points, lengths, size)
+    signed, offsets = np.unique(owners, return_index=True)
+    # 32 bits are plenty to tell the shingles of chat messages apart and
+    # halve the memory every permutation passes over
+    hashes = (hashes >> np.uint64(32)).astype(np.uint32)
+    seeds = (_mix(np.arange(1, 2 * count + 1, dtype=np.uint64)) >> np.uint64(32)).astype(np.uint32)
+    signatures = np.zeros((len(signed), count), dtype=np.uint32)
+    for i in range(count):
+        if len(hashes):
+            permuted = hashes * (seeds[2 * i] | np.uint32(1)) + seeds[2 * i + 1]
+            signatures[:, i] = np.minimum.reduceat(permuted, offsets)
+    return signed, signatures
+
+
+def near_duplicate_keys(signatures: np.ndarray, bands: int = MINHASH_BANDS,
+                        similarity: float = DEFAULT_SIMILARITY) -> List[np.ndarray]:
+    """
+    Locality-sensitive banding of MinHash signatures, with checked candidates
+    
+    Texts agreeing on every value of a band land in one bucket. Every text
+    in a bucket is compared with the bucket's first text over the whole
+    signature and keeps the bucket only if they are similar enough.
+    
+    Args:
+        signatures: minhash_signatures result (columns split evenly into bands)
+        bands: Number of bands
+        similarity: Share of equal values a text needs with the bucket's first
+        
+    Returns:
+        One int64 array per band: the bucket's first text, or the text's
+        own position if it is not similar enough
+    """
+    n = len(signatures)
+    positions = np.arange(n, dtype=np.int64)
+    keys = []
+    for columns in np.array_split(np.arange(signatures.shape[1]), bands):
+        key = np.zeros(n, dtype=np.uint64)
+        for column in columns.tolist():
+            key = _mix(key ^ signatures[:, column].astype(np.uint64))
+        # Hash based bucketing; numbered in order of appearance, so the
+        # first text of bucket b is the first position holding code b
+        buckets, first_keys = pd.factorize(key)
+        firsts = np.zeros(len(first_keys), dtype=np.int64)
+        firsts[buckets[::-1]] = positions[::-1]
+        anchor = firsts[buckets]
+        
+        # Most texts are alone in their bucket; only the others are checked
+        shared = np.flatnonzero(anchor != positions)
+        similar = (signatures[shared] == signatures[anchor[shared]]).mean(axis=1) >= similarity
+        key = positions.copy()
+        key[shared[similar]] = anchor[shared[similar]]
+        keys.append(key)
+    return keys
+
+
+def duplicate_groups(messages: pd.Series, min_chars: int = 8,
+                     near_duplicates: bool = True,
+                     similarity: float = DEFAULT_SIMILARITY) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Duplicate group of every message
+    
+    Args:
+        messages: Raw message texts
+        min_chars: Near-duplicates are only searched among normalized texts
+            at least this long
+        near_duplicates: Group near-duplicates (exact normalized copies only
+            when False)
+        similarity: Estimated shingle Jaccard similarity of near-duplicates
+        
+    Returns:
+        (group of every message, -1 for messages that normalize to nothing;
+        normalized length of every message)
+    """
+    # Normalize and hash each distinct text once, however often it was sent
+    codes, uniques = pd.factorize(messages.fillna(''), use_na_sentinel=False)
+    points, lengths = normalize_points(uniques.tolist())
+    _, firsts, norm_codes = np.unique(text_hashes(points, lengths), return_index=True,
+                                      return_inverse=True)
+    
+    # Groups are numbered by distinct normalized text
+    labels = np.arange(len(firsts), dtype=np.int64)
+    norm_lengths = lengths[firsts]
+    long_texts = np.flatnonzero(norm_lengths >= max(min_chars, SHINGLE_SIZE))
+    if near_duplicates and len(long_texts) > 1:
+        # Code points of the first raw text behind every long normalized text
+        starts = np.cumsum(lengths) - lengths
+        chosen = firsts[long_texts]
+        picked = np.repeat(starts[chosen] - (np.cumsum(lengths[chosen]) - lengths[chosen]),
+                           lengths[chosen]) + np.arange(int(lengths[chosen].sum()), dtype=np.int64)
+        signed, signatures = minhash_signatures(points[picked], lengths[chosen])
+        # Every text joins the first text of the most senior bucket it is
+        # similar to; no chaining, so a group never drifts from its first text
+        anchors = np.minimum.reduce(near_duplicate_keys(signatures, similarity=similarity))
+        labels[long_texts[signed]] = long_texts[signed][anchors]
+    labels = np.where(norm_lengths > 0, labels, -1)
+    
+    return labels[norm_codes][codes], norm_lengths[norm_codes][codes]
+
+
+def scan_messages(seconds: np.ndarray, users: np.ndarray, messages: pd.Series,
+                  exempt: Optional[np.ndarray] = None, options: Optional[SpamOptions] = None,
+                  control: Optional[JobControl] = None) -> SpamScan:
+    """
+    Flag and weight the floods in a chat log
+    
+    Args:
+        seconds: Playback time of every message
+        users: Integer code of every message's author
+        messages: Raw text of every message
+        exempt: Messages never flagged (e.g. donations, system messages)
+        options: Flood thresholds (defaults to SpamOptions())
+        control: Optional job control for progress and cancellation
+        
+    Returns:
+        SpamScan; a user's copies of one message in a window weigh
+        max_repeats in total, and a copy-paste wave weighs about one message
+    """
+    options = options or SpamOptions()
+    report_progress(control, 20, "메시지 해시 계산 중")
+    groups, lengths = duplicate_groups(messages, options.min_chars, options.near_duplicates)
+    if exempt is not None:
+        groups = np.where(exempt, -1, groups)
+    
+    report_progress(control, 70, "도배 집계 중")
+    n = len(groups)
+    repeats = np.ones(n, dtype=np.int64)
+    copies = np.ones(n, dtype=np.int64)
+    counted = np.flatnonzero(groups >= 0)
+    if len(counted):
+        windows = np.asarray(seconds, dtype=np.int64)[counted] // options.window_seconds
+        authors = np.asarray(users, dtype=np.int64)[counted] + 1
+        # (window, group) and (window, group, user) as dense integer keys
+        _, group_window = np.unique(windows * (int(groups.max()) + 1) + groups[counted],
+                                    return_inverse=True)
+        user_keys, per_user, user_counts = np.unique(
+            group_window * (int(authors.max()) + 1) + authors,
+            return_inverse=True, return_counts=True
+        )
+        users_per_group = np.bincount(user_keys // (int(authors.max()) + 1))
+        repeats[counted] = user_counts[per_user]
+        copies[counted] = users_per_group[group_window]
+    
+    flags = np.zeros(n, dtype=np.int8)
+    flags[repeats > options.max_repeats] |= REPEAT
+    wave = (copies >= options.min_copies) & (lengths >= options.min_chars) & (groups >= 0)
+    flags[wave] |= COPY_PASTE
+    
+    weights = np.minimum(1.0, options.max_repeats / repeats)
+    weights = np.where(wave, weights / copies, weights)
+    return SpamScan(groups, repeats, copies, flags, weights)
+
+
+def flood_report(scan: SpamScan, seconds: np.ndarray, messages: Sequence[str],
+                 window_seconds: int, top_n: int = 10) -> pd.DataFrame:
+    """
+    The biggest floods of a scan
+    
+    Args:
+        scan: scan_messages result
+        seconds: Playback time of every message
+        messages: Text of every message (indexable)
+        window_seconds: Window size the scan counted in
+        top_n: Number of floods
+        
+    Returns:
+        DataFrame, biggest first: 'time_seconds' (window start),
+        'messages', 'users', 'kind' ('copy_paste' or 'repeat') and 'text'
+        (the first message of the flood)
+    """
+    flagged = np.flatnonzero(scan.flags)
+    frame = pd.DataFrame({
+        'window': np.asarray(seconds, dtype=np.int64)[flagged] // window_seconds,
+        'group': scan.groups[flagged],
+        'index': flagged,
+        'copy_paste': (scan.flags[flagged] & COPY_PASTE) > 0,
+        'users': scan.copies[flagged],
+    })
+    floods = frame.groupby(['window', 'group'], sort=False).agg(
+        messages=('index', 'size'), first=('index', 'min'),
+        copy_paste=('copy_paste', 'any'), users=('users', 'max')
+    ).sort_values('messages', ascending=False, kind='stable').head(top_n)
+    
+    return pd.DataFrame({
+        'time_seconds': floods.index.get_level_values('window').to_numpy() * window_seconds,
+        'messages': floods['messages'].to_numpy(),
+        'users': floods['users'].to_numpy(),
+        'kind': np.where(floods['copy_paste'].to_numpy(), 'copy_paste', 'repeat'),
+        'text': [messages[i] for i in floods['first'].tolist()],
+    })
@@ -0,0 +1,328 @@
+"""
+Stage Timing - Lightweight spans around analysis stages
+
+Timing is off by default; span() then hands back a shared no-op object, so
+instrumented code pays one global lookup per stage. Once enabled, every span
+is added to the collector of the job running on the current thread (shown in
+the GUI status bar and the CLI summary) and, optionally, appended to a JSON
+lines log.
+
+Memory profiling is a second opt-in on top of timing: each span then also
+records its tracemalloc peak (above the allocations live when it started)
+and the change in resident set size. tracemalloc slows allocation-heavy code
+down several times and is process-wide, so it is meant for the CLI and the
+benchmarks, where one job runs at a time.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+
+_enabled = False
+_memory = False
+_started_tracemalloc = False
+_log_path: Optional[str] = None
+_log_lock = threading.Lock()
+_local = threading.local()
+
+MB = 1024 * 1024
+
+
+def enable(log_path: Optional[str] = None, memory: bool = False):
+    """
+    Start recording spans
+    
+    Args:
+        log_path: Also append every span as one JSON object per line
+        memory: Also record the memory peak and RSS change of every span
+    """
+    global _enabled, _memory, _started_tracemalloc, _log_path
+    _enabled = True
+    _log_path = log_path
+    if memory and not _memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracemalloc = True
+        _memory = True
+
+
+def disable():
+    """Stop recording spans"""
+    global _enabled, _memory, _started_tracemalloc, _log_path
+    _enabled = False
+    _log_path = None
+    if _started_tracemalloc:
+        tracemalloc.stop()
+        _started_tracemalloc = False
+    _memory = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def is_memory_enabled() -> bool:
+    return _memory
+
+
+def current_rss() -> Optional[int]:
+    """
+    Resident set size of this process in bytes
+    
+    Read from /proc on Linux; elsewhere psutil is used when it is installed.
+    
+    Returns:
+        Bytes, or None if the platform offers no way to read it
+    """
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def format_bytes(value: Optional[int], signed: bool = False) -> str:
+    """Bytes as MB for reports ('-' when unknown)"""
+    if value is None:
+        return "-"
+    return f"{value / MB:+.1f}MB" if signed else f"{value / MB:.1f}MB"
+
+
+def format_memory_rows(memory: Dict[str, Dict]) -> List[str]:
+    """Aligned peak allocation / RSS change rows of a to_dict() 'memory' entry"""
+    return [f"  {name:<20} {format_bytes(stage['peak_bytes']):>10} "
+            f"{format_bytes(stage['rss_delta_bytes'], signed=True):>10}"
+            for name, stage in memory.items()]
+
+
+def format_report(timings: Dict) -> str:
+    """
+    Aligned per-stage table for terminal output
+    
+    Args:
+        timings: Timings.to_dict() result (e.g. a pipeline summary's 'timings')
+    """
+    lines = [f"{timings['name']}: 합계 {timings['total']:.3f}초"]
+    for name, stage in timings['stages'].items():
+        calls = f" ({stage['count']}회)" if stage['count'] > 1 else ""
+        lines.append(f"  {name:<20} {stage['seconds']:9.3f}초{calls}")
+    if 'memory' in timings:
+        lines.append("메모리 (최대 할당 / RSS 변화):")
+        lines += format_memory_rows(timings['memory'])
+    return "\n".join(lines)
+
+
+class Timings:
+    """Spans recorded while one job ran"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        # (stage name, seconds, nesting depth) in the order the spans ended
+        self.spans: List[Tuple[str, float, int]] = []
+        # (stage name, peak bytes, RSS change in bytes or None, nesting depth)
+        # while memory profiling is enabled
+        self.memory: List[Tuple[str, int, Optional[int], int]] = []
+    
+    def totals(self) -> Dict[str, Tuple[float, int]]:
+        """Seconds and call count per stage name (outermost spans only)"""
+        totals: Dict[str, Tuple[float, int]] = {}
+        for name, seconds, depth in self.spans:
+            if depth == 0:
+                total, count = totals.get(name, (0.0, 0))
+                totals[name] = (total + seconds, count + 1)
+        return totals
+    
+    def memory_totals(self) -> Dict[str, Tuple[int, Optional[int]]]:
+        """
+        Largest peak and RSS change per stage name
+        
+        Nested spans are included: a peak is not additive, so an outer stage
+        and the steps inside it can be listed side by side.
+        """
+        totals: Dict[str, Tuple[int, Optional[int]]] = {}
+        for name, peak, rss_delta, _depth in self.memory:
+            old_peak, old_rss = totals.get(name, (0, None))
+            if old_rss is not None and rss_delta is not None:
+                rss_delta = max(old_rss, rss_delta)
+            totals[name] = (max(old_peak, peak), rss_delta)
+        return totals
+    
+    @property
+    def total(self) -> float:
+        return sum(seconds for seconds, _count in self.totals().values())
+    
+    def summary(self) -> str:
+        """One line for a status bar"""
+        parts = [f"{name} {seconds:.2f}초" for name, (seconds, _count) in self.totals().items()]
+        return f"{' · '.join(parts)} (합계 {self.total:.2f}초)"
+    
+    def format_table(self) -> str:
+        """Aligned per-stage table for terminal output (see format_report)"""
+        return format_report(self.to_dict())
+    
+    def to_dict(self) -> Dict:
+        result = {
+            'name': self.name,
+            'total': round(self.total, 6),
+            'stages': {name: {'seconds': round(seconds, 6), 'count': count}
+                       for name, (seconds, count) in self.totals().items()},
+        }
+        if self.memory:
+            result['memory'] = {name: {'peak_bytes': peak, 'rss_delta_bytes': rss_delta}
+                                for name, (peak, rss_delta) in self.memory_totals().items()}
+        return result
+
+
+class _Span:
+    """Times one stage and reports it on exit"""
+    
+    __slots__ = ('name', 'started', 'depth', 'memory')
+    
+    def __init__(self, name: str):
+        self.name = name
+    
+    def __enter__(self):
+        self.depth = getattr(_local, 'depth', 0)
+        _local.depth = self.depth + 1
+        self.memory = _MemorySpan() if _memory else None
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.started
+        _local.depth = self.depth
+        memory = self.memory.finish() if self.memory is not None else None
+        collector = getattr(_local, 'collector', None)
+        if collector is not None:
+            collector.spans.append((self.name, seconds, self.depth))
+            if memory is not None:
+                collector.memory.append((self.name, memory[0], memory[1], self.depth))
+        if _log_path is not None:
+            record = {
+                'span': self.name,
+                'seconds': round(seconds, 6),
+                'depth': self.depth,
+                'job': collector.name if collector is not None else None,
+                'thread': threading.current_thread().name,
+                'time': time.time(),
+                'failed': exc_type is not None,
+            }
+            if memory is not None:
+                record['peak_bytes'], record['rss_delta_bytes'] = memory
+            _write_log(record)
+        return False
+
+
+class _MemorySpan:
+    """
+    tracemalloc peak and RSS change of one span
+    
+    tracemalloc keeps a single process-wide peak, which every span resets on
+    entry. To keep the enclosing span's peak correct, a finished span hands
+    the highest value seen (before and during it) up to its parent.
+    """
+    
+    __slots__ = ('parent', 'start', 'outer_peak', 'child_peak', 'rss_start')
+    
+    def __init__(self):
+        self.parent = getattr(_local, 'memory_span', None)
+        _local.memory_span = self
+        self.start, self.outer_peak = tracemalloc.get_traced_memory()
+        self.child_peak = 0
+        self.rss_start = current_rss()
+        tracemalloc.reset_peak()
+    
+    def finish(self) -> Tuple[int, Optional[int]]:
+        """Peak bytes above the start and RSS change (None if unavailable)"""
+        _current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, self.child_peak)
+        rss = current_rss()
+        rss_delta = rss - self.rss_start if rss is not None and self.rss_start is not None else None
+        
+        _local.memory_span = self.parent
+        if self.parent is not None:
+            self.parent.child_peak = max(self.parent.child_peak, self.outer_peak, peak)
+        return max(0, peak - self.start), rss_delta
+
+
+class _NoopSpan:
+    """Stand-in returned while timing is disabled"""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str):
+    """
+    Time a stage
+    
+    Usage:
+        with timing.span('keyword.match'):
+            ...
+    """
+    return _Span(name) if _enabled else _NOOP
+
+
+def timed(name: str):
+    """Decorator form of span() for a whole function"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class collect:
+    """
+    Collect the spans recorded on this thread into a Timings
+    
+    Yields None while timing is disabled. Passing an existing Timings keeps
+    adding to it (e.g. plotting on the GUI thread after a background job).
+    """
+    
+    __slots__ = ('timings', 'previous')
+    
+    def __init__(self, name: str, timings: Optional[Timings] = None):
+        self.timings = timings if timings is not None else (Timings(name) if _enabled else None)
+    
+    def __enter__(self) -> Optional[Timings]:
+        self.previous = getattr(_local, 'collector', None)
+        if self.timings is not None:
+            _local.collector = self.timings
+        return self.timings
+    
+    def __exit__(self, exc_type, exc, tb):
+        _local.collector = self.previous
+        return False
+
+
+def _write_log(record: Dict):
+    line = json.dumps(record, ensure_ascii=False)
+    with _log_lock:
+        try:
+            with open(_log_path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+        except (OSError, TypeError):
+            # A broken log must never fail an analysis
+            pass
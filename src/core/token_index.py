@@ -0,0 +1,77 @@
+"""
+Token Bin Index - Per-bin token counts for time-range wordclouds
+"""
+import numpy as np
+import pandas as pd
+from typing import Iterable, Optional
+
+from core.word_frequency import DEFAULT_STOPWORDS, tokenize_messages
+
+
+class TokenBinIndex:
+    """
+    Sparse token x time-bin count matrix with cumulative sums along time
+    
+    Non-zero cells are stored sorted by (token, bin) together with a running total,
+    so the frequency of every token inside any [t0, t1] range is two binary
+    searches and a subtraction instead of a rescan of the messages.
+    """
+    
+    def __init__(self, messages: pd.Series, seconds: pd.Series, bin_seconds: int = 10,
+                 stopwords: Optional[Iterable[str]] = None):
+        """
+        Build the index
+        
+        Args:
+            messages: Cleaned message text
+            seconds: Playback time of each message (same index as messages)
+            bin_seconds: Time resolution of range queries
+            stopwords: Tokens to drop (defaults to DEFAULT_STOPWORDS)
+        """
+        self.bin_seconds = max(int(bin_seconds), 1)
+        stopwords = DEFAULT_STOPWORDS if stopwords is None else set(stopwords)
+        
+        tokens = tokenize_messages(messages)
+        tokens = tokens[~tokens.isin(stopwords)]
+        
+        # Each token inherits the time bin of its message
+        bins = seconds.loc[tokens.index].to_numpy(dtype=np.int64) // self.bin_seconds
+        codes, vocabulary = pd.factorize(tokens.to_numpy())
+        
+        self.vocabulary = np.asarray(vocabulary, dtype=object)
+        self.n_bins = int(bins.max()) + 1 if len(bins) else 1
+        
+        # Sparse cells: one key per (token, bin) pair, sorted token-major
+        keys = codes.astype(np.int64) * self.n_bins + bins
+        self.keys, counts = np.unique(keys, return_counts=True)
+        self.cumulative = np.concatenate(([0], np.cumsum(counts)))
+        
+        self._token_starts = np.arange(len(self.vocabulary), dtype=np.int64) * self.n_bins
+    
+    def range_counts(self, start_seconds: float, end_seconds: float) -> np.ndarray:
+        """
+        Count every token inside [start_seconds, end_seconds]
+        
+        Returns:
+            Array of counts aligned with self.vocabulary
+        """
+        first_bin = max(int(start_seconds) // self.bin_seconds, 0)
+        last_bin = min(int(end_seconds) // self.bin_seconds, self.n_bins - 1)
+        if last_bin < first_bin:
+            return np.zeros(len(self.vocabulary), dtype=np.int64)
+        
+        lo = np.searchsorted(self.keys, self._token_starts + first_bin, side='left')
+        hi = np.searchsorted(self.keys, self._token_starts + last_bin, side='right')
+        return self.cumulative[hi] - self.cumulative[lo]
+    
+    def range_frequencies(self, start_seconds: float, end_seconds: float) -> pd.Series:
+        """
+        Token frequencies inside [start_seconds, end_seconds]
+        
+        Returns:
+            Series of counts indexed by token, most frequent first
+        """
+        counts = self.range_counts(start_seconds, end_seconds)
+        present = counts > 0
+        frequencies = pd.Series(counts[present], index=self.vocabulary[present], name='count')
+        return frequencies.sort_values(ascending=False)
@@ -0,0 +1,69 @@
+"""
+Word Frequency - Vectorized token counting for wordclouds
+"""
+import pandas as pd
+from typing import Iterable, Optional
+
+# Same token rule as WordCloud's default regexp with min_word_length=0 (1+ word characters)
+TOKEN_PATTERN = r"\w[\w']*"
+
+# Runs of the same character are collapsed to this length (ㅋㅋㅋㅋㅋ -> ㅋㅋ)
+REPEAT_LIMIT = 2
+
+# Filler words that dominate chat but say nothing about the moment
+KOREAN_STOPWORDS = {
+    '그냥', '진짜', '정말', '너무', '완전', '약간', '조금',
+    '이거', '저거', '그거', '이건', '저건', '그건', '여기', '거기', '저기',
+    '근데', '그리고', '그래서', '그러면', '그럼', '그런데', '하지만',
+    '이제', '지금', '아까', '오늘', '방금',
+    '나도', '너도', '저도', '우리', '저는', '제가', '내가', '나는', '너는',
+    '하는', '있는', '없는', '하고', '해서', '하면', '있어', '없어', '했는데',
+    '이렇게', '그렇게', '저렇게', '어떻게', '뭔가', '무슨', '이런', '그런', '저런',
+}
+
+ENGLISH_STOPWORDS = {
+    'the', 'and', 'is', 'it', 'to', 'of', 'in', 'that', 'this', 'you', 'for',
+    'on', 'are', 'was', 'with', 'be', 'at', 'so', 'just',
+}
+
+DEFAULT_STOPWORDS = KOREAN_STOPWORDS | ENGLISH_STOPWORDS
+
+
+def normalize_messages(messages: pd.Series) -> pd.Series:
+    """Lowercase and collapse character repeats, vectorized over all messages"""
+    repeat_pattern = r'(.)\1{%d,}' % REPEAT_LIMIT
+    return (messages.astype(str)
+            .str.lower()
+            .str.replace(repeat_pattern, r'\1' * REPEAT_LIMIT, regex=True))
+
+
+def tokenize_messages(messages: pd.Series) -> pd.Series:
+    """
+    Split messages into one token per row
+    
+    Args:
+        messages: Cleaned message text
+        
+    Returns:
+        Series of tokens whose index points back to the source message
+    """
+    tokens = normalize_messages(messages).str.findall(TOKEN_PATTERN).explode()
+    return tokens.dropna()
+
+
+def count_tokens(messages: pd.Series,
+                 stopwords: Optional[Iterable[str]] = None) -> pd.Series:
+    """
+    Count token frequencies over all messages
+    
+    Args:
+        messages: Cleaned message text
+        stopwords: Tokens to drop (defaults to DEFAULT_STOPWORDS)
+        
+    Returns:
+        Series of counts indexed by token, most frequent first
+    """
+    stopwords = DEFAULT_STOPWORDS if stopwords is None else set(stopwords)
+    tokens = tokenize_messages(messages)
+    tokens = tokens[~tokens.isin(stopwords)]
+    return tokens.value_counts()
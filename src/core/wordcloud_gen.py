@@ -1,52 +1,76 @@
 """
 WordCloud Generator with Cross-Platform Font Support
 """
-import platform
-from pathlib import Path
-from wordcloud import WordCloud
-from typing import Optional
+import hashlib
+import heapq
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from core import timing
+from core.fonts import korean_font_file
+from core.token_index import TokenBinIndex
+from core.word_frequency import count_tokens
+
+
+# Number of rendered images kept in memory
+IMAGE_CACHE_SIZE = 16
+
+
+def render_wordcloud(frequencies: Dict[str, int], width: int, height: int,
+                     max_words: int, colormap: str, font_path: Optional[str]) -> np.ndarray:
+    """
+    Lay out and draw a wordcloud (runs in a worker process)
+    
+    Returns:
+        RGB image array
+    """
+    from wordcloud import WordCloud
+    
+    wordcloud = WordCloud(
+        font_path=font_path,
+        width=width,
+        height=height,
+        background_color='white',
+        colormap=colormap,
+        max_words=max_words,
+        relative_scaling=0.5,
+        min_font_size=10
+    ).generate_from_frequencies(frequencies)
+    return wordcloud.to_array()
+
+
+def frequency_fingerprint(frequencies: Dict[str, int]) -> str:
+    """Stable hash of token frequencies (order independent)"""
+    digest = hashlib.sha1()
+    for token, count in sorted(frequencies.items()):
+        digest.update(f"{token}\t{count}\n".encode('utf-8'))
+    return digest.hexdigest()
 
 
 class WordCloudGenerator:
     """Generates wordcloud from text data"""
     
-    def __init__(self):
-        self.wordcloud: Optional[WordCloud] = None
+    def __init__(self, use_worker_process: bool = True):
+        """
+        Args:
+            use_worker_process: Lay out wordclouds in a background process
+                (headless runs render in the calling process instead)
+        """
+        self.use_worker_process = use_worker_process
+        # Rendered image of the current wordcloud
+        self.wordcloud: Optional[np.ndarray] = None
+        self._image_cache: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
     
-    def get_korean_font(self) -> str:
-        """Get Korean font path based on platform"""
-        system = platform.system()
-        
-        if system == 'Darwin':  # macOS
-            font_path = '/System/Library/Fonts/AppleSDGothicNeo.ttc'
-            if Path(font_path).exists():
-                return font_path
-            # Fallback
-            return '/System/Library/Fonts/Supplemental/Arial Unicode.ttf'
-        
-        elif system == 'Windows':
-            # Try common Korean fonts on Windows
-            fonts = [
-                'C:\\Windows\\Fonts\\malgun.ttf',  # 맑은 고딕
-                'C:\\Windows\\Fonts\\gulim.ttc',   # 굴림
-                'C:\\Windows\\Fonts\\batang.ttc',  # 바탕
-            ]
-            for font in fonts:
-                if Path(font).exists():
-                    return font
-            # Fallback to Arial Unicode
-            return 'C:\\Windows\\Fonts\\arial.ttf'
-        
-        else:  # Linux
-            fonts = [
-                '/usr/share/fonts/truetype/nanum/NanumGothic.ttf',
-                '/usr/share/fonts/truetype/nanum/NanumBarunGothic.ttf',
-            ]
-            for font in fonts:
-                if Path(font).exists():
-                    return font
-            # Fallback
-            return None
+    def get_korean_font(self) -> Optional[str]:
+        """Get Korean font path based on platform (cached between runs)"""
+        return korean_font_file()
     
     def generate(self, text: str, width: int = 800, height: int = 400, 
                  max_words: int = 100) -> bool:
@@ -65,22 +89,136 @@ class WordCloudGenerator:
         if not text.strip():
             return False
         
-        font_path = self.get_korean_font()
+        # Same tokens as the chat wordclouds, one message per line
+        frequencies = count_tokens(pd.Series(text.splitlines()))
+        return self.generate_from_frequencies(frequencies, width, height, max_words)
+    
+    def generate_from_frequencies(self, frequencies: Union[Dict[str, int], pd.Series],
+                                  width: int = 800, height: int = 400,
+                                  max_words: int = 100, colormap: str = 'viridis') -> bool:
+        """
+        Generate wordcloud from precomputed token frequencies
         
-        # Create wordcloud
-        self.wordcloud = WordCloud(
-            font_path=font_path,
-            width=width,
-            height=height,
-            background_color='white',
-            colormap='viridis',
-            max_words=max_words,
-            relative_scaling=0.5,
-            min_font_size=10
-        ).generate(text)
+        Args:
+            frequencies: Token counts (dict or Series indexed by token)
+            width: Image width
+            height: Image height
+            max_words: Maximum number of words
+            colormap: Matplotlib colormap name
+            
+        Returns:
+            True if successful
+        """
+        image = self.render_frequencies(frequencies, width, height, max_words, colormap)
+        if image is None:
+            return False
         
+        self.wordcloud = image
         return True
     
+    def render_frequencies(self, frequencies: Union[Dict[str, int], pd.Series],
+                           width: int = 800, height: int = 400,
+                           max_words: int = 100, colormap: str = 'viridis') -> Optional[np.ndarray]:
+        """
+        Wordcloud image of token frequencies, leaving the current wordcloud as is
+        
+        Jobs that may be superseded render with this and let the caller decide
+        whether the image becomes the current wordcloud.
+        
+        Returns:
+            RGB image array, or None if there are no tokens
+        """
+        # Only the top words are laid out, skip sorting the long tail
+        if isinstance(frequencies, pd.Series):
+            top = frequencies.nlargest(max_words).items()
+        else:
+            top = heapq.nlargest(max_words, frequencies.items(), key=lambda item: item[1])
+        frequencies = {str(token): int(count) for token, count in top}
+        if not frequencies:
+            return None
+        
+        return self.render(frequencies, width, height, max_words, colormap)
+    
+    def render(self, frequencies: Dict[str, int], width: int = 800, height: int = 400,
+               max_words: int = 100, colormap: str = 'viridis') -> np.ndarray:
+        """
+        Get the wordcloud image for frequencies, laying it out only on a cache miss
+        
+        The layout runs in a background process so it never holds the GUI
+        process' interpreter lock. Blocks the calling thread until done.
+        
+        Returns:
+            RGB image array
+        """
+        font_path = self.get_korean_font()
+        key = (frequency_fingerprint(frequencies), width, height, max_words, colormap, font_path)
+        
+        with self._cache_lock:
+            image = self._image_cache.get(key)
+            if image is not None:
+                self._image_cache.move_to_end(key)
+                return image
+        
+        args = (frequencies, width, height, max_words, colormap, font_path)
+        with timing.span('wordcloud.layout'):
+            if not self.use_worker_process:
+                image = render_wordcloud(*args)
+            else:
+                try:
+                    image = self._get_executor().submit(render_wordcloud, *args).result()
+                except (BrokenProcessPool, OSError):
+                    # No worker process available (e.g. restricted environment)
+                    self._executor = None
+                    image = render_wordcloud(*args)
+        
+        with self._cache_lock:
+            self._image_cache[key] = image
+            while len(self._image_cache) > IMAGE_CACHE_SIZE:
+                self._image_cache.popitem(last=False)
+        return image
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the render process on first use"""
+        with self._cache_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=1)
+            return self._executor
+    
+    def shutdown(self):
+        """Stop the render process"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def generate_for_range(self, token_index: TokenBinIndex, start_seconds: float,
+                           end_seconds: float, **kwargs) -> bool:
+        """
+        Generate wordcloud from the chat inside a time range
+        
+        Args:
+            token_index: Per-bin token counts of the stream
+            start_seconds: Range start (playback seconds)
+            end_seconds: Range end (playback seconds)
+            **kwargs: Options passed to generate_from_frequencies
+            
+        Returns:
+            True if successful (False if nothing was said in the range)
+        """
+        frequencies = token_index.range_frequencies(start_seconds, end_seconds)
+        return self.generate_from_frequencies(frequencies, **kwargs)
+    
+    def render_range(self, token_index: TokenBinIndex, start_seconds: float,
+                     end_seconds: float, **kwargs) -> Optional[np.ndarray]:
+        """
+        Wordcloud image of the chat inside a time range, leaving the current
+        wordcloud as is (see render_frequencies)
+        
+        Returns:
+            RGB image array, or None if nothing was said in the range
+        """
+        frequencies = token_index.range_frequencies(start_seconds, end_seconds)
+        return self.render_frequencies(frequencies, **kwargs)
+    
     def save(self, output_path: str) -> bool:
         """
         Save wordcloud to file
@@ -94,9 +232,12 @@ class WordCloudGenerator:
         if self.wordcloud is None:
             return False
         
-        self.wordcloud.to_file(output_path)
+        from PIL import Image
+        
+        # Saves the already rendered image, the layout is not run again
+        Image.fromarray(self.wordcloud).save(output_path)
         return True
     
-    def get_wordcloud(self) -> Optional[WordCloud]:
-        """Get generated wordcloud object"""
+    def get_wordcloud(self) -> Optional[np.ndarray]:
+        """Get generated wordcloud image"""
         return self.wordcloud
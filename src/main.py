@@ -1,20 +1,54 @@
 """
 Chzzk Chat Analyzer - Main Entry Point
 """
+import time
+
+# Taken before any other import so the measurement covers module loading
+STARTUP_STARTED = time.perf_counter()
+
+import multiprocessing
 import sys
 from pathlib import Path
 
 # Add src directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import QApplication
 
+from core import timing
 from ui.main_window import MainWindow
 from ui.styles import get_stylesheet
 
 
+# Startup time above this is reported as a regression (seconds)
+STARTUP_BUDGET = 1.0
+
+
+def report_startup(window: MainWindow, quit_after: bool):
+    """Show how long it took until the window was on screen"""
+    elapsed = time.perf_counter() - STARTUP_STARTED
+    window.statusBar().showMessage(f"시작 시간: {elapsed:.2f}초", 5000)
+    if quit_after:
+        verdict = "OK" if elapsed <= STARTUP_BUDGET else f"목표 {STARTUP_BUDGET:g}초 초과"
+        print(f"시작 시간: {elapsed:.3f}초 ({verdict})", file=sys.stderr)
+        QApplication.instance().exit(0 if elapsed <= STARTUP_BUDGET else 1)
+
+
 def main():
     """Main application entry point"""
+    # Wordclouds render in a worker process; required for frozen builds
+    multiprocessing.freeze_support()
+    
+    # --measure-startup prints the time to first show and exits (for CI / builds)
+    measure_startup = "--measure-startup" in sys.argv
+    
+    # --timing [LOG] shows per-stage times in the status bar (LOG: JSON lines)
+    if "--timing" in sys.argv:
+        index = sys.argv.index("--timing") + 1
+        has_log = index < len(sys.argv) and not sys.argv[index].startswith("-")
+        timing.enable(sys.argv[index] if has_log else None)
+    
     # Create application
     app = QApplication(sys.argv)
     
@@ -30,6 +64,9 @@ def main():
     window = MainWindow()
     window.show()
     
+    # Runs once the event loop has painted the window
+    QTimer.singleShot(0, lambda: report_startup(window, measure_startup))
+    
     # Run application
     sys.exit(app.exec())
 
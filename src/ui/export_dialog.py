@@ -0,0 +1,121 @@
+"""
+Marker export dialog - pick analyses, formats and frame rate
+"""
+from typing import Dict, List, Optional
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QGroupBox, QCheckBox, QComboBox,
+    QLabel, QSpinBox, QDialogButtonBox
+)
+
+from core.exporters import EXPORTERS
+from core.marker_timeline import DEFAULT_TOLERANCE
+
+
+# Frame rates offered for timecode based formats
+FRAME_RATES = ['23.976', '24', '25', '29.97', '30', '50', '59.94', '60']
+
+
+class ExportDialog(QDialog):
+    """Choose which analyses to export in which marker formats"""
+    
+    def __init__(self, analyses: Dict[str, str], parent=None):
+        """
+        Args:
+            analyses: Track key -> display name of every exportable analysis
+            parent: Parent widget
+        """
+        super().__init__(parent)
+        self.setWindowTitle("마커 일괄 내보내기")
+        layout = QVBoxLayout(self)
+        
+        # Analyses
+        analysis_group = QGroupBox("분석 결과")
+        analysis_layout = QVBoxLayout(analysis_group)
+        self.analysis_checks = {}
+        for key, name in analyses.items():
+            check = QCheckBox(name)
+            check.setChecked(True)
+            analysis_layout.addWidget(check)
+            self.analysis_checks[key] = check
+        layout.addWidget(analysis_group)
+        
+        # Formats
+        format_group = QGroupBox("형식")
+        format_layout = QVBoxLayout(format_group)
+        self.format_checks = {}
+        for name, exporter in EXPORTERS.items():
+            check = QCheckBox(exporter.label)
+            check.setChecked(name == 'premiere_csv')
+            format_layout.addWidget(check)
+            self.format_checks[name] = check
+        layout.addWidget(format_group)
+        
+        # Highlight clips (In/Out ranges instead of one marker per bin)
+        self.segment_group = QGroupBox("하이라이트 구간으로 묶기")
+        self.segment_group.setCheckable(True)
+        self.segment_group.setChecked(True)
+        segment_layout = QGridLayout(self.segment_group)
+        self.gap_spin = self._seconds_spin(segment_layout, 0, "묶을 간격 (초):", 30)
+        self.pre_roll_spin = self._seconds_spin(segment_layout, 1, "앞 여유 (초):", 10)
+        self.post_roll_spin = self._seconds_spin(segment_layout, 2, "뒤 여유 (초):", 10)
+        layout.addWidget(self.segment_group)
+        
+        # One combined file instead of one file per analysis
+        self.combine_group = QGroupBox("하나의 마커 파일로 합치기")
+        self.combine_group.setCheckable(True)
+        self.combine_group.setChecked(False)
+        combine_layout = QGridLayout(self.combine_group)
+        self.tolerance_spin = self._seconds_spin(combine_layout, 0, "같은 순간으로 볼 간격 (초):",
+                                                 int(DEFAULT_TOLERANCE))
+        layout.addWidget(self.combine_group)
+        
+        # Frame rate
+        fps_layout = QHBoxLayout()
+        fps_layout.addWidget(QLabel("프레임 레이트:"))
+        self.fps_combo = QComboBox()
+        self.fps_combo.addItems(FRAME_RATES)
+        self.fps_combo.setCurrentText('30')
+        fps_layout.addWidget(self.fps_combo)
+        fps_layout.addStretch()
+        layout.addLayout(fps_layout)
+        
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+    
+    def _seconds_spin(self, layout: QGridLayout, row: int, label: str, value: int) -> QSpinBox:
+        layout.addWidget(QLabel(label), row, 0)
+        spin = QSpinBox()
+        spin.setRange(0, 600)
+        spin.setValue(value)
+        layout.addWidget(spin, row, 1)
+        return spin
+    
+    def selected_analyses(self) -> List[str]:
+        return [key for key, check in self.analysis_checks.items() if check.isChecked()]
+    
+    def selected_formats(self) -> List[str]:
+        return [name for name, check in self.format_checks.items() if check.isChecked()]
+    
+    def fps(self) -> float:
+        return float(self.fps_combo.currentText())
+    
+    def segment_settings(self) -> Optional[Dict[str, float]]:
+        """SegmentOptions keyword arguments, or None for point markers"""
+        if not self.segment_group.isChecked():
+            return None
+        return {
+            'max_gap': self.gap_spin.value(),
+            'pre_roll': self.pre_roll_spin.value(),
+            'post_roll': self.post_roll_spin.value(),
+        }
+    
+    def combine_tolerance(self) -> Optional[float]:
+        """Duplicate window for combining analyses, or None for separate files"""
+        if not self.combine_group.isChecked():
+            return None
+        return float(self.tolerance_spin.value())
@@ -4,43 +4,27 @@ Main Window for Chzzk Chat Analyzer
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QPushButton, QLabel, QLineEdit, QGroupBox, QFileDialog,
-    QMessageBox, QScrollArea, QSlider
+    QMessageBox, QScrollArea, QSlider, QProgressBar, QCheckBox
 )
 from PyQt6.QtCore import Qt
-import matplotlib
-matplotlib.use('QtAgg')
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
-from matplotlib.figure import Figure
-import matplotlib.font_manager as fm
-import platform
 import os
+from typing import TYPE_CHECKING
 
-from core.analyzer import ChatAnalyzer
-from core.wordcloud_gen import WordCloudGenerator
-from core.sentiment_analyzer import SentimentAnalyzer
+from core import timing
+from ui.workers import JobRunner
 
+# matplotlib, pandas, numpy and wordcloud are imported on first use so the
+# window shows up before they load (see ui.plotting)
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+    from core.analyzer import ChatAnalyzer
+    from core.wordcloud_gen import WordCloudGenerator
+    from core.sentiment_analyzer import SentimentAnalyzer
+    from ui.plot_decimation import ViewDecimator
 
-# Configure Korean font for matplotlib
-def setup_korean_font():
-    """Setup Korean font for matplotlib"""
-    system = platform.system()
-    
-    if system == 'Darwin':  # macOS
-        font_path = '/System/Library/Fonts/AppleSDGothicNeo.ttc'
-        if os.path.exists(font_path):
-            font_prop = fm.FontProperties(fname=font_path)
-            plt.rcParams['font.family'] = font_prop.get_name()
-    elif system == 'Windows':
-        plt.rcParams['font.family'] = 'Malgun Gothic'
-    else:  # Linux
-        plt.rcParams['font.family'] = 'NanumGothic'
-    
-    # Prevent minus sign from breaking
-    plt.rcParams['axes.unicode_minus'] = False
 
-# Setup font on module load
-setup_korean_font()
+# Length of the chat window shown when a spike is clicked (seconds)
+SPIKE_WORDCLOUD_SECONDS = 120
 
 
 class MainWindow(QMainWindow):
@@ -48,13 +32,50 @@ class MainWindow(QMainWindow):
     
     def __init__(self):
         super().__init__()
-        self.analyzer = ChatAnalyzer()
-        self.wordcloud_gen = WordCloudGenerator()
-        self.sentiment_analyzer = SentimentAnalyzer()
+        # Created on first use (see the properties below)
+        self._analyzer = None
+        self._wordcloud_gen = None
+        self._sentiment_analyzer = None
         self.current_file = None
+        self.decimators = []
+        self.spike_wordcloud_canvas = None
+        
+        # Latest results of each analysis, for batch marker export
+        self.keyword_export = None
+        self.density_export = None
+        self.donation_export = None
+        self.highlight_export = None
+        self.sentiment_interval = 1.0
+        
+        # Background analyses (keeps the window responsive on big logs)
+        self.jobs = JobRunner(self)
+        self.jobs.progress.connect(self.on_job_progress)
+        self.jobs.busy_changed.connect(self.on_jobs_busy_changed)
+        self.jobs.timed.connect(self.on_job_timed)
         
         self.init_ui()
     
+    @property
+    def analyzer(self) -> "ChatAnalyzer":
+        if self._analyzer is None:
+            from core.analyzer import ChatAnalyzer
+            self._analyzer = ChatAnalyzer()
+        return self._analyzer
+    
+    @property
+    def wordcloud_gen(self) -> "WordCloudGenerator":
+        if self._wordcloud_gen is None:
+            from core.wordcloud_gen import WordCloudGenerator
+            self._wordcloud_gen = WordCloudGenerator()
+        return self._wordcloud_gen
+    
+    @property
+    def sentiment_analyzer(self) -> "SentimentAnalyzer":
+        if self._sentiment_analyzer is None:
+            from core.sentiment_analyzer import SentimentAnalyzer
+            self._sentiment_analyzer = SentimentAnalyzer()
+        return self._sentiment_analyzer
+    
     def init_ui(self):
         """Initialize the user interface"""
         self.setWindowTitle("치지직 클립 모먼트 캐처")
@@ -103,6 +124,9 @@ class MainWindow(QMainWindow):
         # Results area
         results_group = self.create_results_group()
         main_layout.addWidget(results_group, 1)
+        
+        # Job progress in the status bar
+        self.create_status_bar()
     
     def create_file_group(self) -> QGroupBox:
         """Create file selection group"""
@@ -117,6 +141,12 @@ class MainWindow(QMainWindow):
         load_btn.clicked.connect(self.load_csv)
         layout.addWidget(load_btn)
         
+        export_all_btn = QPushButton("마커 일괄 내보내기")
+        export_all_btn.setObjectName("secondaryButton")
+        export_all_btn.clicked.connect(self.export_all_markers)
+        export_all_btn.setToolTip("여러 분석 결과를 여러 편집 프로그램 형식으로 한 번에 저장합니다")
+        layout.addWidget(export_all_btn)
+        
         group.setLayout(layout)
         return group
     
@@ -167,6 +197,14 @@ class MainWindow(QMainWindow):
         interval_sensitivity_layout.addStretch()
         layout.addLayout(interval_sensitivity_layout)
         
+        # Spam filter (density, keyword and highlight analyses)
+        self.spam_filter_check = QCheckBox("도배·복붙 제외")
+        self.spam_filter_check.setToolTip(
+            "같은 사람이 같은 말을 반복하거나 여러 사람이 같은 글을 복붙한 채팅을\n"
+            "한 메시지 정도로만 세어 가짜 하이라이트를 줄입니다"
+        )
+        layout.addWidget(self.spam_filter_check)
+        
         # Analyze button
         analyze_btn = QPushButton("키워드 분석")
         analyze_btn.clicked.connect(self.analyze_keyword)
@@ -185,6 +223,23 @@ class MainWindow(QMainWindow):
         density_btn.setToolTip("키워드 없이 채팅이 급증한 하이라이트 구간을 찾습니다")
         layout.addWidget(density_btn)
         
+        # Donation button
+        donation_btn = QPushButton("후원 분석")
+        donation_btn.setObjectName("secondaryButton")
+        donation_btn.clicked.connect(self.analyze_donations)
+        donation_btn.setToolTip("치즈 후원이 몰린 구간을 찾습니다")
+        layout.addWidget(donation_btn)
+        
+        # Highlight ranking button
+        highlight_btn = QPushButton("하이라이트 순위")
+        highlight_btn.setObjectName("secondaryButton")
+        highlight_btn.clicked.connect(self.rank_highlights)
+        highlight_btn.setToolTip(
+            "채팅량, 참여자, 키워드, 분위기 변화, 후원, 이모티콘을 합친 점수로\n"
+            "가장 좋은 구간을 순서대로 고릅니다"
+        )
+        layout.addWidget(highlight_btn)
+        
         layout.addStretch()
         group.setLayout(layout)
         return group
@@ -268,33 +323,95 @@ class MainWindow(QMainWindow):
         group.setLayout(layout)
         return group
     
+    def closeEvent(self, event):
+        """Stop background work when the window closes"""
+        self.jobs.cancel()
+        if self._wordcloud_gen is not None:
+            self._wordcloud_gen.shutdown()
+        super().closeEvent(event)
+    
+    def create_status_bar(self):
+        """Create status bar with job progress and cancel button"""
+        status_bar = self.statusBar()
+        
+        self.status_label = QLabel("")
+        status_bar.addWidget(self.status_label, 1)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.hide()
+        status_bar.addPermanentWidget(self.progress_bar)
+        
+        self.cancel_btn = QPushButton("취소")
+        self.cancel_btn.setObjectName("secondaryButton")
+        self.cancel_btn.clicked.connect(self.cancel_jobs)
+        self.cancel_btn.hide()
+        status_bar.addPermanentWidget(self.cancel_btn)
+    
+    def on_job_progress(self, slot: str, percent: int, message: str):
+        """Update progress display from a background job"""
+        self.progress_bar.setValue(percent)
+        self.status_label.setText(message)
+    
+    def on_jobs_busy_changed(self, busy: bool):
+        """Show or hide the progress controls"""
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(busy)
+        self.cancel_btn.setVisible(busy)
+        if not busy:
+            self.status_label.setText("")
+    
+    def on_job_timed(self, slot: str, timings):
+        """Show where a finished job spent its time (only when timing is enabled)"""
+        if timings.spans:
+            self.status_label.setText(f"단계별 시간: {timings.summary()}")
+    
+    def cancel_jobs(self):
+        """Cancel all running analyses"""
+        self.jobs.cancel()
+        self.status_label.setText("취소됨")
+    
     def load_csv(self):
         """Load CSV file"""
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             "CSV 파일 선택",
             "",
-            "CSV Files (*.csv);;All Files (*)"
+            "Chat Files (*.csv *.chzchat);;CSV Files (*.csv);;All Files (*)"
         )
         
         if file_path:
-            try:
-                count = self.analyzer.load_csv(file_path)
-                self.current_file = file_path
-                filename = os.path.basename(file_path)
-                self.file_label.setText(f"로드됨: {filename}")
-                
-                QMessageBox.information(
-                    self,
-                    "성공",
-                    f"{count:,}개의 채팅 메시지를 로드했습니다."
-                )
-            except Exception as e:
-                QMessageBox.critical(
-                    self,
-                    "오류",
-                    f"파일 로드 실패:\n{str(e)}"
+            # A new file makes every running analysis stale
+            self.jobs.cancel()
+            # The read dataset only replaces the loaded one in on_csv_loaded,
+            # which a superseded load never reaches
+            self.jobs.submit(
+                'load', self.analyzer.read,
+                lambda dataset: self.on_csv_loaded(file_path, dataset),
+                file_path,
+                on_error=lambda message: QMessageBox.critical(
+                    self, "오류", f"파일 로드 실패:\n{message}"
                 )
+            )
+    
+    def on_csv_loaded(self, file_path: str, dataset):
+        """Handle a finished CSV load"""
+        self.analyzer.dataset = dataset
+        count = len(dataset.store)
+        self.current_file = file_path
+        self.keyword_export = None
+        self.density_export = None
+        self.donation_export = None
+        self.highlight_export = None
+        filename = os.path.basename(file_path)
+        self.file_label.setText(f"로드됨: {filename}")
+        
+        QMessageBox.information(
+            self,
+            "성공",
+            f"{count:,}개의 채팅 메시지를 로드했습니다."
+        )
     
     def update_sensitivity_label(self, value):
         """Update sensitivity label based on slider value"""
@@ -307,9 +424,24 @@ class MainWindow(QMainWindow):
             label = "높음"
         self.sensitivity_value_label.setText(f"{label} ({sensitivity:.1f})")
     
+    def spam_filter(self):
+        """Flood thresholds when the spam filter is on, else None"""
+        if not self.spam_filter_check.isChecked():
+            return None
+        from core.spam_filter import SpamOptions
+        return SpamOptions()
+    
+    def spam_message(self, result: dict) -> str:
+        """Result message line about the filtered floods (empty when off)"""
+        spam = result.get('spam')
+        if not spam:
+            return ""
+        return (f"도배로 뺀 메시지: {spam['removed']:,}개 "
+                f"(반복 {spam['repeats']:,}개, 복붙 {spam['copy_paste']:,}개)\n")
+    
     def analyze_chat_density(self):
         """Analyze chat density to find highlight moments without keywords"""
-        if self.analyzer.df is None:
+        if self.analyzer.dataset is None:
             QMessageBox.warning(self, "경고", "먼저 CSV 파일을 로드하세요.")
             return
         
@@ -322,30 +454,133 @@ class MainWindow(QMainWindow):
         # Get sensitivity value
         sensitivity = self.sensitivity_slider.value() / 10.0
         
+        self.jobs.submit(
+            'density', self.analyzer.analyze_chat_density,
+            lambda result: self.on_density_analyzed(result, interval, sensitivity),
+            interval, sensitivity, spam_filter=self.spam_filter(),
+            on_error=self.show_analysis_error
+        )
+    
+    def on_density_analyzed(self, result: dict, interval: float, sensitivity: float):
+        """Show chat density results"""
+        # The displayed results become the default for marker export
+        self.analyzer.keyword_results = result['results']
+        self.density_export = (result['results'], interval)
+        
+        # Plot graph
+        self.plot_density_graph(interval)
+        
+        # Build result message
+        peak_msg = f"가장 활발한 시간: {result['peak_time']}" if result['peak_time'] else "유의미한 피크를 찾지 못했습니다"
+        
+        QMessageBox.information(
+            self,
+            "분석 완료",
+            f"채팅 밀도 분석 완료\n\n"
+            f"총 {result['total_count']:,}개의 메시지 분석\n"
+            f"{peak_msg}\n"
+            f"하이라이트 구간: {result['spike_count']}개\n"
+            f"{self.spam_message(result)}\n"
+            f"민감도: {sensitivity:.1f} (평균+{sensitivity}σ 이상만 표시)"
+        )
+    
+    def analyze_donations(self):
+        """Analyze donation bursts"""
+        if self.analyzer.dataset is None:
+            QMessageBox.warning(self, "경고", "먼저 CSV 파일을 로드하세요.")
+            return
+        
         try:
-            result = self.analyzer.analyze_chat_density(interval, sensitivity)
-            
-            # Plot graph
-            self.plot_density_graph(interval)
-            
-            # Build result message
-            peak_msg = f"가장 활발한 시간: {result['peak_time']}" if result['peak_time'] else "유의미한 피크를 찾지 못했습니다"
-            
-            QMessageBox.information(
-                self,
-                "분석 완료",
-                f"채팅 밀도 분석 완료\n\n"
-                f"총 {result['total_count']:,}개의 메시지 분석\n"
-                f"{peak_msg}\n"
-                f"하이라이트 구간: {result['spike_count']}개\n\n"
-                f"민감도: {sensitivity:.1f} (평균+{sensitivity}σ 이상만 표시)"
-            )
-        except Exception as e:
-            QMessageBox.critical(self, "오류", f"분석 실패:\n{str(e)}")
+            interval = float(self.interval_input.text())
+        except ValueError:
+            QMessageBox.critical(self, "오류", "올바른 시간 간격을 입력하세요.")
+            return
+        
+        sensitivity = self.sensitivity_slider.value() / 10.0
+        
+        self.jobs.submit(
+            'donation', self.analyzer.analyze_donations,
+            lambda result: self.on_donations_analyzed(result, interval, sensitivity),
+            interval, sensitivity,
+            on_error=self.show_analysis_error
+        )
+    
+    def on_donations_analyzed(self, result: dict, interval: float, sensitivity: float):
+        """Show donation analysis results"""
+        if result['total_count'] == 0:
+            QMessageBox.information(self, "결과", "후원 메시지가 없습니다.")
+            return
+        
+        self.donation_export = (result['results'], interval)
+        peak_msg = f"후원이 가장 많았던 시간: {result['peak_time']}" if result['peak_time'] else "유의미한 피크를 찾지 못했습니다"
+        
+        QMessageBox.information(
+            self,
+            "분석 완료",
+            f"후원 분석 완료\n\n"
+            f"총 {result['total_count']:,}건, {result['total_amount']:,}치즈\n"
+            f"{peak_msg}\n"
+            f"후원 집중 구간: {len(result['results'])}개\n\n"
+            f"'마커 일괄 내보내기'로 다른 분석과 함께 내보낼 수 있습니다."
+        )
+    
+    def rank_highlights(self):
+        """Rank the best moments by the combined highlight score"""
+        if self.analyzer.dataset is None:
+            QMessageBox.warning(self, "경고", "먼저 CSV 파일을 로드하세요.")
+            return
+        
+        try:
+            interval = float(self.interval_input.text())
+        except ValueError:
+            QMessageBox.critical(self, "오류", "올바른 시간 간격을 입력하세요.")
+            return
+        
+        # The keyword, if any, adds its mentions as one more signal
+        keyword = self.keyword_input.text().strip()
+        
+        self.jobs.submit(
+            'highlight', self.run_highlight_ranking,
+            self.on_highlights_ranked,
+            interval, keyword, self.spam_filter(),
+            on_error=self.show_analysis_error
+        )
+    
+    def run_highlight_ranking(self, interval: float, keyword: str, spam_filter=None,
+                              control=None):
+        """Score every bin on every signal (runs on a worker thread)"""
+        from core.highlights import HighlightOptions, find_highlights
+        
+        options = HighlightOptions(bin_seconds=int(round(interval * 60)),
+                                   keywords=(keyword,) if keyword else (),
+                                   spam_filter=spam_filter)
+        scores = self.analyzer.get_sentiment_scores(control)
+        return find_highlights(self.analyzer, options, scores, control)
+    
+    def on_highlights_ranked(self, highlights):
+        """Show the highlight ranking"""
+        from core.highlights import SIGNAL_LABELS
+        
+        if len(highlights) == 0:
+            QMessageBox.information(self, "결과", "하이라이트 구간을 찾지 못했습니다.")
+            return
+        
+        self.highlight_export = highlights
+        
+        message = "━━━━━━━━━━━━━━━━━━━━━━\n"
+        message += "   하이라이트 순위\n"
+        message += "━━━━━━━━━━━━━━━━━━━━━━\n\n"
+        for row in highlights.head(10).itertuples(index=False):
+            message += f"{row.rank}. {row.time_str}  점수 {row.score:.2f}\n"
+            message += f"   주요 신호: {SIGNAL_LABELS[row.reason]}\n"
+            message += f"   채팅 {int(row.density):,}개, 참여자 {int(row.chatters):,}명\n"
+        message += f"\n총 {len(highlights)}개 구간 - '마커 일괄 내보내기'로 내보낼 수 있습니다."
+        
+        QMessageBox.information(self, "하이라이트 순위", message)
     
     def analyze_keyword(self):
         """Analyze keyword frequency"""
-        if self.analyzer.df is None:
+        if self.analyzer.dataset is None:
             QMessageBox.warning(self, "경고", "먼저 CSV 파일을 로드하세요.")
             return
         
@@ -363,35 +598,54 @@ class MainWindow(QMainWindow):
         # Get sensitivity value (slider value / 10 to get 1.0-3.0 range)
         sensitivity = self.sensitivity_slider.value() / 10.0
         
-        try:
-            result = self.analyzer.analyze_keyword(keyword, interval, sensitivity)
-            
-            if result['total_count'] == 0:
-                QMessageBox.information(
-                    self,
-                    "결과",
-                    f"'{keyword}' 키워드를 포함한 메시지가 없습니다."
-                )
-                return
-            
-            # Plot graph
-            self.plot_keyword_graph(keyword, interval)
-            
-            # Build result message
-            peak_msg = f"가장 많이 언급된 시간: {result['peak_time']}" if result['peak_time'] else "유의미한 피크를 찾지 못했습니다"
-            
+        self.jobs.submit(
+            'keyword', self.analyzer.analyze_keyword,
+            lambda result: self.on_keyword_analyzed(result, keyword, interval, sensitivity),
+            keyword, interval, sensitivity, spam_filter=self.spam_filter(),
+            on_error=self.show_analysis_error
+        )
+    
+    def on_keyword_analyzed(self, result: dict, keyword: str, interval: float,
+                            sensitivity: float):
+        """Show keyword analysis results"""
+        if result['total_count'] == 0:
             QMessageBox.information(
                 self,
-                "분석 완료",
-                f"총 {result['total_count']:,}개의 '{keyword}' 메시지 발견\n"
-                f"{peak_msg}\n\n"
-                f"민감도: {sensitivity:.1f} (평균+{sensitivity}σ 이상만 표시)"
+                "결과",
+                f"'{keyword}' 키워드를 포함한 메시지가 없습니다."
             )
-        except Exception as e:
-            QMessageBox.critical(self, "오류", f"분석 실패:\n{str(e)}")
+            return
+        
+        # The displayed results become the default for marker export
+        self.analyzer.keyword_results = result['results']
+        self.keyword_export = (keyword, result['results'], interval)
+        
+        # Plot graph
+        self.plot_keyword_graph(keyword, interval)
+        
+        # Build result message
+        peak_msg = f"가장 많이 언급된 시간: {result['peak_time']}" if result['peak_time'] else "유의미한 피크를 찾지 못했습니다"
+        
+        QMessageBox.information(
+            self,
+            "분석 완료",
+            f"총 {result['total_count']:,}개의 '{keyword}' 메시지 발견\n"
+            f"{peak_msg}\n"
+            f"{self.spam_message(result)}\n"
+            f"민감도: {sensitivity:.1f} (평균+{sensitivity}σ 이상만 표시)"
+        )
     
+    def show_analysis_error(self, message: str):
+        """Show an analysis failure reported by a background job"""
+        QMessageBox.critical(self, "오류", f"분석 실패:\n{message}")
+    
+    @timing.timed('plot.keyword')
     def plot_keyword_graph(self, keyword: str, interval: float):
         """Plot keyword frequency graph"""
+        import numpy as np
+        from ui.plotting import Figure
+        from ui.plot_decimation import ViewDecimator
+        
         # Clear previous canvas
         for i in reversed(range(self.canvas_layout.count())):
             self.canvas_layout.itemAt(i).widget().setParent(None)
@@ -406,24 +660,13 @@ class MainWindow(QMainWindow):
         ax = fig.add_subplot(111)
         ax.set_facecolor('#2a2a3e')
         
-        # Plot bar chart
-        x_positions = range(len(timeline))
-        ax.bar(x_positions, timeline['count'], color='#6366f1', width=0.8)
-        
-        # Set x-axis labels - show every nth label to avoid overlap
-        num_labels = len(timeline)
-        if num_labels > 30:
-            step = num_labels // 20  # Show ~20 labels
-        elif num_labels > 15:
-            step = 2
-        else:
-            step = 1
+        # Plot bar chart (decimated for long timelines)
+        decimator = ViewDecimator(ax)
+        x_positions = np.arange(len(timeline))
+        self._draw_bars(ax, decimator, x_positions, timeline['count'], '#6366f1')
         
-        # Set ticks and labels
-        tick_positions = list(range(0, num_labels, step))
-        tick_labels = [timeline['time_str'].iloc[i] for i in tick_positions]
-        ax.set_xticks(tick_positions)
-        ax.set_xticklabels(tick_labels, rotation=45, ha='right', fontsize=8)
+        # Set x-axis labels - tick density follows the zoom level
+        self._set_time_ticks(ax, timeline['time_str'])
         
         ax.set_ylabel('빈도', color='#e0e0e0', fontsize=10)
         ax.set_title(f"'{keyword}' 키워드 빈도 ({interval}분)", 
@@ -441,12 +684,18 @@ class MainWindow(QMainWindow):
         # Adjust layout: [left, bottom, right, top]
         fig.subplots_adjust(left=0.08, right=0.95, top=0.88, bottom=0.20)
         
-        # Create canvas
-        canvas = FigureCanvasQTAgg(fig)
-        self.canvas_layout.addWidget(canvas)
+        # Create canvas (clicking a bar shows the chat around it)
+        self._add_canvas(fig, [decimator], on_bin_click=lambda idx: self.show_spike_wordcloud(
+            timeline, idx, interval
+        ))
     
+    @timing.timed('plot.density')
     def plot_density_graph(self, interval: float):
         """Plot chat density graph"""
+        import numpy as np
+        from ui.plotting import Figure
+        from ui.plot_decimation import ViewDecimator
+        
         # Clear previous canvas
         for i in reversed(range(self.canvas_layout.count())):
             self.canvas_layout.itemAt(i).widget().setParent(None)
@@ -461,25 +710,15 @@ class MainWindow(QMainWindow):
         ax = fig.add_subplot(111)
         ax.set_facecolor('#2a2a3e')
         
-        # Plot bar chart with gradient colors
-        x_positions = range(len(timeline))
-        colors = ['#f59e0b' if count > timeline['count'].mean() * 1.5 else '#6366f1' 
-                  for count in timeline['count']]
-        ax.bar(x_positions, timeline['count'], color=colors, width=0.8)
+        # Plot bar chart with gradient colors (decimated for long timelines)
+        decimator = ViewDecimator(ax)
+        x_positions = np.arange(len(timeline))
+        counts = timeline['count'].to_numpy()
+        colors = np.where(counts > counts.mean() * 1.5, '#f59e0b', '#6366f1').tolist()
+        self._draw_bars(ax, decimator, x_positions, counts, colors)
         
         # Set x-axis labels
-        num_labels = len(timeline)
-        if num_labels > 30:
-            step = num_labels // 20
-        elif num_labels > 15:
-            step = 2
-        else:
-            step = 1
-        
-        tick_positions = list(range(0, num_labels, step))
-        tick_labels = [timeline['time_str'].iloc[i] for i in tick_positions]
-        ax.set_xticks(tick_positions)
-        ax.set_xticklabels(tick_labels, rotation=45, ha='right', fontsize=8)
+        self._set_time_ticks(ax, timeline['time_str'])
         
         ax.set_ylabel('채팅 수', color='#e0e0e0', fontsize=10)
         ax.set_title(f'채팅 밀도 ({interval}분)', 
@@ -497,10 +736,63 @@ class MainWindow(QMainWindow):
         # Adjust layout: [left, bottom, right, top]
         fig.subplots_adjust(left=0.08, right=0.95, top=0.88, bottom=0.20)
         
-        # Create canvas
+        # Create canvas (clicking a bar shows the chat around it)
+        self._add_canvas(fig, [decimator], on_bin_click=lambda idx: self.show_spike_wordcloud(
+            timeline, idx, interval
+        ))
+    
+    def _draw_bars(self, ax, decimator: "ViewDecimator", x, y, colors):
+        """Draw a bar chart, switching to view-aware decimation for long timelines"""
+        from ui.plot_decimation import DECIMATION_THRESHOLD, DecimatedBars
+        
+        if len(x) > DECIMATION_THRESHOLD:
+            decimator.add(DecimatedBars(ax, x, y, colors=colors))
+        else:
+            ax.bar(x, y, color=colors, width=0.8)
+    
+    def _set_time_ticks(self, ax, time_labels):
+        """Label bin positions with HH:MM:SS; ticks are re-picked on zoom"""
+        from ui.plotting import FuncFormatter, MaxNLocator
+        
+        labels = list(time_labels)
+        
+        def format_tick(value, _pos):
+            idx = int(round(value))
+            if idx < 0 or idx >= len(labels):
+                return ''
+            return labels[idx]
+        
+        ax.xaxis.set_major_locator(MaxNLocator(nbins=20, integer=True))
+        ax.xaxis.set_major_formatter(FuncFormatter(format_tick))
+        ax.tick_params(axis='x', labelrotation=45)
+    
+    def _add_canvas(self, fig: "Figure", decimators=(), on_bin_click=None):
+        """Add a figure canvas with a zoom/pan toolbar to the results area"""
+        from ui.plotting import FigureCanvasQTAgg, NavigationToolbar2QT
+        
         canvas = FigureCanvasQTAgg(fig)
+        for decimator in decimators:
+            decimator.attach(canvas)
+        # matplotlib only keeps weak references to callback methods
+        self.decimators = list(decimators)
+        self.spike_wordcloud_canvas = None
+        toolbar = NavigationToolbar2QT(canvas, self.canvas_container)
+        
+        if on_bin_click is not None:
+            canvas.mpl_connect('button_press_event',
+                               lambda event: self._on_canvas_click(event, toolbar, on_bin_click))
+            canvas.setToolTip("막대를 클릭하면 해당 구간의 워드클라우드를 볼 수 있습니다")
+        
+        self.canvas_layout.addWidget(toolbar)
         self.canvas_layout.addWidget(canvas)
     
+    def _on_canvas_click(self, event, toolbar, on_bin_click):
+        """Forward a click on a bar as its bin position"""
+        # Clicks while zooming or panning belong to the toolbar
+        if toolbar.mode or event.inaxes is None or event.xdata is None:
+            return
+        on_bin_click(int(round(event.xdata)))
+    
     def export_premiere_markers(self):
         """Export Premiere Pro markers"""
         if self.analyzer.get_keyword_timeline() is None:
@@ -527,41 +819,146 @@ class MainWindow(QMainWindow):
             except Exception as e:
                 QMessageBox.critical(self, "오류", f"저장 실패:\n{str(e)}")
     
+    def export_all_markers(self):
+        """Export selected analyses to selected marker formats at once"""
+        from ui.export_dialog import ExportDialog
+        from core.exporters import ExportOptions, export_all
+        from core.segments import SegmentOptions
+        from core.marker_timeline import combine_tracks
+        
+        analyses = {}
+        if self.keyword_export is not None:
+            analyses['keyword'] = f"키워드 분석 ({self.keyword_export[0]})"
+        if self.density_export is not None:
+            analyses['density'] = "채팅 밀도 분석"
+        if self.donation_export is not None:
+            analyses['donation'] = "후원 분석"
+        if self.sentiment_analyzer.get_mood_changes():
+            analyses['mood'] = "분위기 변화 지점"
+        if self.highlight_export is not None:
+            analyses['highlight'] = "하이라이트 순위"
+        
+        if not analyses:
+            QMessageBox.warning(self, "경고", "먼저 분석을 수행하세요.")
+            return
+        
+        dialog = ExportDialog(analyses, self)
+        if not dialog.exec():
+            return
+        
+        selected = dialog.selected_analyses()
+        formats = dialog.selected_formats()
+        if not selected or not formats:
+            QMessageBox.warning(self, "경고", "분석 결과와 형식을 하나 이상 선택하세요.")
+            return
+        
+        output_dir = QFileDialog.getExistingDirectory(self, "마커 저장 폴더 선택")
+        if not output_dir:
+            return
+        
+        # Ranged clips need the bin length of the analysis they come from
+        settings = dialog.segment_settings()
+        
+        def segments(interval: float):
+            if settings is None:
+                return None
+            return SegmentOptions(bin_seconds=interval * 60, **settings)
+        
+        tracks = []
+        if 'keyword' in selected:
+            keyword, results, interval = self.keyword_export
+            tracks.append(self.analyzer.keyword_markers(keyword, results, segments(interval)))
+        if 'density' in selected:
+            results, interval = self.density_export
+            tracks.append(self.analyzer.density_markers(results, segments(interval)))
+        if 'donation' in selected:
+            results, interval = self.donation_export
+            tracks.append(self.analyzer.donation_markers(results, segments(interval)))
+        if 'mood' in selected:
+            tracks.append(self.sentiment_analyzer.mood_markers(
+                top_n=10, segments=segments(self.sentiment_interval)
+            ))
+        if 'highlight' in selected:
+            from core.highlights import highlight_track
+            # Highlights are already ranged by their bins
+            tracks.append(highlight_track(self.highlight_export))
+        
+        # One file with duplicates of the same moment removed
+        tolerance = dialog.combine_tolerance()
+        if tolerance is not None:
+            tracks = [combine_tracks(tracks, tolerance)]
+        
+        try:
+            paths = export_all(tracks, formats, output_dir, ExportOptions(fps=dialog.fps()))
+            QMessageBox.information(
+                self,
+                "성공",
+                f"{len(paths)}개의 마커 파일을 저장했습니다:\n{output_dir}"
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "오류", f"저장 실패:\n{str(e)}")
+    
     def generate_wordcloud(self):
         """Generate wordcloud"""
-        if self.analyzer.df is None:
+        if self.analyzer.dataset is None:
             QMessageBox.warning(self, "경고", "먼저 CSV 파일을 로드하세요.")
             return
         
-        try:
-            text = self.analyzer.get_all_text()
-            
-            if not text.strip():
-                QMessageBox.warning(self, "경고", "분석할 텍스트가 없습니다.")
-                return
-            
-            # Generate wordcloud
-            success = self.wordcloud_gen.generate(text)
-            
-            if not success:
-                QMessageBox.warning(self, "경고", "워드클라우드 생성 실패")
-                return
-            
-            # Display wordcloud
-            self.display_wordcloud()
-            
-        except Exception as e:
-            QMessageBox.critical(self, "오류", f"워드클라우드 생성 실패:\n{str(e)}")
+        self.jobs.submit(
+            'wordcloud', self.build_wordcloud, self.on_wordcloud_built,
+            on_error=lambda message: QMessageBox.critical(
+                self, "오류", f"워드클라우드 생성 실패:\n{message}"
+            )
+        )
+    
+    def build_wordcloud(self, control=None):
+        """
+        Build the wordcloud (runs on a worker thread)
+        
+        Returns:
+            The rendered image, or None if there is no text. The image only
+            becomes the current wordcloud in on_wordcloud_built, so a
+            superseded job can't replace a newer one.
+        """
+        # Token counts are cached per loaded file
+        frequencies = self.analyzer.get_word_frequencies(control)
+        
+        if frequencies.empty:
+            return None
+        
+        # WordCloud layout itself cannot be interrupted
+        control.report(70, "워드클라우드 생성 중")
+        return self.wordcloud_gen.render_frequencies(frequencies)
     
+    def on_wordcloud_built(self, image):
+        """Show the generated wordcloud"""
+        if image is None:
+            QMessageBox.warning(self, "경고", "분석할 텍스트가 없습니다.")
+            return
+        
+        # Display wordcloud
+        self.wordcloud_gen.wordcloud = image
+        self.display_wordcloud()
+    
+    @timing.timed('plot.wordcloud')
     def display_wordcloud(self):
         """Display wordcloud on canvas"""
         # Clear previous canvas
         for i in reversed(range(self.canvas_layout.count())):
             self.canvas_layout.itemAt(i).widget().setParent(None)
+        self.spike_wordcloud_canvas = None
         
+        canvas = self._create_wordcloud_canvas('채팅 워드클라우드')
+        if canvas is not None:
+            self.canvas_layout.addWidget(canvas)
+    
+    def _create_wordcloud_canvas(self, title: str):
+        """Create a canvas showing the current wordcloud"""
         wordcloud = self.wordcloud_gen.get_wordcloud()
         if wordcloud is None:
-            return
+            return None
+        
+        from ui.plotting import Figure, FigureCanvasQTAgg
         
         # Create figure with more padding for title
         fig = Figure(figsize=(12, 6), facecolor='#2a2a3e')
@@ -571,15 +968,64 @@ class MainWindow(QMainWindow):
         # Display wordcloud
         ax.imshow(wordcloud, interpolation='bilinear')
         ax.axis('off')
-        ax.set_title('채팅 워드클라우드', color='#e0e0e0', fontsize=14, 
+        ax.set_title(title, color='#e0e0e0', fontsize=14, 
                      fontweight='bold', pad=20)
         
         # Adjust layout with more padding
         fig.tight_layout(pad=2.0)
         
         # Create canvas
-        canvas = FigureCanvasQTAgg(fig)
+        return FigureCanvasQTAgg(fig)
+    
+    def show_spike_wordcloud(self, timeline, idx: int, interval: float):
+        """Show a wordcloud of the chat around a clicked spike"""
+        if idx < 0 or idx >= len(timeline):
+            return
+        
+        # Center the window on the clicked interval
+        bin_start = int(timeline['time_seconds'].iloc[idx])
+        center = bin_start + interval * 60 / 2
+        start = max(center - SPIKE_WORDCLOUD_SECONDS / 2, 0)
+        end = center + SPIKE_WORDCLOUD_SECONDS / 2
+        
+        self.jobs.submit(
+            'wordcloud', self.build_range_wordcloud,
+            lambda image: self.on_range_wordcloud_built(image, start, end),
+            start, end,
+            on_error=lambda message: QMessageBox.critical(
+                self, "오류", f"워드클라우드 생성 실패:\n{message}"
+            )
+        )
+    
+    def build_range_wordcloud(self, start: float, end: float, control=None):
+        """
+        Build a wordcloud for a time range (runs on a worker thread)
+        
+        Returns:
+            The rendered image, or None if nothing was said in the range
+        """
+        # Per-bin token counts are cached per loaded file
+        token_index = self.analyzer.get_token_index(control=control)
+        control.report(70, "워드클라우드 생성 중")
+        return self.wordcloud_gen.render_range(token_index, start, end)
+    
+    def on_range_wordcloud_built(self, image, start: float, end: float):
+        """Show the spike wordcloud below the graph"""
+        start_str = self.analyzer.seconds_to_time(int(start))
+        end_str = self.analyzer.seconds_to_time(int(end))
+        if image is None:
+            QMessageBox.information(self, "결과", f"{start_str} ~ {end_str} 구간에 채팅이 없습니다.")
+            return
+        
+        self.wordcloud_gen.wordcloud = image
+        # Replace the previous spike wordcloud, keep the graph
+        if self.spike_wordcloud_canvas is not None:
+            self.spike_wordcloud_canvas.setParent(None)
+        
+        canvas = self._create_wordcloud_canvas(f'{start_str} ~ {end_str} 워드클라우드')
+        canvas.setMinimumHeight(400)
         self.canvas_layout.addWidget(canvas)
+        self.spike_wordcloud_canvas = canvas
     
     def save_wordcloud(self):
         """Save wordcloud to file"""
@@ -606,7 +1052,7 @@ class MainWindow(QMainWindow):
                 QMessageBox.critical(self, "오류", f"저장 실패:\n{str(e)}")
     def analyze_sentiment(self):
         """Analyze chat sentiment over time"""
-        if self.analyzer.df is None:
+        if self.analyzer.dataset is None:
             QMessageBox.warning(self, "경고", "먼저 CSV 파일을 로드하세요.")
             return
         
@@ -616,50 +1062,63 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "오류", "올바른 시간 간격을 입력하세요.")
             return
         
-        try:
-            # Prepare data with seconds and clean messages
-            if 'seconds' not in self.analyzer.df.columns:
-                self.analyzer.df['seconds'] = self.analyzer.df['재생시간'].apply(
-                    self.analyzer.time_to_seconds
-                )
-            
-            if 'clean_message' not in self.analyzer.df.columns:
-                self.analyzer.df['clean_message'] = self.analyzer.df['메시지'].apply(
-                    self.analyzer.clean_message
-                )
-            
-            # Analyze sentiment timeline
-            timeline = self.sentiment_analyzer.analyze_timeline(
-                self.analyzer.df, interval
+        self.jobs.submit(
+            'sentiment', self.run_sentiment_analysis,
+            lambda timeline: self.on_sentiment_analyzed(timeline, interval),
+            interval,
+            on_error=lambda message: QMessageBox.critical(
+                self, "오류", f"분석 실패:\\n{message}"
             )
-            
-            if timeline is None or len(timeline) == 0:
-                QMessageBox.warning(self, "경고", "분석할 데이터가 없습니다.")
-                return
-            
-            # Plot sentiment graph
-            self.plot_sentiment_graph(interval)
-            
-            # Calculate statistics
-            avg_sentiment = timeline['sentiment_score'].mean()
-            max_sentiment = timeline['sentiment_score'].max()
-            min_sentiment = timeline['sentiment_score'].min()
-            
-            sentiment_desc = "긍정적" if avg_sentiment > 0.1 else "부정적" if avg_sentiment < -0.1 else "중립적"
-            
-            QMessageBox.information(
-                self,
-                "분석 완료",
-                f"분위기 분석 완료\\n\\n"
-                f"전체 분위기: {sentiment_desc} ({avg_sentiment:.2f})\\n"
-                f"최고 긍정: {max_sentiment:.2f}\\n"
-                f"최저 부정: {min_sentiment:.2f}"
-            )
-        except Exception as e:
-            QMessageBox.critical(self, "오류", f"분석 실패:\\n{str(e)}")
+        )
+    
+    def run_sentiment_analysis(self, interval: float, control=None):
+        """Run the sentiment timeline (runs on a worker thread)"""
+        # Seconds and clean messages come from the analyzer's cache, not the loaded df
+        frame = self.analyzer.get_analysis_frame(control)
+        
+        # Scores are cached per dataset and shared with the highlight ranking
+        scores = self.analyzer.get_sentiment_scores(control)
+        
+        # Analyze sentiment timeline
+        return self.sentiment_analyzer.analyze_timeline(frame, interval, control, scores=scores)
+    
+    def on_sentiment_analyzed(self, timeline, interval: float):
+        """Show sentiment analysis results"""
+        if timeline is None or len(timeline) == 0:
+            QMessageBox.warning(self, "경고", "분석할 데이터가 없습니다.")
+            return
+        
+        self.sentiment_analyzer.sentiment_results = timeline
+        self.sentiment_interval = interval
+        
+        # Plot sentiment graph
+        self.plot_sentiment_graph(interval)
+        
+        # Calculate statistics
+        avg_sentiment = timeline['sentiment_score'].mean()
+        max_sentiment = timeline['sentiment_score'].max()
+        min_sentiment = timeline['sentiment_score'].min()
+        
+        sentiment_desc = "긍정적" if avg_sentiment > 0.1 else "부정적" if avg_sentiment < -0.1 else "중립적"
+        
+        QMessageBox.information(
+            self,
+            "분석 완료",
+            f"분위기 분석 완료\\n\\n"
+            f"전체 분위기: {sentiment_desc} ({avg_sentiment:.2f})\\n"
+            f"최고 긍정: {max_sentiment:.2f}\\n"
+            f"최저 부정: {min_sentiment:.2f}"
+        )
     
+    @timing.timed('plot.sentiment')
     def plot_sentiment_graph(self, interval: float):
         """Plot sentiment analysis graph with mood change markers"""
+        import numpy as np
+        from ui.plotting import Figure
+        from ui.plot_decimation import (
+            DECIMATION_THRESHOLD, DecimatedBars, DecimatedLine, ViewDecimator
+        )
+        
         # Clear previous canvas
         for i in reversed(range(self.canvas_layout.count())):
             self.canvas_layout.itemAt(i).widget().setParent(None)
@@ -675,31 +1134,39 @@ class MainWindow(QMainWindow):
         # Create figure
         fig = Figure(figsize=(14, 8), facecolor='#2a2a3e')
         
-        # Create two subplots
+        # Create two subplots sharing the time axis (zooming one zooms both)
         ax1 = fig.add_subplot(211)  # Sentiment score
-        ax2 = fig.add_subplot(212)  # Message frequency
+        ax2 = fig.add_subplot(212, sharex=ax1)  # Message frequency
         
         ax1.set_facecolor('#2a2a3e')
         ax2.set_facecolor('#2a2a3e')
         
-        x_positions = range(len(timeline))
+        x_positions = np.arange(len(timeline))
+        scores = timeline['sentiment_score'].to_numpy()
+        decimator1 = ViewDecimator(ax1)
+        decimator2 = ViewDecimator(ax2)
         
         # Plot 1: Sentiment score with color-coded areas
-        sentiment_colors = ['#10b981' if s > 0.2 else '#ef4444' if s < -0.2 else '#6366f1' 
-                           for s in timeline['sentiment_score']]
-        
-        # Fill area under curve
-        positive_mask = timeline['sentiment_score'] > 0
-        negative_mask = timeline['sentiment_score'] < 0
-        
-        ax1.fill_between(x_positions, 0, timeline['sentiment_score'], 
-                         where=positive_mask, alpha=0.3, color='#10b981', label='긍정')
-        ax1.fill_between(x_positions, 0, timeline['sentiment_score'], 
-                         where=negative_mask, alpha=0.3, color='#ef4444', label='부정')
-        
-        # Plot line
-        ax1.plot(x_positions, timeline['sentiment_score'], 
-                color='#6366f1', linewidth=2.5, marker='o', markersize=3)
+        if len(timeline) > DECIMATION_THRESHOLD:
+            # Fill and line are re-decimated (LTTB) on every zoom
+            decimator1.add(DecimatedLine(
+                ax1, x_positions, scores,
+                fill_colors=('#10b981', '#ef4444'), fill_labels=('긍정', '부정'),
+                color='#6366f1', linewidth=2.5, marker='o', markersize=3
+            ))
+        else:
+            # Fill area under curve
+            positive_mask = scores > 0
+            negative_mask = scores < 0
+            
+            ax1.fill_between(x_positions, 0, scores, 
+                             where=positive_mask, alpha=0.3, color='#10b981', label='긍정')
+            ax1.fill_between(x_positions, 0, scores, 
+                             where=negative_mask, alpha=0.3, color='#ef4444', label='부정')
+            
+            # Plot line
+            ax1.plot(x_positions, scores, 
+                    color='#6366f1', linewidth=2.5, marker='o', markersize=3)
         
         # Add zero line
         ax1.axhline(y=0, color='#e0e0e0', linestyle='--', alpha=0.5, linewidth=1)
@@ -747,31 +1214,19 @@ class MainWindow(QMainWindow):
         ax1.tick_params(axis='both', colors='#e0e0e0', labelsize=9)
         ax1.set_ylim(-1.1, 1.1)
         ax1.grid(axis='y', alpha=0.2, color='#e0e0e0', linestyle='--', linewidth=0.5)
-        ax1.legend(loc='upper right', fontsize=9, framealpha=0.8)
         
         # Plot 2: Message frequency with gradient colors
-        colors_freq = ['#8b5cf6' if timeline.iloc[i]['sentiment_score'] > 0 else '#6366f1' 
-                      for i in range(len(timeline))]
-        ax2.bar(x_positions, timeline['message_count'], 
-               color=colors_freq, alpha=0.7, width=0.8)
-        
-        # Set x-axis labels for both plots
-        num_labels = len(timeline)
-        if num_labels > 30:
-            step = num_labels // 20
-        elif num_labels > 15:
-            step = 2
+        colors_freq = np.where(scores > 0, '#8b5cf6', '#6366f1').tolist()
+        if len(timeline) > DECIMATION_THRESHOLD:
+            decimator2.add(DecimatedBars(ax2, x_positions, timeline['message_count'],
+                                         colors=colors_freq, alpha=0.7))
         else:
-            step = 1
-        
-        tick_positions = list(range(0, num_labels, step))
-        tick_labels = [timeline['time_str'].iloc[i] for i in tick_positions]
+            ax2.bar(x_positions, timeline['message_count'], 
+                   color=colors_freq, alpha=0.7, width=0.8)
         
-        ax1.set_xticks(tick_positions)
-        ax1.set_xticklabels([])  # Hide x labels on top plot
-        
-        ax2.set_xticks(tick_positions)
-        ax2.set_xticklabels(tick_labels, rotation=45, ha='right')
+        # Set x-axis labels for both plots
+        ax1.tick_params(axis='x', labelbottom=False)  # Hide x labels on top plot
+        self._set_time_ticks(ax2, timeline['time_str'])
         ax2.set_xlabel('시간', color='#e0e0e0', fontsize=12, weight='bold')
         ax2.set_ylabel('메시지 수', color='#e0e0e0', fontsize=12, weight='bold')
         ax2.tick_params(axis='both', colors='#e0e0e0', labelsize=9)
@@ -787,9 +1242,9 @@ class MainWindow(QMainWindow):
         # Adjust layout with explicit spacing to ensure titles and labels are visible
         fig.subplots_adjust(left=0.08, right=0.95, top=0.94, bottom=0.18, hspace=0.35)
         
-        # Create canvas
-        canvas = FigureCanvasQTAgg(fig)
-        self.canvas_layout.addWidget(canvas)
+        # Create canvas (decimated layers render once the canvas size is known)
+        self._add_canvas(fig, [decimator1, decimator2])
+        ax1.legend(loc='upper right', fontsize=9, framealpha=0.8)
     
     def find_mood_changes(self):
         """Find and display mood change points"""
@@ -0,0 +1,144 @@
+"""
+View-aware plot decimation for long timelines
+"""
+import numpy as np
+from typing import List, Optional, Sequence
+
+from core.decimation import minmax_indices, lttb_indices, visible_range
+
+
+# Series shorter than this are drawn as-is (regular bars look better)
+DECIMATION_THRESHOLD = 400
+
+
+class DecimatedBars:
+    """Bar series drawn as a single LineCollection of min/max columns"""
+
+    def __init__(self, ax, x: Sequence[float], y: Sequence[float],
+                 colors=None, alpha: float = 1.0):
+        self.ax = ax
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+
+        # A single color string applies to all bars, a sequence is per-bar
+        single_color = colors if isinstance(colors, str) else None
+        self.colors = None if colors is None or single_color else np.asarray(colors, dtype=object)
+        self.collection = ax.vlines([], [], [], colors=single_color, alpha=alpha)
+
+        if len(self.x):
+            ax.update_datalim([(self.x[0], 0), (self.x[-1], self.y.max())])
+            ax.autoscale_view()
+
+    def render(self, x_min: float, x_max: float, n_columns: int, dpi: float):
+        start, stop = visible_range(self.x, x_min, x_max)
+        idx = start + minmax_indices(self.y[start:stop], n_columns)
+        xs = self.x[idx]
+        ys = self.y[idx]
+
+        segments = np.zeros((len(idx), 2, 2))
+        segments[:, :, 0] = xs[:, None]
+        segments[:, 1, 1] = ys
+        self.collection.set_segments(segments)
+
+        if self.colors is not None:
+            self.collection.set_color(list(self.colors[idx]))
+
+        # Keep bars about as wide as their share of the axes, at least 1px
+        visible = max(stop - start, 1)
+        px_per_bar = n_columns / visible
+        self.collection.set_linewidth(max(1.0, px_per_bar * 0.8) * 72.0 / dpi)
+
+
+class DecimatedLine:
+    """Line series downsampled with LTTB, optionally filled to zero"""
+
+    def __init__(self, ax, x: Sequence[float], y: Sequence[float],
+                 fill_colors: Optional[Sequence[str]] = None,
+                 fill_labels: Optional[Sequence[str]] = None,
+                 fill_alpha: float = 0.3, **line_kwargs):
+        self.ax = ax
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.fill_colors = fill_colors
+        self.fill_labels = fill_labels or (None, None)
+        self.fill_alpha = fill_alpha
+        self.fills: List = []
+        (self.line,) = ax.plot([], [], **line_kwargs)
+
+        if len(self.x):
+            ax.update_datalim([(self.x[0], self.y.min()), (self.x[-1], self.y.max())])
+            ax.autoscale_view()
+
+    def render(self, x_min: float, x_max: float, n_columns: int, dpi: float):
+        start, stop = visible_range(self.x, x_min, x_max)
+        idx = start + lttb_indices(self.x[start:stop], self.y[start:stop], n_columns)
+        xs = self.x[idx]
+        ys = self.y[idx]
+        self.line.set_data(xs, ys)
+
+        if self.fill_colors is None:
+            return
+
+        for fill in self.fills:
+            fill.remove()
+        pos_color, neg_color = self.fill_colors
+        pos_label, neg_label = self.fill_labels
+        self.fills = [
+            self.ax.fill_between(xs, 0, ys, where=ys > 0, alpha=self.fill_alpha,
+                                 color=pos_color, label=pos_label),
+            self.ax.fill_between(xs, 0, ys, where=ys < 0, alpha=self.fill_alpha,
+                                 color=neg_color, label=neg_label),
+        ]
+
+
+class ViewDecimator:
+    """
+    Re-decimates the series of one axes whenever its x-range or pixel size changes,
+    so zooming in brings back full detail
+    """
+
+    def __init__(self, ax):
+        self.ax = ax
+        self.series: List = []
+        self._x_bounds = None
+        self._updating = False
+        ax.callbacks.connect('xlim_changed', self._on_view_changed)
+
+    def add(self, series):
+        """Register a decimated series and extend the x-limits to cover it"""
+        self.series.append(series)
+        if len(series.x):
+            lo, hi = float(series.x[0]), float(series.x[-1])
+            if self._x_bounds is not None:
+                lo = min(lo, self._x_bounds[0])
+                hi = max(hi, self._x_bounds[1])
+            self._x_bounds = (lo, hi)
+        return series
+
+    def attach(self, canvas):
+        """Connect to canvas resizes and draw the initial view"""
+        canvas.mpl_connect('resize_event', self._on_view_changed)
+        if self._x_bounds is not None:
+            lo, hi = self._x_bounds
+            self.ax.set_xlim(lo - 0.5, hi + 0.5)
+        self.update()
+
+    def update(self):
+        # Adding artists can trigger autoscaling, which fires xlim_changed again
+        if self._updating or not self.series:
+            return
+        self._updating = True
+        try:
+            x_min, x_max = self.ax.get_xlim()
+            n_columns = max(int(self.ax.bbox.width), 1)
+            dpi = self.ax.figure.dpi
+            for series in self.series:
+                series.render(x_min, x_max, n_columns, dpi)
+        finally:
+            self._updating = False
+
+    def _on_view_changed(self, _event):
+        if self._updating:
+            return
+        self.update()
+        self.ax.figure.canvas.draw_idle()
@@ -0,0 +1,52 @@
+"""
+Matplotlib setup for the GUI, imported on the first plot
+
+Importing matplotlib and scanning fonts takes longer than building the whole
+window, so nothing here is touched until a graph is drawn.
+"""
+import platform
+from typing import Optional
+
+import matplotlib
+matplotlib.use('QtAgg')
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg, NavigationToolbar2QT
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter, MaxNLocator
+import matplotlib.font_manager as fm
+
+from core.fonts import cached_lookup
+
+
+# Korean font families in order of preference
+KOREAN_FONT_FAMILIES = {
+    'Darwin': ['Apple SD Gothic Neo', 'AppleGothic'],
+    'Windows': ['Malgun Gothic', 'Gulim', 'Batang'],
+    'Linux': ['NanumGothic', 'NanumBarunGothic', 'Noto Sans CJK KR', 'Noto Sans KR'],
+}
+
+
+def find_korean_family() -> Optional[str]:
+    """First installed Korean font family known to matplotlib"""
+    candidates = KOREAN_FONT_FAMILIES.get(platform.system(), KOREAN_FONT_FAMILIES['Linux'])
+    installed = {font.name for font in fm.fontManager.ttflist}
+    for family in candidates:
+        if family in installed:
+            return family
+    return None
+
+
+# Configure Korean font for matplotlib
+def setup_korean_font():
+    """Setup Korean font for matplotlib (the font scan is cached between runs)"""
+    family = cached_lookup('matplotlib_family', find_korean_family)
+    if family is None:
+        # Nothing found; keep the previous per-platform default
+        family = KOREAN_FONT_FAMILIES.get(platform.system(), KOREAN_FONT_FAMILIES['Linux'])[0]
+    plt.rcParams['font.family'] = family
+    
+    # Prevent minus sign from breaking
+    plt.rcParams['axes.unicode_minus'] = False
+
+# Setup font on module load
+setup_korean_font()
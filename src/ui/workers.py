@@ -0,0 +1,142 @@
+"""
+Background job runner for analyses
+"""
+from typing import Callable, Dict, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from core import timing
+from core.jobs import JobControl, AnalysisCancelled
+
+
+class WorkerSignals(QObject):
+    """Signals emitted by an AnalysisWorker (delivered on the GUI thread)"""
+    progress = pyqtSignal(int, str)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class AnalysisWorker(QRunnable):
+    """Runs fn(*args, control=..., **kwargs) on a pool thread"""
+    
+    def __init__(self, fn: Callable, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.control = JobControl(progress_callback=self.signals.progress.emit)
+        # Stage timings of this job (None while timing is disabled)
+        self.timings: Optional[timing.Timings] = None
+    
+    def run(self):
+        try:
+            with timing.collect(getattr(self.fn, '__name__', 'job')) as self.timings:
+                result = self.fn(*self.args, control=self.control, **self.kwargs)
+        except AnalysisCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            if self.control.is_cancelled:
+                self.signals.cancelled.emit()
+            else:
+                self.signals.finished.emit(result)
+
+
+class JobRunner(QObject):
+    """
+    Runs analyses off the GUI thread, one live job per slot
+    
+    Submitting to a slot that already has a job cancels the old one, and any
+    result it still produces is dropped as stale.
+    """
+    busy_changed = pyqtSignal(bool)
+    progress = pyqtSignal(str, int, str)
+    # Slot and Timings of a finished job, including its result callback
+    timed = pyqtSignal(str, object)
+    
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        # Jobs may run side by side: analyses don't mutate the loaded data and
+        # loads only return a dataset, which the current load's callback swaps in
+        self.pool = QThreadPool(self)
+        self._generations: Dict[str, int] = {}
+        self._active: Dict[str, AnalysisWorker] = {}
+    
+    def submit(self, slot: str, fn: Callable, on_result: Callable,
+               *args, on_error: Optional[Callable[[str], None]] = None,
+               **kwargs) -> AnalysisWorker:
+        """
+        Start a job, superseding any running job in the same slot
+        
+        Args:
+            slot: Job slot name (e.g. 'load', 'keyword')
+            fn: Analysis function; must accept a `control` keyword argument
+            on_result: Called on the GUI thread with the result
+            on_error: Called on the GUI thread with an error message
+            
+        Returns:
+            The queued worker
+        """
+        self.cancel(slot)
+        generation = self._generations.get(slot, 0) + 1
+        self._generations[slot] = generation
+        
+        worker = AnalysisWorker(fn, *args, **kwargs)
+        worker.signals.progress.connect(
+            lambda percent, message: self._on_progress(slot, generation, percent, message)
+        )
+        worker.signals.finished.connect(
+            lambda result: self._on_done(slot, generation, on_result, result, worker.timings)
+        )
+        worker.signals.failed.connect(
+            lambda message: self._on_done(slot, generation, on_error, message)
+        )
+        worker.signals.cancelled.connect(
+            lambda: self._on_done(slot, generation, None, None)
+        )
+        
+        self._active[slot] = worker
+        self.busy_changed.emit(True)
+        self.pool.start(worker)
+        return worker
+    
+    def cancel(self, slot: Optional[str] = None):
+        """Cancel the job in a slot, or every job when slot is None"""
+        slots = list(self._active) if slot is None else [slot]
+        removed = False
+        for name in slots:
+            worker = self._active.pop(name, None)
+            if worker is not None:
+                worker.control.cancel()
+                # Invalidate so a late result is ignored even if not cancellable
+                self._generations[name] = self._generations.get(name, 0) + 1
+                removed = True
+        if removed and not self._active:
+            self.busy_changed.emit(False)
+    
+    def is_busy(self) -> bool:
+        return bool(self._active)
+    
+    def _is_current(self, slot: str, generation: int) -> bool:
+        return self._generations.get(slot) == generation
+    
+    def _on_progress(self, slot: str, generation: int, percent: int, message: str):
+        if self._is_current(slot, generation):
+            self.progress.emit(slot, percent, message)
+    
+    def _on_done(self, slot: str, generation: int, callback: Optional[Callable], value,
+                 timings: Optional[timing.Timings] = None):
+        if not self._is_current(slot, generation):
+            return
+        self._active.pop(slot, None)
+        if not self._active:
+            self.busy_changed.emit(False)
+        if callback is not None:
+            # Plotting in the callback is part of the job's timings
+            with timing.collect(slot, timings):
+                callback(value)
+        if timings is not None:
+            self.timed.emit(slot, timings)